@@ -2,8 +2,17 @@ import sys
 import warnings
 
 from corneto import _plotting as pl
+from corneto._batch import BatchResult, solve_batch
 from corneto._constants import *
-from corneto._graph import Attr, Attributes, EdgeType, Graph
+from corneto._graph import (
+    Attr,
+    Attributes,
+    EdgeType,
+    Graph,
+    GraphView,
+    ReadOnlyGraphError,
+)
+from corneto._graph_readonly import ReadOnlyGraph
 from corneto._util import info
 from corneto.backend import DEFAULT_BACKEND, DEFAULT_SOLVER, available_backends
 
@@ -63,6 +72,11 @@ __all__ = [
     "EdgeType",
     "Attributes",
     "Graph",
+    "GraphView",
+    "ReadOnlyGraph",
+    "ReadOnlyGraphError",
+    "BatchResult",
+    "solve_batch",
     "info",
     "DEFAULT_BACKEND",
     "available_backends",
@@ -0,0 +1,280 @@
+import multiprocessing
+import os
+import time
+import traceback
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from corneto._graph import BaseGraph
+from corneto._graph_readonly import ReadOnlyGraph
+from corneto._settings import LOGGER
+
+
+class BatchResult:
+    """Result of one of the samples of :func:`solve_batch`.
+
+    Attributes:
+        index (int): Position of the sample in the list of samples.
+        value (Any): Value returned by the `extract` function, or None if
+            the sample failed.
+        objectives (List[float]): Values of the objectives of the problem.
+        error (Optional[str]): Description of the error (with the traceback
+            of the worker) if the sample failed, otherwise None.
+        elapsed (float): Time in seconds spent on the sample.
+    """
+
+    __slots__ = ("elapsed", "error", "index", "objectives", "value")
+
+    def __init__(
+        self,
+        index: int,
+        value: Any = None,
+        objectives: Optional[List[float]] = None,
+        error: Optional[str] = None,
+        elapsed: float = 0.0,
+    ) -> None:
+        self.index = index
+        self.value = value
+        self.objectives = objectives or []
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        """True if the problem of the sample was built and solved."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else f"error={self.error.splitlines()[-1]!r}"
+        return f"BatchResult(index={self.index}, {status}, elapsed={self.elapsed:.3f})"
+
+
+def _expression_values(problem) -> Dict[str, Any]:
+    values = dict()
+    for name, expr in problem.expressions.items():
+        try:
+            values[name] = expr.value
+        except Exception:
+            values[name] = None
+    return values
+
+
+def _value(expr) -> Any:
+    try:
+        value = expr.value
+    except Exception:
+        return None
+    if value is not None and np.size(value) == 1:
+        return float(np.asarray(value).item())
+    return value
+
+
+def _run(factory, graph, sample, extract, solve_options) -> tuple:
+    problem = factory(sample) if graph is None else factory(graph, sample)
+    if isinstance(problem, tuple):
+        problem = problem[0]
+    problem.solve(**solve_options)
+    value = extract(problem) if extract is not None else _expression_values(problem)
+    return value, [_value(o) for o in problem.objectives]
+
+
+def _worker(conn, factory, graph, extract, solve_options) -> None:
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        index, sample = task
+        # The timeout of the task starts now, after the start-up of the worker
+        conn.send(("started", index))
+        try:
+            value, objectives = _run(factory, graph, sample, extract, solve_options)
+            message = ("done", index, value, objectives, None)
+        except BaseException:
+            message = ("done", index, None, [], traceback.format_exc())
+        try:
+            conn.send(message)
+        except Exception:
+            # The value can not be pickled
+            conn.send(("done", index, None, [], traceback.format_exc()))
+    conn.close()
+
+
+class _Process:
+    def __init__(self, context, args) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child, *args), daemon=True)
+        self.process.start()
+        child.close()
+        self.task: Optional[int] = None
+        # Time when the worker took the task (None until then)
+        self.started: Optional[float] = None
+
+    def submit(self, index: int, sample: Any) -> None:
+        self.conn.send((index, sample))
+        self.task = index
+        self.started = None
+
+    def elapsed(self, now: float) -> float:
+        return 0.0 if self.started is None else now - self.started
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+def solve_batch(
+    factory: Callable[..., Any],
+    samples: Iterable[Any],
+    graph: Optional[BaseGraph] = None,
+    processes: Optional[int] = None,
+    timeout: Optional[float] = None,
+    extract: Optional[Callable[[Any], Any]] = None,
+    mp_context: Optional[str] = None,
+    **solve_options,
+) -> Iterator[BatchResult]:
+    """Build and solve one problem per sample in a pool of processes.
+
+    The problem of each sample is created with `factory(graph, sample)` (or
+    `factory(sample)` if no graph is given) and solved with
+    `ProblemDef.solve(**solve_options)` in a worker process. The graph is
+    copied once to shared memory (see :meth:`BaseGraph.share`) and all the
+    workers use the same copy. Results are yielded as soon as they are
+    available, so their order is not the order of the samples (use
+    `BatchResult.index`).
+
+    Each sample runs isolated: errors raised while building or solving the
+    problem, workers that crash (e.g. a segfault in a solver) and samples
+    that take longer than `timeout` are reported as failed results, and the
+    worker is replaced by a new one. Use the `max_seconds` option to set the
+    time limit of the solver, and `timeout` as a hard limit.
+
+    Args:
+        factory (Callable): Function that returns the `ProblemDef` of a
+            sample. It can also return a tuple whose first element is the
+            problem, as `exact_steiner_tree` does. With the `spawn` or
+            `forkserver` start methods, it has to be defined at the top level
+            of a module.
+        samples (Iterable): Data of the samples.
+        graph (Optional[BaseGraph]): Graph shared by the samples, passed as
+            the first argument of `factory`.
+        processes (Optional[int]): Number of worker processes. Defaults to
+            the number of CPUs.
+        timeout (Optional[float]): Maximum time in seconds per sample,
+            counted from the moment a worker takes the sample (the start-up
+            of new workers is not included). The worker is killed when it is
+            exceeded.
+        extract (Optional[Callable]): Function that takes the solved problem
+            and returns the (picklable) value of the result. Defaults to the
+            values of the expressions of the problem, by name.
+        mp_context (Optional[str]): Start method of the processes (`fork`,
+            `spawn` or `forkserver`). Defaults to the platform default.
+        **solve_options: Arguments for `ProblemDef.solve` (solver,
+            max_seconds, verbosity, ...).
+
+    Yields:
+        BatchResult: Result of each sample, in order of completion.
+
+    Examples:
+    --------
+    >>> def problem(G, data):
+    ...     return cn.methods.runVanillaCarnival(data["inputs"], data["outputs"], G)[0]
+    >>> for r in cn.solve_batch(problem, samples, graph=G, timeout=60):
+    ...     print(r.index, r.objectives if r.ok else r.error)
+    """
+    if processes is not None and processes < 1:
+        raise ValueError("The number of processes has to be at least 1")
+    context = multiprocessing.get_context(mp_context)
+    tasks = iter(enumerate(samples))
+    shared = None
+    if graph is not None and not isinstance(graph, ReadOnlyGraph):
+        shared = graph = graph.share()
+    args = (factory, graph, extract, solve_options)
+    pool: List[_Process] = []
+    try:
+        for _ in range(processes or os.cpu_count() or 1):
+            task = next(tasks, None)
+            if task is None:
+                break
+            worker = _Process(context, args)
+            worker.submit(*task)
+            pool.append(worker)
+        while pool:
+            remaining = None
+            running = [w.started for w in pool if w.started is not None]
+            if timeout is not None and running:
+                now = time.monotonic()
+                remaining = max(0, min(running) + timeout - now)
+            ready = wait(
+                [w.conn for w in pool] + [w.process.sentinel for w in pool],
+                timeout=remaining,
+            )
+            now = time.monotonic()
+            for worker in list(pool):
+                result = None
+                replace = False
+                if worker.conn in ready or worker.process.sentinel in ready:
+                    try:
+                        message = worker.conn.recv()
+                        if message[0] == "started":
+                            worker.started = now
+                            if not worker.conn.poll():
+                                continue
+                            message = worker.conn.recv()
+                        _, index, value, objectives, error = message
+                        elapsed = worker.elapsed(time.monotonic())
+                        result = BatchResult(index, value, objectives, error, elapsed)
+                    except (EOFError, OSError):
+                        # Reap the process to get its exit code
+                        worker.process.join()
+                        code = worker.process.exitcode
+                        result = BatchResult(
+                            worker.task,
+                            error=f"Worker process exited with code {code}",
+                            elapsed=worker.elapsed(now),
+                        )
+                        replace = True
+                elif timeout is not None and worker.elapsed(now) >= timeout:
+                    result = BatchResult(
+                        worker.task,
+                        error=f"Timeout: sample not solved in {timeout} seconds",
+                        elapsed=worker.elapsed(now),
+                    )
+                    replace = True
+                if result is None:
+                    continue
+                if not result.ok:
+                    LOGGER.debug(f"Sample {result.index} failed: {result.error}")
+                task = next(tasks, None)
+                if replace:
+                    worker.kill()
+                    pool.remove(worker)
+                    if task is not None:
+                        worker = _Process(context, args)
+                        pool.append(worker)
+                if task is None:
+                    if worker in pool:
+                        worker.stop()
+                        pool.remove(worker)
+                else:
+                    worker.submit(*task)
+                yield result
+    finally:
+        for worker in pool:
+            worker.kill()
+        if shared is not None:
+            shared.unlink()
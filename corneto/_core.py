@@ -266,10 +266,14 @@ class BaseGraph(abc.ABC):
         custom_vertex = dict()
         custom_edge = dict()
         if problem:
-            if hasattr(problem, "symbols"):
+            if hasattr(problem, "expressions"):
+                problem = {k: v.value for k, v in problem.expressions.items()}
+            elif hasattr(problem, "symbols"):
                 problem = {k: v.value for k, v in problem.symbols.items()}
             # TODO: very ad-hoc, improve
-            c = [k for k in problem.keys() if k.startswith("reaction_sends_activation")]
+            c = [
+                k for k in problem.keys() if k.startswith("reaction_sends_activation_")
+            ]
             if len(c) > 1 and condition is None:
                 raise ValueError(
                     "Detected multiple conditions defined in problem, but a condition was not provided"
@@ -31,8 +31,8 @@ def _delegate(func):
     """A decorator that wraps a function to provide extended functionality
     when applied within a class. This decorator modifies the behavior
     of the function `func` to handle expression objects and delegate
-    calls to their underlying representations, while maintaining a set of
-    symbols associated with the expression objects.
+    calls to their underlying representations, while keeping track of the
+    expressions (and thus the symbols) the result is created from.
 
     The primary use of this decorator is to allow mathematical and
     operational transformations on proxy objects (like expressions in a
@@ -48,8 +48,8 @@ def _delegate(func):
 
     Returns:
     Callable: A wrapper function `_wrapper_func` that takes the same arguments as `func`.
-              This function intercepts calls to `func`, updates and manages symbols,
-              and delegates operations to the underlying computational backend if possible.
+              This function intercepts calls to `func`, records the operands of the
+              new expression, and delegates operations to the underlying computational backend if possible.
 
     Decorators:
     @wraps(func): This decorator is used to preserve the name, docstring, and other
@@ -77,19 +77,14 @@ def _delegate(func):
 
     @wraps(func)
     def _wrapper_func(self, *args, **kwargs):
-        symbols = set()
-        # if hasattr(self, '_proxy_symbols'):
-        #    symbols.update(self._proxy_symbols)
-        # if getattr(self, 'is_symbol', lambda: False)():
-        #    symbols.add(self)
+        symbols = []
         if len(args) > 0:
             # Function is providing 'other' expression
             if hasattr(args[0], "_expr"):
                 args = list(args)
-                symbols.update(args[0]._proxy_symbols)
-                if getattr(args[0], "is_symbol", lambda: False)():
-                    symbols.add(args[0])
-                args[0] = args[0]._expr  # symbol is lost
+                # Keep the expression as a source of the symbols of the result
+                symbols.append(args[0])
+                args[0] = args[0]._expr
         if hasattr(self._expr, func.__name__):
             # Check if its callable
             f = getattr(self._expr, func.__name__)
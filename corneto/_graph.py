@@ -12,6 +12,7 @@ from typing import (
     Iterable,
     List,
     Optional,
+    Sequence,
     Set,
     Tuple,
     Type,
@@ -21,7 +22,10 @@ from typing import (
 
 import numpy as np
 
+from corneto._graph_attr import AttributeTable, KeyedAttributeTable
+from corneto._graph_index import GraphIndex, _csr_gather
 from corneto._io import import_cobra_model
+from corneto._settings import LOGGER
 from corneto._types import CobraModel, Edge, NxDiGraph, NxGraph
 from corneto._util import unique_iter
 from corneto.utils import Attr, Attributes
@@ -29,6 +33,10 @@ from corneto.utils import Attr, Attributes
 T = TypeVar("T")
 
 
+class ReadOnlyGraphError(TypeError):
+    """Raised when modifying a read-only graph (views and shared graphs)."""
+
+
 class EdgeType(str, Enum):
     DIRECTED = "directed"
     UNDIRECTED = "undirected"
@@ -56,6 +64,22 @@ def _tpl(elements: Union[Any, Iterable[Any]]) -> Tuple[Any, ...]:
     return _wrap(elements, tuple, tuple)
 
 
+def _vertex_value(vertex_attr: Dict, vertex: Any) -> Number:
+    # Absolute value of the coefficient of a vertex in an edge (1 if not numeric)
+    if vertex in vertex_attr and Attr.VALUE.value in vertex_attr[vertex]:
+        coeff = vertex_attr[vertex].get(Attr.VALUE.value, 1)
+        if isinstance(coeff, Number):
+            return abs(coeff)
+    return 1
+
+
+def _as_list(values: Any) -> List:
+    # Numpy arrays are converted to lists of Python scalars
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+    return list(values)
+
+
 class BaseGraph(abc.ABC):
     """BaseGraph class for graphs or hypergraphs with directed/undirected/mixed
     and self edges
@@ -72,6 +96,90 @@ class BaseGraph(abc.ABC):
         """
         super().__init__()
         self._default_edge_type = default_edge_type
+        # Structural mutation counter and cache of derived structures
+        # (compiled index, incidence matrices, ...) built for a given version
+        self._version = 0
+        self._cache: Dict[str, Tuple[int, Any]] = dict()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Derived structures are rebuilt on demand
+        state["_cache"] = dict()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Graphs pickled with previous versions do not have these fields
+        self.__dict__.setdefault("_version", 0)
+        self.__dict__["_cache"] = dict()
+
+    def _touch(self) -> None:
+        # Invalidate derived structures after a structural change
+        self._version += 1
+        self._cache.clear()
+
+    def _cached(self, key: str, builder: Callable[[], T]) -> T:
+        entry = self._cache.get(key, None)
+        if entry is not None and entry[0] == self._version:
+            return entry[1]
+        value = builder()
+        self._cache[key] = (self._version, value)
+        return value
+
+    def _build_index(self) -> GraphIndex:
+        vidx = self._vertex_map()
+        etype = [
+            GraphIndex.direction_byte(self.get_attr_edge(i))
+            for i in range(self.num_edges)
+        ]
+        return GraphIndex.from_edges(self.E, vidx, etype)
+
+    def get_index(self) -> GraphIndex:
+        """Get the compiled integer index of the graph.
+
+        The index is built lazily and reused until the structure of the
+        graph changes (e.g., new vertices or edges are added).
+
+        Returns:
+            GraphIndex: Compiled index with CSR/CSC adjacency arrays.
+        """
+        return self._cached("index", self._build_index)
+
+    def _vertex_map(self) -> Dict[Any, int]:
+        # Vertex -> position. Subclasses can override it to provide a table
+        # maintained on insertion instead of a cached one.
+        return self._cached(
+            "vertex_map", lambda: {v: i for i, v in enumerate(self._get_vertices())}
+        )
+
+    def vertex_index(self, vertex: Any) -> int:
+        """Get the position of a vertex in the graph.
+
+        Args:
+            vertex (Any): The vertex.
+
+        Returns:
+            int: Position of the vertex (order of insertion).
+
+        Raises:
+            KeyError: If the vertex is not in the graph.
+        """
+        return self._vertex_map()[vertex]
+
+    def vertex_indices(self, vertices: Iterable) -> np.ndarray:
+        """Get the positions of a collection of vertices in the graph.
+
+        Args:
+            vertices (Iterable): The vertices.
+
+        Returns:
+            np.ndarray: Integer array with the position of each vertex.
+
+        Raises:
+            KeyError: If any of the vertices is not in the graph.
+        """
+        vidx = self._vertex_map()
+        return np.fromiter((vidx[v] for v in vertices), dtype=np.int64)
 
     @staticmethod
     def _parse_vertices(s):
@@ -151,15 +259,81 @@ class BaseGraph(abc.ABC):
     def _num_edges(self) -> int:
         raise NotImplementedError()
 
-    def edge_subgraph(self, edges: Union[Iterable[int], np.ndarray]):
-        if isinstance(edges, np.ndarray):
-            # Check if its a logical array:
-            if edges.dtype == bool:
-                edges = np.where(edges)[0]
-        return self.extract_subgraph(vertices=None, edges=edges)
+    def edge_subgraph(
+        self, edges: Union[Iterable[int], np.ndarray], view: bool = False
+    ) -> "BaseGraph":
+        """Get the subgraph with the given edges and their vertices.
+
+        Args:
+            edges (Union[Iterable[int], np.ndarray]): Indexes of the edges, or a
+                boolean mask over the edges.
+            view (bool): If True, return a read-only :class:`GraphView` that
+                shares the structure and attributes with this graph instead of
+                a copy. Defaults to False.
+
+        Returns:
+            BaseGraph: A new :class:`Graph`, or a :class:`GraphView` if `view`
+            is True.
+        """
+        edge_mask = np.zeros(self.num_edges, dtype=bool)
+        if isinstance(edges, np.ndarray) and edges.dtype == bool:
+            edge_mask[: len(edges)] = edges
+        else:
+            edge_mask[np.fromiter(edges, dtype=np.int64)] = True
+        index = self.get_index()
+        vertex_mask = np.zeros(self.num_vertices, dtype=bool)
+        for ptr, idx in [
+            (index.src_ptr, index.src_idx),
+            (index.tgt_ptr, index.tgt_idx),
+        ]:
+            owners = np.repeat(edge_mask, np.diff(ptr))
+            vertex_mask[idx[owners]] = True
+        g = GraphView(self, vertex_mask=vertex_mask, edge_mask=edge_mask)
+        return g if view else g.materialize()
+
+    def subgraph(self, vertices: Iterable, view: bool = False) -> "BaseGraph":
+        """Get the subgraph induced by a set of vertices.
+
+        Edges are included if all their vertices are in the set.
+
+        Args:
+            vertices (Iterable): Vertices of the subgraph. Vertices that are not
+                in the graph are ignored.
+            view (bool): If True, return a read-only :class:`GraphView` that
+                shares the structure and attributes with this graph instead of
+                a copy. Defaults to False.
+
+        Returns:
+            BaseGraph: A new :class:`Graph`, or a :class:`GraphView` if `view`
+            is True.
+        """
+        vidx = self._vertex_map()
+        vertex_mask = np.zeros(self.num_vertices, dtype=bool)
+        vertex_mask[[vidx[v] for v in set(vertices) if v in vidx]] = True
+        g = self._induced_subgraph(vertex_mask)
+        return g if view else g.materialize()
+
+    def _induced_subgraph(self, vertex_mask: np.ndarray) -> "GraphView":
+        edge_mask = self._induced_edge_mask(vertex_mask)
+        return GraphView(
+            self, vertex_mask=vertex_mask, edge_mask=edge_mask, induced=True
+        )
 
-    def subgraph(self, vertices: Iterable):
-        return self.extract_subgraph(vertices=vertices, edges=None)
+    def _induced_edge_mask(self, vertex_mask: np.ndarray) -> np.ndarray:
+        # Edges with at least one vertex and all of them in the mask
+        index = self.get_index()
+        outside = np.zeros(self.num_edges, dtype=np.int64)
+        size = np.zeros(self.num_edges, dtype=np.int64)
+        for ptr, idx in [
+            (index.src_ptr, index.src_idx),
+            (index.tgt_ptr, index.tgt_idx),
+        ]:
+            owners = np.repeat(np.arange(self.num_edges), np.diff(ptr))
+            outside += np.bincount(
+                owners, weights=~vertex_mask[idx], minlength=self.num_edges
+            ).astype(np.int64)
+            size += np.diff(ptr)
+        return (outside == 0) & (size > 0)
 
     @abc.abstractmethod
     def extract_subgraph(
@@ -204,12 +378,80 @@ class BaseGraph(abc.ABC):
             vertices = self.V
         return [self._get_vertex_attributes(v) for v in vertices]
 
+    def get_edge_attr_array(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        """Get the values of an edge attribute as an array.
+
+        Args:
+            key (str): Name of the attribute.
+            default (Any): Value for edges without the attribute. Defaults to None.
+            dtype (Any): Optional dtype of the array.
+
+        Returns:
+            np.ndarray: Array with one value per edge.
+        """
+        return np.array(self.get_attr_from_edges(key, default), dtype=dtype)
+
+    def set_edge_attr_array(self, key: str, values: Iterable[Any]) -> None:
+        """Set the values of an edge attribute from an array (one value per edge).
+
+        Args:
+            key (str): Name of the attribute.
+            values (Iterable[Any]): Values of the attribute.
+
+        Raises:
+            ValueError: If the number of values is different from the number of edges.
+        """
+        values = _as_list(values)
+        if len(values) != self.num_edges:
+            raise ValueError(
+                f"Expected {self.num_edges} values for {key}, got {len(values)}"
+            )
+        for i, value in enumerate(values):
+            self.get_attr_edge(i)[key] = value
+
+    def get_vertex_attr_array(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        """Get the values of a vertex attribute as an array (in the order of V).
+
+        Args:
+            key (str): Name of the attribute.
+            default (Any): Value for vertices without the attribute. Defaults to None.
+            dtype (Any): Optional dtype of the array.
+
+        Returns:
+            np.ndarray: Array with one value per vertex.
+        """
+        values = [a.get(key, default) for a in self.get_attr_vertices()]
+        return np.array(values, dtype=dtype)
+
+    def set_vertex_attr_array(self, key: str, values: Iterable[Any]) -> None:
+        """Set the values of a vertex attribute from an array (in the order of V).
+
+        Args:
+            key (str): Name of the attribute.
+            values (Iterable[Any]): Values of the attribute.
+
+        Raises:
+            ValueError: If the number of values is different from the number of
+                vertices.
+        """
+        values = _as_list(values)
+        if len(values) != self.num_vertices:
+            raise ValueError(
+                f"Expected {self.num_vertices} values for {key}, got {len(values)}"
+            )
+        for v, value in zip(self.V, values):
+            self.add_vertex(v, **{key: value})
+
     def get_edges(self, indexes: Iterable[int]) -> Iterable[Edge]:
         return (self.get_edge(i) for i in indexes)
 
     def get_vertex(self, index: int) -> Any:
         # O(n) unless vertices are also indexed by position.
-        # This method is added for convenience but shouldn't be required.
+        # Subclasses with a positional vertex table override it.
         for i, v in enumerate(self._get_vertices()):
             if i == index:
                 return v
@@ -255,21 +497,16 @@ class BaseGraph(abc.ABC):
     def _edges_by_dir(
         self, vertices, direction: Optional[str] = None
     ) -> Iterable[Tuple[int, Edge]]:
-        vertices = _tpl(vertices)
-        for idx, (s, t) in self.edges(vertices=vertices):
-            attr = self.get_attr_edge(idx)
-            etype = attr.get_attr(Attr.EDGE_TYPE)
-            if etype == EdgeType.DIRECTED:
-                if direction == "in":
-                    check = t
-                elif direction == "out":
-                    check = s
-                else:
-                    check = s | t
-                if len(check.intersection(vertices)) > 0:
-                    yield idx, (s, t)
-            else:
-                yield idx, (s, t)
+        index = self.get_index()
+        vids = self.vertex_indices(_tpl(vertices))
+        if direction == "in":
+            eidx = index.in_edges(vids)
+        elif direction == "out":
+            eidx = index.out_edges(vids)
+        else:
+            eidx = index.incident_edges(vids)
+        for i in eidx.tolist():
+            yield i, self.get_edge(i)
 
     def in_edges(self, vertices) -> Iterable[Tuple[int, Edge]]:
         yield from self._edges_by_dir(vertices, "in")
@@ -277,54 +514,26 @@ class BaseGraph(abc.ABC):
     def out_edges(self, vertices) -> Iterable[Tuple[int, Edge]]:
         yield from self._edges_by_dir(vertices, "out")
 
-    def _successors(self, vertex) -> Iterable:
-        def succ():
-            for i, (s, t) in self._edges_by_dir(vertex, direction="out"):
-                attr = self.get_attr_edge(i)
-                etype = attr.get_attr(Attr.EDGE_TYPE)
-                if etype == EdgeType.DIRECTED:
-                    if vertex == s or vertex in s:
-                        yield t
-                else:
-                    if vertex == s or vertex in s:
-                        yield t
-                    elif vertex == t or vertex in t:
-                        yield s
-
-        return unique_iter(chain.from_iterable(succ()))
+    def _adjacent(self, vertices, reverse=False, undirected=False) -> List:
+        indptr, indices = self.get_index().adjacency(
+            reverse=reverse, undirected=undirected
+        )
+        V = self.V
+        adjacent = (
+            indices[indptr[i] : indptr[i + 1]].tolist()
+            for i in self.vertex_indices(_tpl(vertices)).tolist()
+        )
+        return [V[j] for j in unique_iter(chain.from_iterable(adjacent))]
 
     def successors(self, vertices) -> Iterable:
-        vertices = _tpl(vertices)
-        return unique_iter(chain.from_iterable((self._successors(v) for v in vertices)))
-
-    def _predecessors(self, vertex) -> Iterable:
-        def succ():
-            for i, (s, t) in self._edges_by_dir(vertex, direction="in"):
-                attr = self.get_attr_edge(i)
-                etype = attr.get_attr(Attr.EDGE_TYPE)
-                if etype == EdgeType.DIRECTED:
-                    if vertex == t or vertex in t:
-                        yield s
-                else:
-                    if vertex == s or vertex in s:
-                        yield t
-                    elif vertex == t or vertex in t:
-                        yield s
-
-        return unique_iter(chain.from_iterable(succ()))
+        return self._adjacent(vertices)
 
     def predecessors(self, vertices) -> Iterable:
-        vertices = _tpl(vertices)
-        return unique_iter(
-            chain.from_iterable((self._predecessors(v) for v in vertices))
-        )
+        return self._adjacent(vertices, reverse=True)
 
     def neighbors(self, vertex) -> Iterable:
         # Ignores direction of edge
-        iter_vertices = (
-            s | t for _, (s, t) in self._edges_by_dir(vertex, direction=None)
-        )
-        return unique_iter(chain.from_iterable(iter_vertices))
+        return self._adjacent(vertex, undirected=True)
 
     def is_hypergraph(self) -> bool:
         return any(len(s) > 1 or len(t) > 1 for _, (s, t) in self.edges())
@@ -398,54 +607,200 @@ class BaseGraph(abc.ABC):
             eidxs.append(self.add_edge(s, t, type=type, **kwargs))
         return eidxs
 
+    def _add_edges_bulk(
+        self,
+        sources: Sequence[Tuple],
+        targets: Sequence[Tuple],
+        type: EdgeType,
+        source_values: Optional[Sequence[Tuple]] = None,
+        target_values: Optional[Sequence[Tuple]] = None,
+        columns: Optional[Dict[str, List]] = None,
+    ) -> List[int]:
+        # Default implementation, adding edges one by one. Subclasses can
+        # override it to build their internal structures in a single pass.
+        columns = columns or dict()
+        eidxs = []
+        for j, (s, t) in enumerate(zip(sources, targets)):
+            if source_values is not None:
+                s = dict(zip(s, source_values[j]))
+            if target_values is not None:
+                t = dict(zip(t, target_values[j]))
+            attr = {k: col[j] for k, col in columns.items()}
+            eidxs.append(self.add_edge(s, t, type=type, **attr))
+        return eidxs
+
+    def _add_edges_by_index(
+        self,
+        source: np.ndarray,
+        target: np.ndarray,
+        type: EdgeType,
+        columns: Dict[str, List],
+    ) -> List[int]:
+        # Default implementation, mapping the positions to the vertices.
+        # Subclasses can override it to use the positions directly.
+        V = list(self._get_vertices())
+        return self._add_edges_bulk(
+            [(V[i],) for i in source.tolist()],
+            [(V[i],) for i in target.tolist()],
+            type=type,
+            columns=columns,
+        )
+
+    def add_edges_from_arrays(
+        self,
+        source: Sequence,
+        target: Sequence,
+        type: EdgeType = EdgeType.DIRECTED,
+        indices: bool = False,
+        **kwargs,
+    ) -> List[int]:
+        """Add many edges at once from arrays of vertices and edge attributes.
+
+        Equivalent to calling `add_edge(source[i], target[i], **attributes)`
+        for each edge, but much faster for large graphs.
+
+        Args:
+            source (Sequence): Source vertex of each edge.
+            target (Sequence): Target vertex of each edge.
+            type (EdgeType): Type of the edges. Defaults to EdgeType.DIRECTED.
+            indices (bool): If True, `source` and `target` are positions of
+                vertices already in the graph (see `vertex_indices`) instead
+                of vertices. Defaults to False.
+            **kwargs: Edge attributes, as arrays with one value per edge
+                (e.g., `interaction=signs, weight=weights`).
+
+        Returns:
+            List[int]: Indexes of the new edges.
+
+        Raises:
+            ValueError: If the length of the arrays is not the same, or if
+                `indices` is True and a position is not a vertex of the graph.
+        """
+        if indices:
+            source = np.asarray(source, dtype=np.int64).ravel()
+            target = np.asarray(target, dtype=np.int64).ravel()
+        else:
+            source, target = _as_list(source), _as_list(target)
+        if len(source) != len(target):
+            raise ValueError(
+                f"Source ({len(source)}) and target ({len(target)}) arrays "
+                "must have the same length"
+            )
+        columns = {k: _as_list(v) for k, v in kwargs.items()}
+        for k, v in columns.items():
+            if len(v) != len(source):
+                raise ValueError(
+                    f"Attribute {k} has {len(v)} values, expected {len(source)}"
+                )
+        if indices:
+            for ids in (source, target):
+                if len(ids) > 0 and (ids.min() < 0 or ids.max() >= self.num_vertices):
+                    raise ValueError(
+                        f"Vertex positions must be in [0, {self.num_vertices})"
+                    )
+            return self._add_edges_by_index(source, target, type, columns)
+        return self._add_edges_bulk(
+            [(v,) for v in source],
+            [(v,) for v in target],
+            type=type,
+            columns=columns,
+        )
+
     def add_vertex(self, v: Any, **kwargs) -> int:
         return self._add_vertex(v, **kwargs)
 
     def add_vertices(self, vertices: List, **kwargs) -> List[int]:
         return [self.add_vertex(v, **kwargs) for v in vertices]
 
+    def _build_incidence(self, values: bool) -> Tuple[np.ndarray, ...]:
+        # Non-zero entries of the incidence matrix, ordered by edge (sources
+        # first, then targets). Vertices in both sides of an edge appear twice.
+        index = self.get_index()
+        n_src = np.diff(index.src_ptr)
+        n_tgt = np.diff(index.tgt_ptr)
+        edges = np.arange(self.num_edges, dtype=np.int64)
+        rows = np.concatenate([index.src_idx, index.tgt_idx])
+        cols = np.concatenate([np.repeat(edges, n_src), np.repeat(edges, n_tgt)])
+        side = np.concatenate(
+            [np.zeros(len(index.src_idx), dtype=np.int64), np.ones_like(index.tgt_idx)]
+        )
+        data = np.where(side > 0, 1.0, -1.0)
+        if values:
+            src_values, tgt_values = [], []
+            for j, (s, t) in enumerate(self.E):
+                attr = self.get_attr_edge(j)
+                src_values.extend(
+                    _vertex_value(attr.get(Attr.SOURCE_ATTR.value, {}), v) for v in s
+                )
+                tgt_values.extend(
+                    _vertex_value(attr.get(Attr.TARGET_ATTR.value, {}), v) for v in t
+                )
+            data *= np.array(src_values + tgt_values, dtype=float)
+        order = np.argsort(2 * cols + side, kind="stable")
+        rows, cols, data = rows[order], cols[order], data[order]
+        nz = data != 0
+        return data[nz], rows[nz], cols[nz]
+
+    def _incidence(self, values: bool) -> Tuple[np.ndarray, ...]:
+        return self._cached(
+            f"incidence_{values}", lambda: self._build_incidence(values=values)
+        )
+
     def get_vertex_incidence_matrix_as_lists(self, values: bool = False):
-        row_ind = []
-        col_ind = []
-        data = []
-        V_indexes = {v: i for i, v in enumerate(self.V)}
-        for j, e in enumerate(self.E):
-            attr = self.get_attr_edge(j)
-            s, t = e
-            for v in s:
-                value = -1
-                if values:
-                    v_attr = attr.get_attr(Attr.SOURCE_ATTR)
-                    if v in v_attr:
-                        if Attr.VALUE.value in v_attr[v]:
-                            coeff = v_attr[v].get_attr(Attr.VALUE, 1)
-                            # If coeff is not a number:
-                            if not isinstance(coeff, Number):
-                                coeff = 1
-                            value = -1 * abs(coeff)
-                if value != 0:
-                    row_ind.append(V_indexes[v])
-                    col_ind.append(j)
-                    data.append(value)
-            for v in t:
-                value = 1
-                if values:
-                    v_attr = attr.get_attr(Attr.TARGET_ATTR)
-                    if v in v_attr:
-                        if Attr.VALUE.value in v_attr[v]:
-                            coeff = v_attr[v].get_attr(Attr.VALUE, 1)
-                            # If coeff is not a number:
-                            if not isinstance(coeff, Number):
-                                coeff = 1
-                            value = abs(coeff)
-                if value != 0:
-                    row_ind.append(V_indexes[v])
-                    col_ind.append(j)
-                    data.append(value)
+        """Get the non-zero entries of the vertex incidence matrix.
+
+        The entries are computed once per version of the graph and cached. The
+        cache is invalidated when vertices or edges are added, but not when the
+        values of existing edges are modified in place.
+
+        Args:
+            values (bool): If True, use the values (e.g. stoichiometric coefficients)
+                of the vertices in the edges instead of -1/1. Defaults to False.
+
+        Returns:
+            Tuple: `(data, (row_ind, col_ind))` arrays, in the format accepted by
+            sparse matrix constructors.
+        """
+        data, row_ind, col_ind = self._incidence(values)
         return data, (row_ind, col_ind)
 
-    def vertex_incidence_matrix(self, values: bool = False):
-        # Returns V x E matrix
+    def _sparse_incidence(self, values: bool):
+        from scipy import sparse  # type: ignore
+
+        data, rows, cols = self._incidence(values)
+        # Keep the last entry of repeated (vertex, edge) pairs, as in the
+        # dense matrix (targets override sources in self loops)
+        keys = (rows * max(self.num_edges, 1) + cols)[::-1]
+        _, last = np.unique(keys, return_index=True)
+        last = len(keys) - 1 - last
+        return sparse.csr_array(
+            (data[last], (rows[last], cols[last])),
+            shape=(self.num_vertices, self.num_edges),
+        )
+
+    def vertex_incidence_matrix(self, values: bool = False, sparse: bool = False):
+        """Get the vertex incidence matrix (V x E) of the graph.
+
+        Sources of an edge have negative values and targets positive values.
+
+        Args:
+            values (bool): If True, use the values (e.g. stoichiometric coefficients)
+                of the vertices in the edges instead of -1/1. Defaults to False.
+            sparse (bool): If True, return a scipy CSR array instead of a dense
+                array. The sparse matrix is cached until the graph structure changes
+                and should not be modified. Defaults to False.
+
+        Returns:
+            Incidence matrix, as a dense numpy array or a scipy CSR array.
+        """
+        if sparse:
+            try:
+                return self._cached(
+                    f"sparse_incidence_{values}",
+                    lambda: self._sparse_incidence(values=values),
+                )
+            except ImportError:
+                LOGGER.warning("Scipy not installed, using a dense matrix instead.")
         A = np.zeros((self.num_vertices, self.num_edges))
         data, (row_ind, col_ind) = self.get_vertex_incidence_matrix_as_lists(values)
         A[row_ind, col_ind] = data
@@ -455,42 +810,73 @@ class BaseGraph(abc.ABC):
         self, starting_vertices: Any, reverse: bool = False, undirected: bool = False
     ) -> Dict[Any, int]:
         starting_vertices = _tpl(starting_vertices)
-        next_vertices = self.successors
         if reverse and undirected:
             raise ValueError("Reverse and undirected are mutually exclusive")
-        if reverse:
-            next_vertices = self.predecessors
-        if undirected:
-            next_vertices = self.neighbors
-        layer = 0
-        visited = {v: layer for v in starting_vertices}
-        succ = next_vertices(starting_vertices)
-        while succ:
-            layer += 1
-            new = set()
-            for s in succ:
-                curr_layer = visited.get(s, np.inf)
-                if layer < curr_layer:
-                    visited[s] = layer
-                    new.add(s)
-            if len(new) == 0:
-                break
-            succ = next_vertices(new)
+        start = self.vertex_indices(starting_vertices)
+        dist = self.get_index().bfs(start, reverse=reverse, undirected=undirected)
+        visited = {v: 0 for v in starting_vertices}
+        reached = np.flatnonzero(dist > 0)
+        reached = reached[np.argsort(dist[reached], kind="stable")]
+        V = self.V
+        for i, d in zip(reached.tolist(), dist[reached].tolist()):
+            visited[V[i]] = d
         return visited
 
+    def _reachable_mask(
+        self,
+        source: Optional[List] = None,
+        target: Optional[List] = None,
+    ) -> np.ndarray:
+        index = self.get_index()
+        mask = np.ones(self.num_vertices, dtype=bool)
+        if source is not None:
+            mask &= index.bfs(self.vertex_indices(source)) >= 0
+        if target is not None:
+            mask &= index.bfs(self.vertex_indices(target), reverse=True) >= 0
+        return mask
+
+    def reachable_masks(self, sources: List[List], targets: List[List]) -> np.ndarray:
+        """Get the vertices between each pair of source and target sets.
+
+        All the pairs are solved together with a bit-parallel search (see
+        `GraphIndex.reachable`), which is much faster than pruning the graph
+        once per pair (e.g. once per condition).
+
+        Args:
+            sources (List[List]): Source vertices of each pair.
+            targets (List[List]): Target vertices of each pair.
+
+        Returns:
+            np.ndarray: Boolean array (num_vertices x number of pairs), True if
+            the vertex is reachable from the sources and reaches the targets of
+            the pair.
+        """
+        return self.get_index().reachable_between(
+            [self.vertex_indices(s) for s in sources],
+            [self.vertex_indices(t) for t in targets],
+        )
+
     def prune(
         self,
         source: Optional[List] = None,
         target: Optional[List] = None,
-    ) -> "Graph":
-        if source is None:
-            source = list(self.V)
-        if target is None:
-            target = list(self.V)
-        forward = set(self.bfs(source).keys())
-        backward = set(self.bfs(target, reverse=True).keys())
-        reachable = list(forward.intersection(backward))
-        return self.subgraph(reachable)
+        view: bool = False,
+    ) -> "BaseGraph":
+        """Get the subgraph of the vertices reachable from source and reaching target.
+
+        Args:
+            source (Optional[List]): Source vertices (all if not provided).
+            target (Optional[List]): Target vertices (all if not provided).
+            view (bool): If True, return a read-only :class:`GraphView` that
+                shares the structure and attributes with this graph instead of
+                a copy. Defaults to False.
+
+        Returns:
+            BaseGraph: A new :class:`Graph`, or a :class:`GraphView` if `view`
+            is True.
+        """
+        g = self._induced_subgraph(self._reachable_mask(source, target))
+        return g if view else g.materialize()
 
     def plot(self, **kwargs):
         Gv = self.to_graphviz(**kwargs)
@@ -557,11 +943,12 @@ class BaseGraph(abc.ABC):
         A: np.ndarray,
         vertex_ids: Union[List[str], np.ndarray],
         edge_ids: Union[List[str], np.ndarray],
+        **kwargs,
     ):
         g = Graph()
         if len(vertex_ids) != A.shape[0]:
             raise ValueError(
-                """The number of rows in A matrix is different from 
+                """The number of rows in A matrix is different from
                 the number of vertex ids"""
             )
         if len(edge_ids) != A.shape[1]:
@@ -571,23 +958,88 @@ class BaseGraph(abc.ABC):
             )
         for v in vertex_ids:
             g.add_vertex(v)
-        for j, v in enumerate(edge_ids):
-            values = A[:, j]
-            idx = np.flatnonzero(values)
-            coeffs = values[idx]
-            v_names = [vertex_ids[i] for i in idx]
-            s = {n: val for n, val in zip(v_names, coeffs) if val < 0}
-            t = {n: val for n, val in zip(v_names, coeffs) if val > 0}
-            g.add_edge(s, t, id=v)
+        # Non-zero entries sorted by column (edge), then by row (vertex)
+        if hasattr(A, "tocoo"):
+            C = A.tocsc().tocoo()
+            cols, rows, coeffs = C.col, C.row, C.data
+            nz = coeffs != 0
+            cols, rows, coeffs = cols[nz], rows[nz], coeffs[nz]
+        else:
+            A = np.asarray(A)
+            cols, rows = np.nonzero(A.T)
+            coeffs = A[rows, cols]
+        names = np.empty(len(vertex_ids), dtype=object)
+        names[:] = list(vertex_ids)
+        n_e = A.shape[1]
+
+        def _split(mask):
+            ptr = np.cumsum(np.bincount(cols[mask], minlength=n_e))[:-1]
+            return (
+                [tuple(x) for x in np.split(names[rows[mask]], ptr)],
+                [tuple(x) for x in np.split(coeffs[mask].tolist(), ptr)],
+            )
+
+        sources, source_values = _split(coeffs < 0)
+        targets, target_values = _split(coeffs > 0)
+        columns = {k: _as_list(v) for k, v in kwargs.items()}
+        columns = {"id": _as_list(edge_ids), **columns}
+        g._add_edges_bulk(
+            sources,
+            targets,
+            type=EdgeType.DIRECTED,
+            source_values=source_values,
+            target_values=target_values,
+            columns=columns,
+        )
         return g
 
-    def save(self, filename: str, compressed: Optional[bool] = True) -> None:
+    def save(
+        self,
+        filename: str,
+        compressed: Optional[bool] = True,
+        format: Optional[str] = None,
+    ) -> None:
+        """Save the graph to disk.
+
+        The default format is a versioned columnar binary format (see
+        :mod:`corneto._graph_io`) with the structure of the graph and typed
+        attribute columns, stored in a single ``.npz`` file (``format="npz"``)
+        or in a directory of ``.npy`` files (``format="dir"``). Graphs can also
+        be saved as a (lzma compressed) pickle with ``format="pickle"``.
+
+        Args:
+            filename (str): Name of the file or directory. Extensions (``.npz``,
+                ``.pkl``, ``.xz``) are added if missing.
+            compressed (Optional[bool]): Compress the data. For the columnar
+                format, arrays are compressed with zstd or lz4 if available (if
+                not, they are stored uncompressed). Compressed arrays can not be
+                memory-mapped when loading. Defaults to True.
+            format (Optional[str]): "npz", "dir" or "pickle". By default, "pickle"
+                is used if the filename ends with ``.pkl`` or ``.pkl.xz``, and
+                "npz" otherwise.
+
+        Raises:
+            ValueError: If the filename is empty or the format is not valid.
+        """
         import pickle
 
         if not filename:
             raise ValueError("Filename must not be empty.")
 
-        if not filename.endswith(".pkl"):
+        if format is None:
+            format = "pickle" if filename.endswith((".pkl", ".pkl.xz")) else "npz"
+        if format in ("npz", "dir"):
+            from corneto._graph_io import save_graph
+
+            if format == "npz" and not filename.endswith(".npz"):
+                filename += ".npz"
+            compression = "auto" if compressed else None
+            save_graph(self, filename, container=format, compression=compression)
+            return
+        if format != "pickle":
+            raise ValueError(f"Unknown format {format}, use 'npz', 'dir' or 'pickle'")
+
+        if not filename.endswith((".pkl", ".pkl.xz")):
             filename += ".pkl"
 
         if compressed:
@@ -601,10 +1053,60 @@ class BaseGraph(abc.ABC):
             with open(filename, "wb") as f:
                 pickle.dump(self, f)
 
+    def share(self) -> "BaseGraph":
+        """Copy the graph to shared memory, to use it from other processes.
+
+        The returned graph is read-only and can be sent to worker processes
+        without copies (see :class:`~corneto._graph_readonly.ReadOnlyGraph`).
+        Release the memory with `unlink` when the workers finish, or use the
+        returned graph as a context manager.
+
+        Returns:
+            ReadOnlyGraph: Read-only copy of the graph in shared memory.
+        """
+        from corneto._graph_readonly import ReadOnlyGraph
+
+        return ReadOnlyGraph.share(self)
+
     @staticmethod
-    def load(filename: str) -> "BaseGraph":
+    def load(
+        filename: str, mmap_mode: Optional[str] = None, read_only: bool = False
+    ) -> "BaseGraph":
+        """Load a graph saved with `save`.
+
+        The format (columnar ``.npz`` file or directory, or a pickle compressed
+        with gzip, bz2, lzma or zip) is detected automatically.
+
+        Args:
+            filename (str): Name of the file or directory.
+            mmap_mode (Optional[str]): Memory-map the uncompressed arrays of a
+                graph saved in the columnar format ("r", "r+" or "c", see
+                `numpy.memmap`). Ignored for pickles. Defaults to None.
+            read_only (bool): Open a graph saved in the columnar format as a
+                :class:`~corneto._graph_readonly.ReadOnlyGraph`, which uses the
+                memory-mapped arrays without building the graph in memory.
+                Defaults to False.
+
+        Returns:
+            BaseGraph: The loaded graph.
+
+        Raises:
+            ValueError: If `read_only` is True and the file is not in the
+                columnar format.
+        """
         import pickle
 
+        from corneto._graph_io import is_graph_file, load_graph
+
+        if is_graph_file(filename):
+            if read_only:
+                from corneto._graph_readonly import ReadOnlyGraph
+
+                return ReadOnlyGraph.open(filename)
+            return load_graph(filename, mmap_mode=mmap_mode)
+        if read_only:
+            raise ValueError(f"{filename} is not in the columnar format")
+
         if filename.endswith(".gz"):
             import gzip
 
@@ -640,53 +1142,63 @@ class BaseGraph(abc.ABC):
         expand_outputs=True,
         max_printed_outputs=10,
     ):
-        visited = set(input_nodes)
-        current = set(input_nodes)
-        unreached_outputs = set(output_nodes)
-        outs = set(output_nodes)
-        selected_edges = set()
+
+        index = self.get_index()
+        V = self.V
+        first_target = index.first_target()
+        allowed = None
+        if subset_edges is not None:
+            allowed = np.zeros(self.num_edges, dtype=bool)
+            allowed[np.fromiter(subset_edges, dtype=np.int64)] = True
+        vertices = self._vertex_map()
+        visited = np.zeros(self.num_vertices, dtype=bool)
+        current = self.vertex_indices(v for v in set(input_nodes) if v in vertices)
+        visited[current] = True
+        is_output = np.zeros(self.num_vertices, dtype=bool)
+        is_output[
+            self.vertex_indices(v for v in set(output_nodes) if v in vertices)
+        ] = True
+        unreached_outputs = len(set(output_nodes))
+        selected = np.zeros(self.num_edges, dtype=bool)
         layer = 0
         if verbose:
             print("Starting reachability analysis...")
             print(f"L{layer:<3}: {len(input_nodes):<4} > input(s)")
-        while current is not None and len(current) > 0:
+        while current.size > 0:
             layer += 1
-            new = set()
-            for v in current:
-                for i, (s, t) in self.out_edges(v):
-                    if subset_edges is not None and i not in subset_edges:
-                        continue
-                    # Add only if t is a new node
-                    nt = list(t)
-                    if len(nt) == 0:
-                        continue
-                    vt = nt[0]
-                    if vt not in visited:
-                        new |= {vt}
-                        selected_edges.add(i)
+            edges, _ = _csr_gather(index.out_ptr, index.out_idx, current)
+            if allowed is not None:
+                edges = edges[allowed[edges]]
+            vt = first_target[edges]
+            # Add only if the target is a new node
+            valid = vt >= 0
+            valid[valid] = ~visited[vt[valid]]
+            selected[edges[valid]] = True
+            new = np.unique(vt[valid])
             # How many are output nodes?
-            reached_outputs = outs.intersection(new)
-            unreached_outputs -= reached_outputs
+            reached = new[is_output[new]]
+            unreached_outputs -= reached.size
             if verbose:
-                print(f"L{layer:<3}: {len(new):<4}", end="")
-                if len(reached_outputs) > 0:
-                    if len(reached_outputs) <= max_printed_outputs:
+                print(f"L{layer:<3}: {new.size:<4}", end="")
+                if reached.size > 0:
+                    reached_outputs = [V[i] for i in reached.tolist()]
+                    if reached.size <= max_printed_outputs:
                         str_reached = "/".join(reached_outputs)
                     else:
                         # Get only the first max_printed_outputs items
                         str_reached = (
-                            "/".join(list(reached_outputs)[:max_printed_outputs])
-                            + "..."
+                            "/".join(reached_outputs[:max_printed_outputs]) + "..."
                         )
-                    print(f" > {len(reached_outputs):<4} output(s): {str_reached}")
+                    print(f" > {reached.size:<4} output(s): {str_reached}")
                 else:
                     print("")
-            visited |= new
-            current = set(new)
+            visited[new] = True
+            current = new
             if not expand_outputs:
-                current -= reached_outputs
-            if early_stop and len(unreached_outputs) == 0:
+                current = current[~is_output[current]]
+            if early_stop and unreached_outputs == 0:
                 break
+        selected_edges = set(np.flatnonzero(selected).tolist())
         if verbose:
             print(f"Finished ({len(selected_edges)} selected edges).")
         return selected_edges
@@ -710,6 +1222,11 @@ class Graph(BaseGraph):
     ----------
     default_edge_type
         Default edge type :class:`~corneto._graph.EdgeType`.
+    columnar
+        If True, edge and vertex attributes are stored in typed NumPy columns
+        (:class:`~corneto._graph_attr.AttributeTable`) instead of one dict per
+        edge/vertex. Attributes are still accessible per edge/vertex as dict-like
+        views, and in bulk with `get_edge_attr_array` without copies.
 
     Examples:
     --------
@@ -720,7 +1237,10 @@ class Graph(BaseGraph):
     """
 
     def __init__(
-        self, default_edge_type: EdgeType = EdgeType.DIRECTED, **kwargs
+        self,
+        default_edge_type: EdgeType = EdgeType.DIRECTED,
+        columnar: bool = False,
+        **kwargs,
     ) -> None:
         super().__init__(default_edge_type=default_edge_type)
         # Allow edges with same s/t vertices. Edges are represented as a tuple
@@ -729,18 +1249,30 @@ class Graph(BaseGraph):
         # the same set of source/target node(s).
         self._edges: List[Edge] = []
         # Edge properties, including vertex-edge properties
-        self._edge_attr: List[Attributes] = []
+        self._edge_attr: Union[List[Attributes], AttributeTable] = (
+            AttributeTable() if columnar else []
+        )
         # Vertices (in order of addition). Since vertices are unique
         # they are indexed. The vertex has to be any indexable object.
         # Vertex -> Indexes of edges where they appear
         self._vertices: Dict[Any, Set[int]] = OrderedDict()
+        # Bidirectional vertex <-> position table
+        self._vertex_index: Dict[Any, int] = dict()
+        self._vertex_list: List[Any] = []
         # Vertex properties
-        self._vertex_attr: Dict[Any, Attributes] = dict()
+        self._vertex_attr: Union[Dict[Any, Attributes], KeyedAttributeTable] = (
+            KeyedAttributeTable(self._vertex_index) if columnar else dict()
+        )
         # Global graph attributes
         self._graph_attr: Attributes = Attributes()
         # Add custom graph params
         self._graph_attr.update(kwargs)
 
+    @property
+    def columnar(self) -> bool:
+        """True if attributes are stored in typed NumPy columns."""
+        return isinstance(self._edge_attr, AttributeTable)
+
     def _add_edge(
         self,
         source: Iterable,
@@ -750,6 +1282,7 @@ class Graph(BaseGraph):
         edge_target_attr: Optional[Attributes] = None,
         **kwargs,
     ) -> int:
+        self._touch()
         sv = frozenset(source)
         tv = frozenset(target)
         # uv = sv | tv
@@ -775,16 +1308,96 @@ class Graph(BaseGraph):
                 self._vertices[v].add(idx)
             else:
                 self._vertices[v] = {idx}
+                self._vertex_index[v] = len(self._vertex_list)
+                self._vertex_list.append(v)
             seen.add(v)
         return idx
 
+    def _add_edges_bulk(
+        self,
+        sources: Sequence[Tuple],
+        targets: Sequence[Tuple],
+        type: EdgeType,
+        source_values: Optional[Sequence[Tuple]] = None,
+        target_values: Optional[Sequence[Tuple]] = None,
+        columns: Optional[Dict[str, List]] = None,
+    ) -> List[int]:
+        self._touch()
+        attr_columns = self._edge_type_column(len(sources), type, columns)
+        # Per vertex values (e.g. stoichiometric coefficients)
+        for key, vertices, values in [
+            (Attr.SOURCE_ATTR.value, sources, source_values),
+            (Attr.TARGET_ATTR.value, targets, target_values),
+        ]:
+            if values is not None:
+                attr_columns[key] = [
+                    Attributes((v, Attributes({Attr.VALUE.value: c})) for v, c in vc)
+                    for vc in map(zip, vertices, values)
+                ]
+        self._extend_edge_attr(len(sources), attr_columns)
+        incidence = self._vertices
+        start = len(self._edges)
+        for idx, (s, t) in enumerate(zip(sources, targets), start):
+            self._edges.append((frozenset(s), frozenset(t)))
+            for v in chain(s, t):
+                incident = incidence.get(v, None)
+                if incident is None:
+                    incidence[v] = {idx}
+                    self._vertex_index[v] = len(self._vertex_list)
+                    self._vertex_list.append(v)
+                else:
+                    incident.add(idx)
+        return list(range(start, len(self._edges)))
+
+    @staticmethod
+    def _edge_type_column(
+        n: int, type: EdgeType, columns: Optional[Dict[str, List]]
+    ) -> Dict[str, List]:
+        etype = type.value if isinstance(type, Enum) else type
+        return {Attr.EDGE_TYPE.value: [etype] * n, **(columns or dict())}
+
+    def _extend_edge_attr(self, n: int, attr_columns: Dict[str, List]) -> None:
+        if self.columnar:
+            self._edge_attr.extend_columns(n, attr_columns)
+        else:
+            keys = list(attr_columns.keys())
+            for row in zip(*attr_columns.values()):
+                self._edge_attr.append(Attributes(zip(keys, row)))
+
+    def _add_edges_by_index(
+        self,
+        source: np.ndarray,
+        target: np.ndarray,
+        type: EdgeType,
+        columns: Dict[str, List],
+    ) -> List[int]:
+        # Edges between single vertices given by position. The (frozen) sets
+        # of each vertex are created once and shared by all its edges.
+        self._touch()
+        n = len(source)
+        self._extend_edge_attr(n, self._edge_type_column(n, type, columns))
+        used = np.unique(np.concatenate([source, target])).tolist()
+        vertices = [self._vertex_list[i] for i in used]
+        single = dict(zip(used, (frozenset((v,)) for v in vertices)))
+        incident = dict(zip(used, (self._vertices[v] for v in vertices)))
+        start = len(self._edges)
+        s_list, t_list = source.tolist(), target.tolist()
+        self._edges.extend(zip(map(single.get, s_list), map(single.get, t_list)))
+        for idx, s, t in zip(range(start, start + n), s_list, t_list):
+            incident[s].add(idx)
+            incident[t].add(idx)
+        return list(range(start, start + n))
+
     def _add_vertex(self, vertex: Any, **kwargs) -> int:
         if vertex not in self._vertices:
+            self._touch()
             self._vertices[vertex] = set()
+            idx = len(self._vertex_list)
+            self._vertex_index[vertex] = idx
+            self._vertex_list.append(vertex)
             self._vertex_attr[vertex] = Attributes(kwargs)
-            idx = len(self._vertices) - 1
         else:
-            idx = list(self._vertices).index(vertex)
+            idx = self._vertex_index[vertex]
             if vertex in self._vertex_attr:
                 va = self._vertex_attr[vertex]
             else:
@@ -793,11 +1406,76 @@ class Graph(BaseGraph):
             va.update(kwargs)
         return idx
 
+    def add_vertices(self, vertices: List, **kwargs) -> List[int]:
+        if kwargs:
+            return super().add_vertices(vertices, **kwargs)
+        # Vertices without attributes are added in a single pass
+        new = [v for v in dict.fromkeys(vertices) if v not in self._vertices]
+        if len(new) > 0:
+            self._touch()
+            start = len(self._vertex_list)
+            self._vertex_list.extend(new)
+            self._vertex_index.update(zip(new, range(start, start + len(new))))
+            self._vertices.update((v, set()) for v in new)
+        if not self.columnar:
+            for v in vertices:
+                self._vertex_attr.setdefault(v, Attributes())
+        return [self._vertex_index[v] for v in vertices]
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if "_vertex_list" not in state:
+            # Graphs pickled with previous versions have no vertex table
+            self._vertex_list = list(self._vertices.keys())
+            self._vertex_index = {v: i for i, v in enumerate(self._vertex_list)}
+
     def get_edge(self, index: int) -> Edge:
         return self._edges[index]
 
+    def get_attr_from_edges(self, attr: str, default: Any = None) -> List[Any]:
+        if self.columnar:
+            return self._edge_attr.column(attr, default=default).tolist()
+        return super().get_attr_from_edges(attr, default=default)
+
+    def get_edge_attr_array(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        if self.columnar:
+            # View of the column if all edges have the attribute
+            return self._edge_attr.column(key, default=default, dtype=dtype)
+        return super().get_edge_attr_array(key, default=default, dtype=dtype)
+
+    def set_edge_attr_array(self, key: str, values: Iterable[Any]) -> None:
+        if self.columnar:
+            self._edge_attr.set_column(key, values)
+        else:
+            super().set_edge_attr_array(key, values)
+
+    def get_vertex_attr_array(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        if self.columnar:
+            return self._vertex_attr.column(key, default=default, dtype=dtype)
+        return super().get_vertex_attr_array(key, default=default, dtype=dtype)
+
+    def set_vertex_attr_array(self, key: str, values: Iterable[Any]) -> None:
+        if self.columnar:
+            self._vertex_attr.set_column(key, values)
+        else:
+            super().set_vertex_attr_array(key, values)
+
+    def get_vertex(self, index: int) -> Any:
+        if not 0 <= index < len(self._vertex_list):
+            raise IndexError(
+                f"Vertex index {index} out of range [0 - {self.num_vertices - 1}]"
+            )
+        return self._vertex_list[index]
+
+    def _vertex_map(self) -> Dict[Any, int]:
+        return self._vertex_index
+
     def _get_vertices(self) -> Iterable:
-        return iter(self._vertices.keys())
+        return iter(self._vertex_list)
 
     def _get_incident_edges(self, vertex) -> Iterable[int]:
         return self._vertices[vertex]
@@ -824,7 +1502,7 @@ class Graph(BaseGraph):
     ):
         # Graph induced by the set of vertices + selected edges
         n_v = 0
-        g = Graph()
+        g = Graph(columnar=self.columnar)
         g._graph_attr = deepcopy(self._graph_attr)
         if vertices is not None:
             vertices = set(vertices)
@@ -876,6 +1554,7 @@ class Graph(BaseGraph):
         G = self.copy()
         rev_edges = [(t, s) for s, t in G.E]
         G._edges = rev_edges
+        G._touch()
         # TODO: Simplify handling edge attributes
         for attr in G._edge_attr:
             s = attr.get_attr(Attr.SOURCE_ATTR, Attributes())
@@ -889,7 +1568,7 @@ class Graph(BaseGraph):
         filter_vertex: Optional[Callable[[Any], bool]] = None,
         filter_edge: Optional[Callable[[int], bool]] = None,
     ):
-        g = Graph()
+        g = Graph(columnar=self.columnar)
         g._graph_attr = deepcopy(self._graph_attr)
         if filter_vertex is not None:
             vertices = set(filter(filter_vertex, self._get_vertices()))
@@ -910,57 +1589,6 @@ class Graph(BaseGraph):
                 attr = deepcopy(self.get_attr_edge(i))
                 g.add_edge(s, t, **attr)
 
-    def _subgraph(self, vertices: Iterable):
-        g = Graph()
-        g._graph_attr = deepcopy(self._graph_attr)
-        if isinstance(vertices, str):
-            vertices = [vertices]
-        vertices = set(vertices)
-        for v in vertices:
-            g.add_vertex(v)
-            if v in self._vertex_attr:
-                v_attr = self.get_attr_vertex(v)
-                if len(v_attr) > 0:
-                    g._vertex_attr[v] = deepcopy(v_attr)
-        # Get all common edges between vertices
-        edges = set()
-        for v in vertices:
-            edges |= set(self.get_incident_edges([v]))
-
-        for i in edges:
-            s, t = self.get_edge(i)
-            # Merge if many sets
-            if len(s) > 1:
-                s = set().union(*s)
-            if len(t) > 1:
-                t = set().union(*t)
-            if len(s.intersection(vertices)) > 0 and len(t.intersection(vertices)) > 0:
-                # Copy the edge
-                attr = deepcopy(self.get_attr_edge(i))
-                g.add_edge(s, t, **attr)
-        return g
-
-    def _edge_subgraph(self, edges: Iterable[int]):
-        g = Graph()
-        g._graph_attr = deepcopy(self._graph_attr)
-        vertices = set()
-        for s, t in self.get_edges(edges):
-            for v in s:
-                vertices.add(v)
-            for v in t:
-                vertices.add(v)
-        for v in vertices:
-            g.add_vertex(v)
-            if v in self._vertex_attr:
-                v_attr = self.get_attr_vertex(v)
-                if len(v_attr) > 0:
-                    g._vertex_attr[v] = deepcopy(v_attr)
-        for i in edges:
-            (s, t) = self.get_edge(i)
-            attr = deepcopy(self.get_attr_edge(i))
-            g.add_edge(s, t, **attr)
-        return g
-
     def copy(self) -> "Graph":
         return deepcopy(self)
 
@@ -971,35 +1599,75 @@ class Graph(BaseGraph):
         has_header: bool = False,
         discard_self_loops: Optional[bool] = True,
         column_order: List[int] = [0, 1, 2],
+        columnar: bool = False,
+        deduplicate: bool = False,
+        chunk_size: int = 100_000,
     ):
-        from corneto._io import _read_sif_iter
+        """Create a graph from a SIF file.
+
+        The file (optionally compressed with gzip, xz or bz2) is read in chunks
+        of `chunk_size` lines, which are added to the graph in bulk.
+
+        Args:
+            sif_file (str): Path of the file.
+            delimiter (str): Column delimiter. Defaults to tab.
+            has_header (bool): Skip the first line. Defaults to False.
+            discard_self_loops (Optional[bool]): Skip lines with the same source
+                and target. Defaults to True.
+            column_order (List[int]): Position of the source, interaction and
+                target columns. Defaults to [0, 1, 2].
+            columnar (bool): Store the attributes in columns. Defaults to False.
+            deduplicate (bool): Skip repeated (source, interaction, target)
+                lines. Defaults to False.
+            chunk_size (int): Number of lines per chunk. Defaults to 100000.
+
+        Returns:
+            Graph: Graph with one edge per line, with the interaction stored in
+            the `interaction` attribute.
+        """
+        from corneto._io import _read_sif_chunks
 
-        it = _read_sif_iter(
+        chunks = _read_sif_chunks(
             sif_file,
             delimiter=delimiter,
             has_header=has_header,
             discard_self_loops=discard_self_loops,
             column_order=column_order,
+            chunk_size=chunk_size,
+            deduplicate=deduplicate,
         )
-        return Graph.from_sif_tuples(it)
+        g = Graph(columnar=columnar)
+        for vertices, source, interaction, target in chunks:
+            # Vertex ids of the reader are the positions of the vertices in g
+            g.add_vertices(vertices[g.num_vertices :])
+            g.add_edges_from_arrays(
+                source, target, indices=True, interaction=interaction
+            )
+        return g
 
     @staticmethod
-    def from_sif_tuples(tuples: Iterable[Tuple]):
-        g = Graph()
+    def from_sif_tuples(tuples: Iterable[Tuple], columnar: bool = False):
+        g = Graph(columnar=columnar)
+        source, interaction, target = [], [], []
         for s, v, t in tuples:
-            g.add_edge(s, t, interaction=v)
+            source.append(s)
+            interaction.append(v)
+            target.append(t)
+        g.add_edges_from_arrays(source, target, interaction=interaction)
         return g
 
     @staticmethod
     def from_cobra_model(model: CobraModel):
         S, R, M = import_cobra_model(model)
-        G = Graph.from_vertex_incidence(S, M["id"], R["id"])
         # Add metadata to the graph, such as default lb/ub for reactions
-        for i in range(G.num_edges):
-            attr = G.get_attr_edge(i)
-            attr["default_lb"] = R["lb"][i]
-            attr["default_ub"] = R["ub"][i]
-            attr["GPR"] = R["gpr"][i]
+        G = Graph.from_vertex_incidence(
+            S,
+            M["id"],
+            R["id"],
+            default_lb=R["lb"],
+            default_ub=R["ub"],
+            GPR=R["gpr"],
+        )
         return G
 
     @staticmethod
@@ -1018,3 +1686,227 @@ class Graph(BaseGraph):
             attr["default_ub"] = R["ub"][i]
             attr["GPR"] = R["gpr"][i]
         return G
+
+
+class GraphView(BaseGraph):
+    """Read-only view of a subset of the vertices and edges of a graph.
+
+    The view stores a reference to the parent graph and boolean masks over its
+    vertices and edges, and shares the attributes with the parent (changes in
+    the attributes of the view are visible in the parent). Vertices and edges
+    keep the relative order they have in the parent graph. Views of views refer
+    directly to the original graph.
+
+    Views are returned by `subgraph`, `edge_subgraph` and `prune` with
+    `view=True`. Use `materialize()` (or `copy()`) to get a standalone
+    :class:`Graph`. Modifying the structure of a view raises
+    :class:`ReadOnlyGraphError`.
+
+    The view keeps track of the structural version of the parent graph. When
+    new vertices or edges are added to the parent, induced views (`subgraph`,
+    `prune`) pick up the new edges between their vertices, and views over a
+    fixed set of edges (`edge_subgraph`) keep the same selection.
+
+    Args:
+        parent (BaseGraph): The graph to view.
+        vertex_mask (Optional[np.ndarray]): Boolean mask over the vertices of the
+            parent graph. Defaults to all vertices.
+        edge_mask (Optional[np.ndarray]): Boolean mask over the edges of the parent
+            graph. Defaults to all edges.
+        induced (bool): Whether the edges are the ones induced by the selected
+            vertices. Induced views are refreshed when the parent changes.
+            Defaults to False.
+    """
+
+    def __init__(
+        self,
+        parent: BaseGraph,
+        vertex_mask: Optional[np.ndarray] = None,
+        edge_mask: Optional[np.ndarray] = None,
+        induced: bool = False,
+    ) -> None:
+        super().__init__(default_edge_type=parent._default_edge_type)
+        vertex_ids = np.arange(parent.num_vertices)
+        edge_ids = np.arange(parent.num_edges)
+        if vertex_mask is not None:
+            vertex_ids = vertex_ids[np.asarray(vertex_mask, dtype=bool)]
+        if edge_mask is not None:
+            edge_ids = edge_ids[np.asarray(edge_mask, dtype=bool)]
+        if isinstance(parent, GraphView):
+            vertex_ids = parent._vertex_ids[vertex_ids]
+            edge_ids = parent._edge_ids[edge_ids]
+            # Induced on an induced view is induced on the original graph
+            induced = induced and parent._induced
+            parent = parent._parent
+        self._parent = parent
+        self._induced = induced
+        # Positions of the selected vertices and edges in the parent graph,
+        # valid for the recorded version of the parent
+        self._vids = vertex_ids
+        self._eids = edge_ids
+        self._parent_version = parent._version
+
+    def _sync(self) -> None:
+        # Refresh the selection if the parent graph changed after the view was
+        # created. Graphs only grow, so positions of existing vertices and
+        # edges in the parent remain valid.
+        if self._parent._version == self._parent_version:
+            return
+        if self._induced:
+            mask = np.zeros(self._parent.num_vertices, dtype=bool)
+            mask[self._vids] = True
+            self._eids = np.flatnonzero(self._parent._induced_edge_mask(mask))
+        self._parent_version = self._parent._version
+        self._touch()
+
+    def _cached(self, key: str, builder: Callable[[], T]) -> T:
+        self._sync()
+        return super()._cached(key, builder)
+
+    @property
+    def _vertex_ids(self) -> np.ndarray:
+        self._sync()
+        return self._vids
+
+    @property
+    def _edge_ids(self) -> np.ndarray:
+        self._sync()
+        return self._eids
+
+    @property
+    def parent(self) -> BaseGraph:
+        """The graph that is being viewed."""
+        return self._parent
+
+    @property
+    def vertex_mask(self) -> np.ndarray:
+        """Boolean mask over the vertices of the parent graph."""
+        mask = np.zeros(self._parent.num_vertices, dtype=bool)
+        mask[self._vertex_ids] = True
+        return mask
+
+    @property
+    def edge_mask(self) -> np.ndarray:
+        """Boolean mask over the edges of the parent graph."""
+        mask = np.zeros(self._parent.num_edges, dtype=bool)
+        mask[self._edge_ids] = True
+        return mask
+
+    def _read_only(self, *args, **kwargs):
+        raise ReadOnlyGraphError(
+            "GraphView is read-only, use materialize() to get a modifiable copy"
+        )
+
+    _add_edge = _read_only
+    _add_edges_bulk = _read_only
+    _add_vertex = _read_only
+
+    def _vertex_list(self) -> List[Any]:
+        def build():
+            V = self._parent.V
+            return [V[i] for i in self._vertex_ids.tolist()]
+
+        return self._cached("vertex_list", build)
+
+    def _edge_positions(self) -> np.ndarray:
+        def build():
+            pos = np.full(self._parent.num_edges, -1, dtype=np.int64)
+            pos[self._edge_ids] = np.arange(len(self._edge_ids))
+            return pos
+
+        return self._cached("edge_positions", build)
+
+    def _build_index(self) -> GraphIndex:
+        index = self._parent.get_index()
+        vpos = np.full(self._parent.num_vertices, -1, dtype=np.int64)
+        vpos[self._vertex_ids] = np.arange(len(self._vertex_ids))
+        arrays = []
+        for ptr, idx in [
+            (index.src_ptr, index.src_idx),
+            (index.tgt_ptr, index.tgt_idx),
+        ]:
+            new_ptr = np.zeros(len(self._edge_ids) + 1, dtype=np.int64)
+            np.cumsum(np.diff(ptr)[self._edge_ids], out=new_ptr[1:])
+            new_idx, _ = _csr_gather(ptr, idx, self._edge_ids)
+            arrays.extend([new_ptr, vpos[new_idx]])
+        return GraphIndex(
+            len(self._vertex_ids), index.edge_type[self._edge_ids], *arrays
+        )
+
+    def get_edge(self, index: int) -> Edge:
+        return self._parent.get_edge(int(self._edge_ids[index]))
+
+    def get_vertex(self, index: int) -> Any:
+        return self._vertex_list()[index]
+
+    def _get_vertices(self) -> Iterable:
+        return iter(self._vertex_list())
+
+    def _get_incident_edges(self, vertex) -> Iterable[int]:
+        if vertex not in self._vertex_map():
+            raise KeyError(vertex)
+        pos = self._edge_positions()
+        incident = (pos[i] for i in self._parent._get_incident_edges(vertex))
+        return {int(i) for i in incident if i >= 0}
+
+    def _get_edge_attributes(self, index: int) -> Attributes:
+        return self._parent.get_attr_edge(int(self._edge_ids[index]))
+
+    def _get_vertex_attributes(self, v) -> Attributes:
+        return self._parent.get_attr_vertex(v)
+
+    def get_graph_attributes(self) -> Attributes:
+        return self._parent.get_graph_attributes()
+
+    def get_edge_attr_array(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        values = self._parent.get_edge_attr_array(key, default=default, dtype=dtype)
+        return values[self._edge_ids]
+
+    def get_vertex_attr_array(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        values = self._parent.get_vertex_attr_array(key, default=default, dtype=dtype)
+        return values[self._vertex_ids]
+
+    def _num_vertices(self) -> int:
+        return len(self._vertex_ids)
+
+    def _num_edges(self) -> int:
+        return len(self._edge_ids)
+
+    def extract_subgraph(
+        self, vertices: Optional[Iterable] = None, edges: Optional[Iterable[int]] = None
+    ):
+        return self.materialize().extract_subgraph(vertices=vertices, edges=edges)
+
+    def materialize(self) -> Graph:
+        """Create a standalone graph with a copy of the vertices and edges in the view.
+
+        Returns:
+            Graph: A new graph, independent from the parent graph.
+        """
+        g = Graph(
+            default_edge_type=self._default_edge_type,
+            columnar=getattr(self._parent, "columnar", False),
+        )
+        g._graph_attr = deepcopy(self.get_graph_attributes())
+        for v in self._get_vertices():
+            g.add_vertex(v)
+            v_attr = self.get_attr_vertex(v)
+            if len(v_attr) > 0:
+                g._vertex_attr[v] = deepcopy(v_attr)
+        for i in range(self.num_edges):
+            s, t = self.get_edge(i)
+            attr = self.get_attr_edge(i)
+            etype = attr.get(Attr.EDGE_TYPE.value, self._default_edge_type)
+            idx = g._add_edge(s, t, type=EdgeType(etype))
+            g.get_attr_edge(idx).update(deepcopy(attr))
+        return g
+
+    def copy(self) -> Graph:
+        return self.materialize()
+
+    def reverse(self) -> Graph:
+        return self.materialize().reverse()
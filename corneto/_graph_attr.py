@@ -0,0 +1,461 @@
+from collections.abc import MutableMapping
+from copy import deepcopy
+from numbers import Integral, Real
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from corneto.utils import Attr, Attributes
+
+_MISSING = object()
+_INT64_MIN = np.iinfo(np.int64).min
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def _infer_dtype(values: Iterable[Any]) -> np.dtype:
+    # Use a typed column only if it can store the values without changing their type
+    kinds = set()
+    for v in values:
+        if isinstance(v, (bool, np.bool_)):
+            kinds.add("b")
+        elif isinstance(v, Integral):
+            if not _INT64_MIN <= v <= _INT64_MAX:
+                return np.dtype(object)
+            kinds.add("i")
+        elif isinstance(v, Real) and not isinstance(v, np.integer):
+            kinds.add("f")
+        else:
+            return np.dtype(object)
+        if len(kinds) > 1:
+            return np.dtype(object)
+    if kinds == {"b"}:
+        return np.dtype(bool)
+    if kinds == {"i"}:
+        return np.dtype(np.int64)
+    if kinds == {"f"}:
+        return np.dtype(np.float64)
+    return np.dtype(object)
+
+
+def _fits(dtype: np.dtype, value: Any) -> bool:
+    if dtype.kind == "O":
+        return True
+    return _infer_dtype((value,)) == dtype
+
+
+def _assign(col: np.ndarray, start: int, values: Sequence[Any]) -> None:
+    if col.dtype.kind == "O":
+        # Element-wise, to store tuples or lists as single values
+        for i, v in enumerate(values, start):
+            col[i] = v
+    else:
+        col[start : start + len(values)] = values
+
+
+def _to_column(values: Sequence[Any]) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        if values.dtype.kind in "biuf":
+            return values
+        return values.astype(object)
+    values = list(values)
+    col = np.empty(len(values), dtype=_infer_dtype(values))
+    _assign(col, 0, values)
+    return col
+
+
+def _fill_column(values: np.ndarray, mask: np.ndarray, default: Any) -> np.ndarray:
+    # Replace the values not present in the mask with a default value
+    if mask.all():
+        return values
+    if default is None or values.dtype.kind == "O":
+        values = values.astype(object)
+        values[~mask] = default
+        if default is not None:
+            values = _to_column(values.tolist())
+        return values
+    return np.where(mask, values, default)
+
+
+def _to_python(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class AttributeTable:
+    """Columnar storage for the attributes of a sequence of items (rows).
+
+    Attributes that are present in many rows are stored as typed NumPy columns
+    (bool, int64, float64 or object) with a presence mask. Rare attributes are
+    kept in a sparse `{row: value}` dict and promoted to a column once they are
+    used by enough rows. Columns are upgraded to object dtype if a value of a
+    different type is stored.
+
+    The table behaves like a list of :class:`Attributes`: indexing returns a
+    :class:`AttributeRow`, a dict-like view of the row, and `append` adds a
+    new row from a mapping.
+
+    Args:
+        sparse_ratio (float): Fraction of rows that an attribute has to reach to
+            be promoted from the sparse store to a column. Defaults to 0.1.
+        min_dense (int): Minimum number of values that an attribute needs to be
+            promoted to a column. Defaults to 16.
+    """
+
+    def __init__(self, sparse_ratio: float = 0.1, min_dense: int = 16) -> None:
+        self.sparse_ratio = sparse_ratio
+        self.min_dense = min_dense
+        self._n = 0
+        # Key order, shared by dense and sparse attributes
+        self._keys: Dict[str, None] = dict()
+        self._columns: Dict[str, np.ndarray] = dict()
+        self._masks: Dict[str, np.ndarray] = dict()
+        self._sparse: Dict[str, Dict[int, Any]] = dict()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, row: int) -> "AttributeRow":
+        return AttributeRow(self, self._check_row(row))
+
+    def __iter__(self) -> Iterator["AttributeRow"]:
+        return (AttributeRow(self, i) for i in range(self._n))
+
+    def _check_row(self, row: int) -> int:
+        if row < 0:
+            row += self._n
+        if not 0 <= row < self._n:
+            raise IndexError(f"Row {row} out of range [0 - {self._n - 1}]")
+        return row
+
+    def _reserve(self, n: int) -> None:
+        # Grow the columns (independently) to hold at least n rows
+        for key, col in self._columns.items():
+            if len(col) >= n:
+                continue
+            capacity = max(n, 2 * len(col), 8)
+            new_col = np.empty(capacity, dtype=col.dtype)
+            new_col[: self._n] = col[: self._n]
+            if col.dtype.kind == "O":
+                new_col[self._n :] = None
+            new_mask = np.zeros(capacity, dtype=bool)
+            new_mask[: self._n] = self._masks[key][: self._n]
+            self._columns[key] = new_col
+            self._masks[key] = new_mask
+
+    def add_rows(self, n: int) -> None:
+        """Add `n` empty rows."""
+        self._reserve(self._n + n)
+        for key in self._columns:
+            self._masks[key][self._n : self._n + n] = False
+        self._n += n
+
+    def append(self, attributes: Mapping[str, Any]) -> None:
+        """Add a new row with the given attributes."""
+        self.add_rows(1)
+        for key, value in attributes.items():
+            self.set(self._n - 1, key, value)
+
+    def extend_columns(self, n: int, columns: Mapping[str, Sequence[Any]]) -> None:
+        """Add `n` rows, with attributes given as columns of length `n`."""
+        start = self._n
+        self.add_rows(n)
+        for key, values in columns.items():
+            if len(values) != n:
+                raise ValueError(
+                    f"Attribute {key} has {len(values)} values, expected {n}"
+                )
+            dtype = _infer_dtype(values)
+            if key not in self._columns:
+                self._promote(key, dtype=dtype)
+            col = self._columns[key]
+            if col.dtype.kind != "O" and dtype != col.dtype:
+                col = self._upgrade(key)
+            _assign(col, start, values)
+            self._masks[key][start : start + n] = True
+
+    def _promote(self, key: str, dtype: np.dtype) -> None:
+        # Move a sparse (or new) attribute to a dense column
+        self._keys.setdefault(key, None)
+        sparse = self._sparse.pop(key, dict())
+        if not all(_fits(dtype, v) for v in sparse.values()):
+            dtype = np.dtype(object)
+        capacity = max(self._n, 8)
+        col = np.empty(capacity, dtype=dtype)
+        if dtype.kind == "O":
+            col[:] = None
+        mask = np.zeros(capacity, dtype=bool)
+        for row, value in sparse.items():
+            col[row] = value
+            mask[row] = True
+        self._columns[key] = col
+        self._masks[key] = mask
+
+    def _upgrade(self, key: str) -> np.ndarray:
+        col = self._columns[key].astype(object)
+        col[~self._masks[key]] = None
+        self._columns[key] = col
+        return col
+
+    def get(self, row: int, key: str, default: Any = _MISSING) -> Any:
+        """Get the value of an attribute in a row."""
+        if key in self._columns:
+            if self._masks[key][row]:
+                return _to_python(self._columns[key][row])
+        elif key in self._sparse and row in self._sparse[key]:
+            return self._sparse[key][row]
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def has(self, row: int, key: str) -> bool:
+        """Check if a row has a value for the attribute."""
+        if key in self._columns:
+            return bool(self._masks[key][row])
+        return key in self._sparse and row in self._sparse[key]
+
+    def set(self, row: int, key: str, value: Any) -> None:
+        """Set the value of an attribute in a row."""
+        if key not in self._columns:
+            self._keys.setdefault(key, None)
+            sparse = self._sparse.setdefault(key, dict())
+            sparse[row] = value
+            if len(sparse) >= max(self.min_dense, self.sparse_ratio * self._n):
+                self._promote(key, dtype=_infer_dtype(sparse.values()))
+            return
+        col = self._columns[key]
+        if not _fits(col.dtype, value):
+            col = self._upgrade(key)
+        col[row] = value
+        self._masks[key][row] = True
+
+    def delete(self, row: int, key: str) -> None:
+        """Remove an attribute from a row."""
+        if not self.has(row, key):
+            raise KeyError(key)
+        if key in self._columns:
+            self._masks[key][row] = False
+            if self._columns[key].dtype.kind == "O":
+                self._columns[key][row] = None
+        else:
+            del self._sparse[key][row]
+
+    def keys(self, row: int) -> List[str]:
+        """Get the attributes present in a row."""
+        return [k for k in self._keys if self.has(row, k)]
+
+    def column(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        """Get the values of an attribute for all rows.
+
+        If the attribute is stored as a column and all rows have a value, the
+        returned array is a view of the column (no copy is made). Views are
+        invalidated if new rows are added.
+
+        Args:
+            key (str): Name of the attribute.
+            default (Any): Value for rows without the attribute. Defaults to None.
+            dtype (Any): Optional dtype of the returned array.
+
+        Returns:
+            np.ndarray: Array with one value per row.
+        """
+        n = self._n
+        if key in self._columns:
+            values = _fill_column(self._columns[key][:n], self._masks[key][:n], default)
+        else:
+            sparse = self._sparse.get(key, dict())
+            values = [sparse.get(i, default) for i in range(n)]
+            values = _to_column(values)
+        if dtype is not None:
+            values = values.astype(dtype, copy=False)
+        return values
+
+    def mask(self, key: str) -> np.ndarray:
+        """Get a boolean array indicating which rows have a value for the attribute."""
+        if key in self._columns:
+            return self._masks[key][: self._n].copy()
+        mask = np.zeros(self._n, dtype=bool)
+        mask[list(self._sparse.get(key, dict()).keys())] = True
+        return mask
+
+    def columns(self) -> List[str]:
+        """Get the attributes stored in the table (in order of first use)."""
+        return list(self._keys)
+
+    def set_column(self, key: str, values: Sequence[Any]) -> None:
+        """Set the values of an attribute for all rows.
+
+        NumPy arrays with a numeric or boolean dtype are stored without copy.
+
+        Args:
+            key (str): Name of the attribute.
+            values (Sequence[Any]): One value per row.
+
+        Raises:
+            ValueError: If the number of values is different from the number of rows.
+        """
+        if len(values) != self._n:
+            raise ValueError(
+                f"Attribute {key} has {len(values)} values, expected {self._n}"
+            )
+        self._keys.setdefault(key, None)
+        self._sparse.pop(key, None)
+        self._columns[key] = _to_column(values)
+        self._masks[key] = np.ones(self._n, dtype=bool)
+
+    def nbytes(self) -> int:
+        """Approximate size in bytes of the dense columns."""
+        return sum(c.nbytes + self._masks[k].nbytes for k, c in self._columns.items())
+
+
+class AttributeRow(MutableMapping):
+    """Dict-like view of a row of an :class:`AttributeTable`.
+
+    Reads and writes go directly to the table. The row is a mapping but not a
+    `dict`: use `dict(row)` (or `copy`) where a real dictionary is required,
+    e.g. for `json.dumps`. Copies (`copy`, `deepcopy`, pickling) produce regular
+    :class:`Attributes` objects.
+    """
+
+    __slots__ = ("_row", "_table")
+
+    def __init__(self, table: AttributeTable, row: int) -> None:
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table.get(self._row, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._table.set(self._row, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._table.delete(self._row, key)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._table.has(self._row, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.keys(self._row))
+
+    def __len__(self) -> int:
+        return len(self._table.keys(self._row))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __getattr__(self, name: str) -> Any:
+        # Attribute access to the values, as in :class:`Attributes`
+        if name not in self.__slots__ and name in self:
+            return self[name]
+        raise AttributeError(f"{name} does not exist")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.__slots__:
+            object.__setattr__(self, name, value)
+        elif hasattr(type(self), name):
+            raise AttributeError(f"'{name}' is a protected attribute")
+        else:
+            if isinstance(value, Attr):
+                value = value.value
+            self[name] = value
+
+    set_attr = Attributes.set_attr
+    has_attr = Attributes.has_attr
+    get_attr = Attributes.get_attr
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._table.get(self._row, key, default)
+
+    def keys(self):
+        return self._table.keys(self._row)
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def clear(self) -> None:
+        for key in self.keys():
+            del self[key]
+
+    def copy(self) -> Attributes:
+        return Attributes(self.items())
+
+    def __copy__(self) -> Attributes:
+        return self.copy()
+
+    def __deepcopy__(self, memo) -> Attributes:
+        return Attributes(deepcopy(self.items(), memo))
+
+    def __reduce__(self):
+        return (Attributes, (dict(self.items()),))
+
+
+class KeyedAttributeTable(MutableMapping):
+    """Attribute table indexed by keys (e.g. vertices) instead of row numbers.
+
+    The mapping from keys to rows is shared with the owner of the table, so
+    the table follows the insertion order of the keys. Rows are created on
+    demand.
+
+    Args:
+        index (Dict[Any, int]): Mapping from keys to row numbers.
+    """
+
+    def __init__(self, index: Dict[Any, int]) -> None:
+        self.index = index
+        self.table = AttributeTable()
+
+    def _sync(self) -> None:
+        if len(self.table) < len(self.index):
+            self.table.add_rows(len(self.index) - len(self.table))
+
+    def __getitem__(self, key: Any) -> AttributeRow:
+        if key not in self.index:
+            raise KeyError(key)
+        self._sync()
+        return self.table[self.index[key]]
+
+    def __setitem__(self, key: Any, attributes: Mapping[str, Any]) -> None:
+        row = self[key]
+        if row is attributes:
+            return
+        attributes = dict(attributes.items())
+        row.clear()
+        row.update(attributes)
+
+    def __delitem__(self, key: Any) -> None:
+        self[key].clear()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def column(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        """Get the values of an attribute for all keys (see `AttributeTable.column`)."""
+        self._sync()
+        return self.table.column(key, default=default, dtype=dtype)
+
+    def mask(self, key: str) -> np.ndarray:
+        """Get which keys have a value for the attribute (see `AttributeTable.mask`)."""
+        self._sync()
+        return self.table.mask(key)
+
+    def set_column(self, key: str, values: Sequence[Any]) -> None:
+        """Set the values of an attribute for all keys."""
+        self._sync()
+        self.table.set_column(key, values)
@@ -0,0 +1,374 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from corneto.utils import Attr
+
+# Direction byte stored per edge in the compiled index
+EDGE_UNDIRECTED = 0
+EDGE_DIRECTED = 1
+
+
+def _csr_from_pairs(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    n_rows: int,
+    order_by: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Build the (indptr, indices) arrays of a CSR structure from (row, col) pairs.
+
+    Entries of each row are sorted by `order_by` (or by column if not provided),
+    keeping the relative order of ties.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    secondary = cols if order_by is None else order_by
+    order = np.lexsort((secondary, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    if rows.size > 0:
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols[order]
+
+
+def _csr_gather(
+    indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate the entries of the selected CSR rows.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The concatenated entries and, for each entry,
+        the position (in `rows`) of the row it comes from.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    owners = np.repeat(np.arange(rows.size), counts)
+    return indices[offsets], owners
+
+
+def _unique_pairs(rows: np.ndarray, cols: np.ndarray, n_cols: int) -> np.ndarray:
+    """Return the positions of the first occurrence of each (row, col) pair."""
+    if rows.size == 0:
+        return np.empty(0, dtype=np.int64)
+    keys = rows.astype(np.int64) * max(n_cols, 1) + cols
+    _, first = np.unique(keys, return_index=True)
+    return np.sort(first)
+
+
+class GraphIndex:
+    """Compiled integer index of the structure of a (hyper)graph.
+
+    Vertices and edges are identified by their position in the graph. The index
+    stores, for each edge, the source and target vertices as CSR arrays (edge ->
+    vertices), a direction byte per edge, and the vertex -> edge incidence as CSR
+    arrays for out-edges and CSC-like arrays for in-edges. Adjacency structures
+    (successors, predecessors and neighbors) are derived lazily and cached.
+
+    The index is immutable: graphs build a new one after a structural change.
+
+    Attributes:
+        num_vertices (int): Number of vertices.
+        num_edges (int): Number of edges.
+        edge_type (np.ndarray): Direction byte per edge (1 directed, 0 undirected).
+        src_ptr, src_idx (np.ndarray): CSR arrays with the source vertices of each edge.
+        tgt_ptr, tgt_idx (np.ndarray): CSR arrays with the target vertices of each edge.
+        out_ptr, out_idx (np.ndarray): CSR arrays with the out-edges of each vertex.
+        in_ptr, in_idx (np.ndarray): CSC arrays with the in-edges of each vertex.
+    """
+
+    def __init__(
+        self,
+        num_vertices: int,
+        edge_type: np.ndarray,
+        src_ptr: np.ndarray,
+        src_idx: np.ndarray,
+        tgt_ptr: np.ndarray,
+        tgt_idx: np.ndarray,
+    ) -> None:
+        self.num_vertices = int(num_vertices)
+        self.num_edges = len(edge_type)
+        self.edge_type = np.asarray(edge_type, dtype=np.uint8)
+        self.src_ptr = np.asarray(src_ptr, dtype=np.int64)
+        self.src_idx = np.asarray(src_idx, dtype=np.int64)
+        self.tgt_ptr = np.asarray(tgt_ptr, dtype=np.int64)
+        self.tgt_idx = np.asarray(tgt_idx, dtype=np.int64)
+        self._adj: Dict[str, Tuple[np.ndarray, np.ndarray]] = dict()
+        self._build_incidence()
+
+    @staticmethod
+    def from_edges(
+        edges: Iterable[Tuple[Iterable, Iterable]],
+        vertex_index: Dict[Any, int],
+        edge_type: Sequence[int],
+    ) -> "GraphIndex":
+        """Compile an index from (sources, targets) tuples.
+
+        Args:
+            edges (Iterable[Tuple[Iterable, Iterable]]): Edges as (sources, targets).
+            vertex_index (Dict[Any, int]): Position of each vertex.
+            edge_type (Sequence[int]): Direction byte of each edge.
+
+        Returns:
+            GraphIndex: The compiled index.
+        """
+        src_len: List[int] = []
+        tgt_len: List[int] = []
+        src: List[int] = []
+        tgt: List[int] = []
+        for s, t in edges:
+            src_len.append(len(s))
+            tgt_len.append(len(t))
+            src.extend(vertex_index[v] for v in s)
+            tgt.extend(vertex_index[v] for v in t)
+        src_ptr = np.zeros(len(src_len) + 1, dtype=np.int64)
+        tgt_ptr = np.zeros(len(tgt_len) + 1, dtype=np.int64)
+        np.cumsum(src_len, out=src_ptr[1:])
+        np.cumsum(tgt_len, out=tgt_ptr[1:])
+        return GraphIndex(
+            len(vertex_index),
+            np.asarray(edge_type, dtype=np.uint8),
+            src_ptr,
+            np.asarray(src, dtype=np.int64),
+            tgt_ptr,
+            np.asarray(tgt, dtype=np.int64),
+        )
+
+    @staticmethod
+    def direction_byte(edge_attr) -> int:
+        """Return the direction byte of an edge from its attributes."""
+        etype = edge_attr.get(Attr.EDGE_TYPE.value, "directed")
+        return EDGE_DIRECTED if etype == "directed" else EDGE_UNDIRECTED
+
+    def _edge_pairs(self, ptr: np.ndarray, idx: np.ndarray):
+        # Expand CSR (edge -> vertices) into (edge, vertex) pairs
+        edges = np.repeat(np.arange(self.num_edges, dtype=np.int64), np.diff(ptr))
+        return edges, idx
+
+    def _build_incidence(self) -> None:
+        n_v = self.num_vertices
+        se, sv = self._edge_pairs(self.src_ptr, self.src_idx)
+        te, tv = self._edge_pairs(self.tgt_ptr, self.tgt_idx)
+        undirected = self.edge_type == EDGE_UNDIRECTED
+        # Targets of undirected edges that are not also sources of the same edge
+        src_keys = np.unique(se * max(n_v, 1) + sv)
+        t_in_src = np.isin(te * max(n_v, 1) + tv, src_keys)
+        t_only = undirected[te] & ~t_in_src
+        s_undir = undirected[se]
+        self._pairs = dict(
+            src=(sv, se),
+            tgt=(tv, te),
+            tgt_only_undirected=(tv[t_only], te[t_only]),
+            src_undirected=(sv[s_undir], se[s_undir]),
+            tgt_directed=(tv[~undirected[te]], te[~undirected[te]]),
+        )
+        # Out edges: v in sources of any edge, or v in targets of an undirected edge
+        rows = np.concatenate([sv, tv[undirected[te]]])
+        cols = np.concatenate([se, te[undirected[te]]])
+        keep = _unique_pairs(rows, cols, self.num_edges)
+        self.out_ptr, self.out_idx = _csr_from_pairs(rows[keep], cols[keep], n_v)
+        # In edges: v in targets of any edge, or v in sources of an undirected edge
+        rows = np.concatenate([tv, sv[s_undir]])
+        cols = np.concatenate([te, se[s_undir]])
+        keep = _unique_pairs(rows, cols, self.num_edges)
+        self.in_ptr, self.in_idx = _csr_from_pairs(rows[keep], cols[keep], n_v)
+
+    def _adjacency(self, blocks) -> Tuple[np.ndarray, np.ndarray]:
+        # Each block is ((vertices, edges), use_targets). The vertex is connected
+        # to the targets (or sources) of the edge.
+        rows, cols, order = [], [], []
+        for (v, e), use_targets in blocks:
+            ptr, idx = (
+                (self.tgt_ptr, self.tgt_idx)
+                if use_targets
+                else (self.src_ptr, self.src_idx)
+            )
+            nb, owner = _csr_gather(ptr, idx, e)
+            rows.append(v[owner])
+            cols.append(nb)
+            order.append(e[owner])
+        r = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        c = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+        o = np.concatenate(order) if order else np.empty(0, dtype=np.int64)
+        # Sort by vertex, then by edge to preserve the order of the edges
+        srt = np.lexsort((o, r))
+        r, c = r[srt], c[srt]
+        keep = _unique_pairs(r, c, self.num_vertices)
+        indptr = np.zeros(self.num_vertices + 1, dtype=np.int64)
+        if keep.size > 0:
+            np.cumsum(np.bincount(r[keep], minlength=self.num_vertices), out=indptr[1:])
+        return indptr, c[keep]
+
+    def successors_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR adjacency (vertex -> successor vertices)."""
+        if "succ" not in self._adj:
+            p = self._pairs
+            self._adj["succ"] = self._adjacency(
+                [(p["src"], True), (p["tgt_only_undirected"], False)]
+            )
+        return self._adj["succ"]
+
+    def predecessors_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR adjacency (vertex -> predecessor vertices)."""
+        if "pred" not in self._adj:
+            p = self._pairs
+            self._adj["pred"] = self._adjacency(
+                [
+                    (p["tgt_directed"], False),
+                    (p["src_undirected"], True),
+                    (p["tgt_only_undirected"], False),
+                ]
+            )
+        return self._adj["pred"]
+
+    def neighbors_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR adjacency (vertex -> vertices sharing an edge, ignoring direction)."""
+        if "nb" not in self._adj:
+            p = self._pairs
+            self._adj["nb"] = self._adjacency(
+                [
+                    (p["src"], False),
+                    (p["src"], True),
+                    (p["tgt"], False),
+                    (p["tgt"], True),
+                ]
+            )
+        return self._adj["nb"]
+
+    def out_edges(self, vertices: np.ndarray) -> np.ndarray:
+        """Sorted indexes of the out-edges of the given vertices."""
+        e, _ = _csr_gather(self.out_ptr, self.out_idx, vertices)
+        return np.unique(e)
+
+    def in_edges(self, vertices: np.ndarray) -> np.ndarray:
+        """Sorted indexes of the in-edges of the given vertices."""
+        e, _ = _csr_gather(self.in_ptr, self.in_idx, vertices)
+        return np.unique(e)
+
+    def incident_edges(self, vertices: np.ndarray) -> np.ndarray:
+        """Sorted indexes of the edges incident to the given vertices."""
+        return np.union1d(self.out_edges(vertices), self.in_edges(vertices))
+
+    def first_target(self) -> np.ndarray:
+        """First target vertex of each edge, -1 if the edge has no targets."""
+        first = np.full(self.num_edges, -1, dtype=np.int64)
+        has_target = np.diff(self.tgt_ptr) > 0
+        first[has_target] = self.tgt_idx[self.tgt_ptr[:-1][has_target]]
+        return first
+
+    def adjacency(
+        self, reverse: bool = False, undirected: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if reverse and undirected:
+            raise ValueError("Reverse and undirected are mutually exclusive")
+        if undirected:
+            return self.neighbors_csr()
+        if reverse:
+            return self.predecessors_csr()
+        return self.successors_csr()
+
+    def bfs(
+        self, start: np.ndarray, reverse: bool = False, undirected: bool = False
+    ) -> np.ndarray:
+        """Breadth-first search from a set of vertices.
+
+        Args:
+            start (np.ndarray): Indexes of the starting vertices.
+            reverse (bool): Traverse edges backwards. Defaults to False.
+            undirected (bool): Ignore the direction of the edges. Defaults to False.
+
+        Returns:
+            np.ndarray: Distance (number of layers) from the starting vertices to
+            each vertex, -1 for unreachable vertices.
+        """
+        indptr, indices = self.adjacency(reverse=reverse, undirected=undirected)
+        dist = np.full(self.num_vertices, -1, dtype=np.int64)
+        frontier = np.unique(np.asarray(start, dtype=np.int64))
+        dist[frontier] = 0
+        layer = 0
+        while frontier.size > 0:
+            layer += 1
+            nb, _ = _csr_gather(indptr, indices, frontier)
+            nb = np.unique(nb[dist[nb] < 0])
+            dist[nb] = layer
+            frontier = nb
+        return dist
+
+    def reachable(
+        self,
+        starts: Sequence[Sequence[int]],
+        reverse: bool = False,
+        undirected: bool = False,
+    ) -> np.ndarray:
+        """Vertices reachable from several sets of starting vertices at once.
+
+        The searches are bit-parallel: the state of each vertex is a row of
+        64-bit words with one bit per search, so 64 searches advance together
+        with a single gather over the adjacency per layer. Only the new bits
+        of the vertices reached in the previous layer are propagated.
+
+        Args:
+            starts (Sequence[Sequence[int]]): Indexes of the starting vertices
+                of each search.
+            reverse (bool): Traverse edges backwards. Defaults to False.
+            undirected (bool): Ignore the direction of the edges. Defaults to False.
+
+        Returns:
+            np.ndarray: Boolean array (num_vertices x len(starts)), True if the
+            vertex is reachable from the starting vertices of the search.
+        """
+        indptr, indices = self.adjacency(reverse=reverse, undirected=undirected)
+        n = len(starts)
+        words = max((n + 63) // 64, 1)
+        reached = np.zeros((self.num_vertices, words), dtype=np.uint64)
+        v = np.array([i for s in starts for i in s], dtype=np.int64)
+        k = np.repeat(np.arange(n, dtype=np.int64), [len(s) for s in starts])
+        np.bitwise_or.at(
+            reached,
+            (v, k // 64),
+            np.left_shift(np.uint64(1), (k % 64).astype(np.uint64)),
+        )
+        frontier = np.unique(v)
+        new = reached[frontier]
+        while frontier.size > 0:
+            nb, owner = _csr_gather(indptr, indices, frontier)
+            if nb.size == 0:
+                break
+            # OR the bits that arrive at each neighbor
+            order = np.argsort(nb, kind="stable")
+            nb, owner = nb[order], owner[order]
+            first = np.flatnonzero(np.r_[True, nb[1:] != nb[:-1]])
+            bits = np.bitwise_or.reduceat(new[owner], first, axis=0)
+            nb = nb[first]
+            bits &= ~reached[nb]
+            changed = bits.any(axis=1)
+            frontier, new = nb[changed], bits[changed]
+            reached[frontier] |= new
+        # Unpack the words (little endian bit order) to one column per search
+        unpacked = np.unpackbits(
+            reached.astype("<u8").view(np.uint8), axis=1, bitorder="little"
+        )
+        return unpacked[:, :n].astype(bool)
+
+    def reachable_between(
+        self, sources: Sequence[Sequence[int]], targets: Sequence[Sequence[int]]
+    ) -> np.ndarray:
+        """Vertices in a path from the sources to the targets of each set.
+
+        Args:
+            sources (Sequence[Sequence[int]]): Indexes of the source vertices
+                of each set.
+            targets (Sequence[Sequence[int]]): Indexes of the target vertices
+                of each set, same length as `sources`.
+
+        Returns:
+            np.ndarray: Boolean array (num_vertices x len(sources)), True if the
+            vertex is reachable from the sources and reaches the targets.
+        """
+        if len(sources) != len(targets):
+            raise ValueError("The number of source and target sets must be equal")
+        return self.reachable(sources) & self.reachable(targets, reverse=True)
@@ -0,0 +1,624 @@
+"""Columnar binary format for graphs.
+
+A graph is stored as a set of NumPy arrays and a JSON header. The arrays are:
+
+- ``vertices``: the vertex ids, in order.
+- ``src_ptr``/``src_idx`` and ``tgt_ptr``/``tgt_idx``: CSR arrays with the
+  positions of the source and target vertices of each edge.
+- ``edge_type``: direction of each edge (see :class:`~corneto._graph_index.GraphIndex`).
+- One array (and an optional presence mask) per edge and vertex attribute.
+  Numeric and boolean attributes are stored as typed arrays, strings as
+  fixed-width unicode arrays and other values as pickled object arrays.
+
+The header contains the format name and version and describes the arrays and
+attributes. Everything is written either to a single ``.npz`` (zip) file or to
+a directory with one ``.npy`` file per array. Arrays can be compressed with
+zstd or lz4 if the corresponding package is installed. Uncompressed arrays
+without Python objects can be memory-mapped when loading.
+"""
+
+import gc
+import io
+import json
+import os
+import struct
+import zipfile
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from corneto._graph import BaseGraph, EdgeType, Graph
+from corneto._graph_attr import AttributeTable, KeyedAttributeTable, _infer_dtype
+from corneto._graph_index import GraphIndex
+from corneto.utils import Attr, Attributes
+
+FORMAT_NAME = "corneto-graph"
+FORMAT_VERSION = 1
+
+_HEADER = "header.json"
+_ENDPOINT_KEYS = {"src": Attr.SOURCE_ATTR.value, "tgt": Attr.TARGET_ATTR.value}
+
+
+def _zstd() -> Tuple[Callable, Callable]:
+    import zstandard  # type: ignore
+
+    return zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress
+
+
+def _lz4() -> Tuple[Callable, Callable]:
+    import lz4.frame  # type: ignore
+
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+# Compression codecs, in order of preference: name -> (suffix, loader)
+_CODECS = {"zstd": (".zst", _zstd), "lz4": (".lz4", _lz4)}
+
+
+def available_codecs() -> List[str]:
+    """Get the compression codecs that can be used in this environment."""
+    codecs = []
+    for name, (_, loader) in _CODECS.items():
+        try:
+            loader()
+            codecs.append(name)
+        except ImportError:
+            pass
+    return codecs
+
+
+def _select_codec(compression: Optional[str]) -> Optional[str]:
+    if compression is None or compression == "none":
+        return None
+    if compression == "auto":
+        codecs = available_codecs()
+        return codecs[0] if codecs else None
+    if compression not in _CODECS:
+        raise ValueError(
+            f"Unknown compression {compression}, use one of {list(_CODECS)}, "
+            "'auto' or None"
+        )
+    return compression
+
+
+def is_graph_file(path: str) -> bool:
+    """Check if a path contains a graph in the columnar format."""
+    if os.path.isdir(path):
+        return os.path.isfile(os.path.join(path, _HEADER))
+    if os.path.isfile(path) and zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            return _HEADER in z.namelist()
+    return False
+
+
+def _encode(values: Sequence[Any]) -> np.ndarray:
+    # Typed array if possible, unicode array for strings, object array otherwise
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        return values
+    values = list(values)
+    dtype = _infer_dtype(values) if values else np.dtype(np.float64)
+    if dtype.kind != "O":
+        return np.array(values, dtype=dtype)
+    # Trailing null characters are not preserved by numpy strings
+    if all(type(v) is str and not v.endswith("\x00") for v in values):
+        return np.array(values, dtype=str)
+    arr = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        arr[i] = v
+    return arr
+
+
+def _table_columns(table: Any) -> List[Tuple[str, Any, np.ndarray]]:
+    if isinstance(table, KeyedAttributeTable):
+        table._sync()
+        table = table.table
+    columns = []
+    for key in table.columns():
+        mask = table.mask(key)
+        if mask.any():
+            columns.append((key, table.column(key), mask))
+    return columns
+
+
+def _row_columns(rows: Sequence[Mapping]) -> List[Tuple[str, Any, np.ndarray]]:
+    keys: Dict[str, None] = dict()
+    for row in rows:
+        keys.update(dict.fromkeys(row.keys()))
+    columns = []
+    for key in keys:
+        mask = np.fromiter((key in row for row in rows), dtype=bool, count=len(rows))
+        columns.append((key, [row.get(key, None) for row in rows], mask))
+    return columns
+
+
+def _attr_columns(graph: BaseGraph, which: str) -> List[Tuple[str, Any, np.ndarray]]:
+    # (key, values, mask) for each attribute of the edges or vertices
+    table = getattr(graph, f"_{which}_attr", None)
+    if isinstance(table, (AttributeTable, KeyedAttributeTable)):
+        return _table_columns(table)
+    if which == "edge":
+        rows = graph.get_attr_edges()
+    else:
+        rows = graph.get_attr_vertices()
+    return _row_columns(rows)
+
+
+def _fill_missing(values: Sequence[Any], mask: np.ndarray) -> Sequence[Any]:
+    if mask.all():
+        return values
+    present = [v for v, m in zip(values, mask) if m]
+    dtype = _infer_dtype(present)
+    if dtype.kind == "b":
+        filler: Any = False
+    elif dtype.kind in "if":
+        filler = 0
+    elif all(isinstance(v, str) for v in present):
+        filler = ""
+    else:
+        filler = None
+    return [v if m else filler for v, m in zip(values, mask)]
+
+
+def _encode_endpoints(
+    values: Sequence[Any],
+    mask: np.ndarray,
+    ptr: np.ndarray,
+    idx: np.ndarray,
+    vertices: Sequence[Any],
+) -> Optional[np.ndarray]:
+    # Per vertex values ({vertex: {VALUE: coeff}}) as an array aligned with idx
+    coeffs: Dict[int, Any] = dict()
+    bounds = ptr.tolist()
+    positions = idx.tolist()
+    for e in np.flatnonzero(mask).tolist():
+        attr = values[e]
+        start, end = bounds[e], bounds[e + 1]
+        if not isinstance(attr, Mapping) or len(attr) != end - start:
+            return None
+        for j in range(start, end):
+            vertex_attr = attr.get(vertices[positions[j]], None)
+            if not isinstance(vertex_attr, Mapping) or list(vertex_attr.keys()) != [
+                Attr.VALUE.value
+            ]:
+                return None
+            coeffs[j] = vertex_attr[Attr.VALUE.value]
+    dtype = _infer_dtype(coeffs.values()) if coeffs else np.dtype(np.float64)
+    if dtype.kind == "O":
+        return None
+    arr = np.zeros(len(positions), dtype=dtype)
+    arr[list(coeffs.keys())] = list(coeffs.values())
+    return arr
+
+
+class _Writer:
+    # Writes the arrays of a graph as .npy members of a container
+    def __init__(self, codec: Optional[str] = None) -> None:
+        self.codec = codec
+        self.members: Dict[str, str] = dict()
+        self._compress = None
+        if codec is not None:
+            self._compress = _CODECS[codec][1]()[0]
+
+    def _write(self, member: str, data: bytes) -> None:
+        raise NotImplementedError()
+
+    def array(self, name: str, arr: np.ndarray) -> str:
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, np.asarray(arr), allow_pickle=True)
+        data = buffer.getvalue()
+        member = f"{name}.npy"
+        if self._compress is not None:
+            data = self._compress(data)
+            member += _CODECS[self.codec][0]
+        self._write(member, data)
+        self.members[name] = member
+        return name
+
+    def close(self, header: Dict[str, Any]) -> Any:
+        header["arrays"] = self.members
+        header["compression"] = self.codec
+        self._write(_HEADER, json.dumps(header, indent=1).encode("utf-8"))
+
+
+class _FileWriter(_Writer):
+    def __init__(self, path: str, container: str, codec: Optional[str]) -> None:
+        super().__init__(codec)
+        self.path = path
+        if container == "dir":
+            os.makedirs(path, exist_ok=True)
+            self._zip = None
+        else:
+            self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True)
+
+    def _write(self, member: str, data: bytes) -> None:
+        if self._zip is not None:
+            with self._zip.open(member, "w", force_zip64=True) as f:
+                f.write(data)
+        else:
+            with open(os.path.join(self.path, member), "wb") as f:
+                f.write(data)
+
+    def close(self, header: Dict[str, Any]) -> None:
+        super().close(header)
+        if self._zip is not None:
+            self._zip.close()
+
+
+def _write_graph(graph: BaseGraph, writer: _Writer) -> Any:
+    vertices = list(graph.V)
+    index = graph.get_index()
+    writer.array("vertices", _encode(vertices))
+    for name in ["src_ptr", "src_idx", "tgt_ptr", "tgt_idx", "edge_type"]:
+        writer.array(name, getattr(index, name))
+    graph_attr = np.empty((), dtype=object)
+    graph_attr[()] = dict(graph.get_graph_attributes().items())
+    writer.array("graph_attr", graph_attr)
+    attrs: Dict[str, List[Dict[str, Any]]] = {"edge": [], "vertex": []}
+    endpoint_keys = {v: k for k, v in _ENDPOINT_KEYS.items()}
+    for which in attrs:
+        for i, (key, values, mask) in enumerate(_attr_columns(graph, which)):
+            name = f"{which}_attr_{i}"
+            entry = {"key": key, "values": name, "mask": None, "encoding": "column"}
+            arr = None
+            if which == "edge" and key in endpoint_keys:
+                prefix = endpoint_keys[key]
+                arr = _encode_endpoints(
+                    values,
+                    mask,
+                    getattr(index, f"{prefix}_ptr"),
+                    getattr(index, f"{prefix}_idx"),
+                    vertices,
+                )
+                if arr is not None:
+                    entry["encoding"] = prefix
+            if arr is None:
+                arr = _encode(_fill_missing(values, mask))
+            writer.array(name, arr)
+            if not mask.all():
+                entry["mask"] = writer.array(f"{name}_mask", mask)
+            attrs[which].append(entry)
+    header = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "num_vertices": len(vertices),
+        "num_edges": graph.num_edges,
+        "default_edge_type": EdgeType(graph._default_edge_type).value,
+        "columnar": bool(getattr(graph, "columnar", False)),
+        "edge_attrs": attrs["edge"],
+        "vertex_attrs": attrs["vertex"],
+    }
+    return writer.close(header)
+
+
+def save_graph(
+    graph: BaseGraph,
+    path: str,
+    container: str = "npz",
+    compression: Optional[str] = None,
+) -> None:
+    """Save a graph in the columnar format.
+
+    Args:
+        graph (BaseGraph): Graph to save.
+        path (str): Path of the `.npz` file or of the directory.
+        container (str): Either "npz" (single zip file) or "dir" (one file per
+            array). Defaults to "npz".
+        compression (Optional[str]): "zstd", "lz4", "auto" (first available codec,
+            or none) or None (no compression). Compressed arrays can not be
+            memory-mapped. Defaults to None.
+
+    Raises:
+        ValueError: If the container or the compression are not valid.
+    """
+    if container not in ("npz", "dir"):
+        raise ValueError(f"Unknown container {container}, use 'npz' or 'dir'")
+    _write_graph(graph, _FileWriter(path, container, _select_codec(compression)))
+
+
+def _read_npy_header(f: Any) -> Tuple[Tuple[int, ...], bool, np.dtype]:
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(f)
+    return np.lib.format.read_array_header_2_0(f)
+
+
+def _open_memmap(filename: str, offset: int, mmap_mode: str) -> Optional[np.ndarray]:
+    with open(filename, "rb") as f:
+        f.seek(offset)
+        shape, fortran_order, dtype = _read_npy_header(f)
+        data_offset = f.tell()
+    if dtype.hasobject:
+        return None
+    if int(np.prod(shape)) == 0:
+        return np.empty(shape, dtype=dtype)
+    order = "F" if fortran_order else "C"
+    arr = np.memmap(
+        filename,
+        dtype=dtype,
+        mode=mmap_mode,
+        shape=shape,
+        order=order,
+        offset=data_offset,
+    )
+    return arr.view(np.ndarray)
+
+
+def _check_header(header: Dict[str, Any], source: str) -> None:
+    if header.get("format", None) != FORMAT_NAME:
+        raise ValueError(f"{source} does not contain a graph")
+    if header["version"] > FORMAT_VERSION:
+        raise ValueError(
+            f"{source} was saved with version {header['version']} of the "
+            f"format, the newest supported version is {FORMAT_VERSION}"
+        )
+
+
+class _Reader:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        if os.path.isdir(path):
+            self._zip = None
+            with open(os.path.join(path, _HEADER), "rb") as f:
+                self.header = json.loads(f.read().decode("utf-8"))
+        else:
+            self._zip = zipfile.ZipFile(path, "r")
+            self.header = json.loads(self._zip.read(_HEADER).decode("utf-8"))
+        _check_header(self.header, path)
+
+    def _offset(self, member: str) -> Optional[int]:
+        # Position of the data of an uncompressed zip member in the file
+        info = self._zip.getinfo(member)
+        if info.compress_type != zipfile.ZIP_STORED:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+        if local_header[:4] != b"PK\x03\x04":
+            return None
+        name_len, extra_len = struct.unpack("<HH", local_header[26:30])
+        return info.header_offset + 30 + name_len + extra_len
+
+    def _read_bytes(self, member: str) -> bytes:
+        if self._zip is not None:
+            return self._zip.read(member)
+        with open(os.path.join(self.path, member), "rb") as f:
+            return f.read()
+
+    def array(self, name: str, mmap_mode: Optional[str] = None) -> np.ndarray:
+        member = self.header["arrays"][name]
+        codec = self.header.get("compression", None)
+        if codec is None and mmap_mode is not None:
+            if self._zip is None:
+                arr = _open_memmap(os.path.join(self.path, member), 0, mmap_mode)
+            else:
+                offset = self._offset(member)
+                arr = None
+                if offset is not None:
+                    arr = _open_memmap(self.path, offset, mmap_mode)
+            if arr is not None:
+                return arr
+        data = self._read_bytes(member)
+        if codec is not None:
+            data = _CODECS[codec][1]()[1](data)
+        return np.lib.format.read_array(io.BytesIO(data), allow_pickle=True)
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+
+
+def _align(n: int, alignment: int = 64) -> int:
+    return -(-n // alignment) * alignment
+
+
+class _SharedMemory(shared_memory.SharedMemory):
+    def __del__(self):
+        try:
+            self.close()
+        except (OSError, BufferError):
+            # Arrays still use the block, it is unmapped when they are released
+            pass
+
+
+class _SharedWriter(_Writer):
+    # Packs the members in a single shared memory block, with the layout
+    # [header size (8 bytes)][header][members], members aligned to 64 bytes
+    def __init__(self) -> None:
+        super().__init__(None)
+        self._data: List[Tuple[str, bytes]] = []
+
+    def _write(self, member: str, data: bytes) -> None:
+        self._data.append((member, data))
+
+    def close(self, header: Dict[str, Any]) -> shared_memory.SharedMemory:
+        header["arrays"] = self.members
+        header["compression"] = None
+        offsets, size = dict(), 0
+        for member, data in self._data:
+            size = _align(size)
+            offsets[member] = [size, len(data)]
+            size += len(data)
+        header["offsets"] = offsets
+        encoded = json.dumps(header).encode("utf-8")
+        start = _align(8 + len(encoded))
+        shm = _SharedMemory(create=True, size=max(start + size, 1))
+        shm.buf[:8] = struct.pack("<Q", len(encoded))
+        shm.buf[8 : 8 + len(encoded)] = encoded
+        for member, data in self._data:
+            offset = start + offsets[member][0]
+            shm.buf[offset : offset + len(data)] = data
+        return shm
+
+
+class _SharedReader:
+    def __init__(self, shm: shared_memory.SharedMemory) -> None:
+        self.shm = shm
+        size = struct.unpack("<Q", bytes(shm.buf[:8]))[0]
+        self.header = json.loads(bytes(shm.buf[8 : 8 + size]).decode("utf-8"))
+        self._start = _align(8 + size)
+        _check_header(self.header, f"Shared memory block {shm.name}")
+
+    def array(self, name: str, mmap_mode: Optional[str] = None) -> np.ndarray:
+        # Without mmap_mode, a copy of the array is returned. Otherwise, the
+        # array is a read-only view of the shared block.
+        member = self.header["arrays"][name]
+        offset, size = self.header["offsets"][member]
+        offset += self._start
+        data = self.shm.buf[offset : offset + size]
+        f = io.BytesIO(data[: min(size, 4096)])
+        shape, fortran_order, dtype = _read_npy_header(f)
+        if dtype.hasobject:
+            return np.lib.format.read_array(io.BytesIO(data), allow_pickle=True)
+        arr = np.ndarray(
+            shape,
+            dtype=dtype,
+            buffer=self.shm.buf,
+            offset=offset + f.tell(),
+            order="F" if fortran_order else "C",
+        )
+        if mmap_mode is None:
+            return arr.copy()
+        arr.flags.writeable = False
+        return arr
+
+    def close(self) -> None:
+        pass
+
+
+@contextmanager
+def _gc_paused():
+    # Creating many small containers triggers frequent (and useless) collections
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _split(values: List[Any], ptr: np.ndarray) -> List[Tuple]:
+    bounds = ptr.tolist()
+    return [tuple(values[bounds[i] : bounds[i + 1]]) for i in range(len(bounds) - 1)]
+
+
+def load_graph(
+    path: str, mmap_mode: Optional[str] = None, columnar: Optional[bool] = None
+) -> Graph:
+    """Load a graph saved in the columnar format.
+
+    Args:
+        path (str): Path of the `.npz` file or of the directory.
+        mmap_mode (Optional[str]): If provided ("r", "r+" or "c"), uncompressed
+            arrays are memory-mapped instead of read into memory (see
+            `numpy.memmap`). The compiled index of the graph and the numeric
+            attributes of columnar graphs use the mapped arrays directly. With
+            "r", these attributes are read-only. Defaults to None.
+        columnar (Optional[bool]): Store the attributes in columns. Defaults to
+            the mode of the saved graph.
+
+    Returns:
+        Graph: The loaded graph.
+
+    Raises:
+        ValueError: If the path does not contain a graph or the version of the
+            format is not supported.
+    """
+    reader = _Reader(path)
+    with _gc_paused():
+        try:
+            return _read_graph(reader, mmap_mode, columnar)
+        finally:
+            reader.close()
+
+
+def _read_graph(
+    reader: _Reader, mmap_mode: Optional[str], columnar: Optional[bool]
+) -> Graph:
+    header = reader.header
+    if columnar is None:
+        columnar = header.get("columnar", False)
+    g = Graph(
+        default_edge_type=EdgeType(header["default_edge_type"]),
+        columnar=columnar,
+    )
+    g._graph_attr = Attributes(reader.array("graph_attr").item())
+    vertices = reader.array("vertices").tolist()
+    g.add_vertices(vertices)
+    arrays = {
+        name: reader.array(name, mmap_mode=mmap_mode)
+        for name in ["src_ptr", "src_idx", "tgt_ptr", "tgt_idx", "edge_type"]
+    }
+    src_vertices = [vertices[i] for i in arrays["src_idx"].tolist()]
+    tgt_vertices = [vertices[i] for i in arrays["tgt_idx"].tolist()]
+    sources = _split(src_vertices, arrays["src_ptr"])
+    targets = _split(tgt_vertices, arrays["tgt_ptr"])
+
+    columns: Dict[str, Any] = dict()
+    endpoint_values: Dict[str, Any] = {"src": None, "tgt": None}
+    adopted: Dict[str, np.ndarray] = dict()
+    partial: List[Tuple[str, Optional[List[Any]], np.ndarray]] = []
+    for entry in header["edge_attrs"]:
+        key = entry["key"]
+        values = reader.array(entry["values"], mmap_mode=mmap_mode)
+        mask = None
+        if entry["mask"] is not None:
+            mask = reader.array(entry["mask"])
+        if entry["encoding"] in endpoint_values:
+            ptr = arrays[f"{entry['encoding']}_ptr"]
+            endpoint_values[entry["encoding"]] = _split(values.tolist(), ptr)
+            if mask is not None:
+                partial.append((key, None, mask))
+        elif mask is not None:
+            partial.append((key, values.tolist(), mask))
+        elif g.columnar and values.dtype.kind in "biuf":
+            adopted[key] = values
+        else:
+            columns[key] = values.tolist()
+    g._add_edges_bulk(
+        sources,
+        targets,
+        type=g._default_edge_type,
+        source_values=endpoint_values["src"],
+        target_values=endpoint_values["tgt"],
+        columns=columns,
+    )
+    for key, values in adopted.items():
+        g.set_edge_attr_array(key, values)
+    for key, values, mask in partial:
+        # Attributes that are not present in all the edges. Endpoint values
+        # and edge types are already set for all edges by _add_edges_bulk
+        for i in np.flatnonzero(~mask).tolist():
+            attr = g.get_attr_edge(i)
+            if key in attr:
+                del attr[key]
+        if values is not None:
+            for i in np.flatnonzero(mask).tolist():
+                g.get_attr_edge(i)[key] = values[i]
+
+    for entry in header["vertex_attrs"]:
+        key = entry["key"]
+        values = reader.array(entry["values"], mmap_mode=mmap_mode)
+        if entry["mask"] is not None:
+            mask = reader.array(entry["mask"])
+            values = values.tolist()
+            for i in np.flatnonzero(mask).tolist():
+                g.add_vertex(vertices[i], **{key: values[i]})
+        elif g.columnar and values.dtype.kind in "biuf":
+            g.set_vertex_attr_array(key, values)
+        else:
+            g.set_vertex_attr_array(key, values.tolist())
+
+    # Reuse the stored arrays as the compiled index
+    index = GraphIndex(
+        len(vertices),
+        arrays["edge_type"],
+        arrays["src_ptr"],
+        arrays["src_idx"],
+        arrays["tgt_ptr"],
+        arrays["tgt_idx"],
+    )
+    g._cached("index", lambda: index)
+    return g
@@ -0,0 +1,294 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from corneto._graph import BaseGraph, EdgeType, Graph, ReadOnlyGraphError
+from corneto._graph_attr import _fill_column, _to_python
+from corneto._graph_index import GraphIndex
+from corneto._graph_io import (
+    _ENDPOINT_KEYS,
+    _gc_paused,
+    _read_graph,
+    _Reader,
+    _SharedMemory,
+    _SharedReader,
+    _SharedWriter,
+    _split,
+    _write_graph,
+)
+from corneto._types import Edge
+from corneto.utils import Attr, Attributes
+
+
+class ReadOnlyGraph(BaseGraph):
+    """Read-only graph backed by memory-mapped files or shared memory.
+
+    The structure and the attributes of the graph are the arrays of the
+    columnar format (see :mod:`corneto._graph_io`), memory-mapped from a file
+    saved with `Graph.save` (:meth:`open`) or stored in a shared memory block
+    (:meth:`share`). The arrays are used without copies: processes that open
+    the same file or attach to the same block share the same physical memory,
+    and opening a graph takes the same time regardless of its size. Python
+    objects (the vertices, the edges or the attributes of an edge) are created
+    only when they are accessed.
+
+    Pickling a ReadOnlyGraph only stores the location of the arrays, so the
+    graph can be sent to worker processes (e.g., with `multiprocessing.Pool`)
+    without copying it. Attributes returned by `get_attr_edge` and
+    `get_attr_vertex` are copies. Use :meth:`materialize` to get a modifiable
+    :class:`Graph`.
+
+    Examples:
+    --------
+    >>> with graph.share() as shared:
+    ...     with multiprocessing.Pool(32) as pool:
+    ...         results = pool.map(run, [(shared, sample) for sample in samples])
+    """
+
+    def __init__(self, reader: Any, source: Tuple[str, str]) -> None:
+        header = reader.header
+        super().__init__(default_edge_type=EdgeType(header["default_edge_type"]))
+        self._reader = reader
+        self._source = source
+        self._header = header
+        self._arrays: Dict[str, np.ndarray] = dict()
+        self._attrs = {
+            which: {entry["key"]: entry for entry in header[f"{which}_attrs"]}
+            for which in ("edge", "vertex")
+        }
+
+    @staticmethod
+    def open(filename: str) -> "ReadOnlyGraph":
+        """Open a graph saved in the columnar format (memory-mapped).
+
+        Compressed arrays can not be memory-mapped and are read into memory.
+
+        Args:
+            filename (str): Name of the `.npz` file or of the directory.
+
+        Returns:
+            ReadOnlyGraph: The graph.
+        """
+        return ReadOnlyGraph(_Reader(filename), ("file", filename))
+
+    @staticmethod
+    def share(graph: BaseGraph) -> "ReadOnlyGraph":
+        """Copy a graph to a new shared memory block.
+
+        The process that creates the block has to release it with `unlink`
+        (or by using the graph as a context manager) once the workers finish.
+
+        Args:
+            graph (BaseGraph): The graph to share.
+
+        Returns:
+            ReadOnlyGraph: The graph, stored in shared memory.
+        """
+        shm = _write_graph(graph, _SharedWriter())
+        return ReadOnlyGraph(_SharedReader(shm), ("shm", shm.name))
+
+    @staticmethod
+    def attach(name: str) -> "ReadOnlyGraph":
+        """Attach to a graph stored in a shared memory block.
+
+        Args:
+            name (str): Name of the shared memory block (see `name`).
+
+        Returns:
+            ReadOnlyGraph: The graph.
+        """
+        return ReadOnlyGraph(_SharedReader(_SharedMemory(name=name)), ("shm", name))
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block or path of the file of the graph."""
+        return self._source[1]
+
+    def unlink(self) -> None:
+        """Release the shared memory block of the graph.
+
+        Processes that are attached to the block can still use it, but new
+        processes can not attach to it.
+        """
+        if self._source[0] == "shm":
+            self._reader.shm.unlink()
+
+    def __enter__(self) -> "ReadOnlyGraph":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.unlink()
+
+    def __reduce__(self):
+        return (_attach, (self._source,))
+
+    def _array(self, name: str) -> np.ndarray:
+        arr = self._arrays.get(name, None)
+        if arr is None:
+            arr = self._reader.array(name, mmap_mode="r")
+            self._arrays[name] = arr
+        return arr
+
+    def _read_only(self, *args, **kwargs):
+        raise ReadOnlyGraphError(
+            "ReadOnlyGraph can not be modified, use materialize() to get a "
+            "modifiable copy"
+        )
+
+    _add_edge = _read_only
+    _add_edges_bulk = _read_only
+    _add_vertex = _read_only
+    set_edge_attr_array = _read_only
+    set_vertex_attr_array = _read_only
+
+    def _vertex_list(self) -> List[Any]:
+        return self._cached("vertex_list", lambda: self._array("vertices").tolist())
+
+    def _vertex_map(self) -> Dict[Any, int]:
+        return self._cached(
+            "vertex_map", lambda: {v: i for i, v in enumerate(self._vertex_list())}
+        )
+
+    def _edge_list(self) -> List[Edge]:
+        def build():
+            V = self._vertex_list()
+            edges = []
+            for prefix in ("src", "tgt"):
+                vertices = [V[i] for i in self._array(f"{prefix}_idx").tolist()]
+                edges.append(
+                    map(frozenset, _split(vertices, self._array(f"{prefix}_ptr")))
+                )
+            return list(zip(*edges))
+
+        return self._cached("edge_list", build)
+
+    def _build_index(self) -> GraphIndex:
+        return GraphIndex(
+            self._header["num_vertices"],
+            self._array("edge_type"),
+            self._array("src_ptr"),
+            self._array("src_idx"),
+            self._array("tgt_ptr"),
+            self._array("tgt_idx"),
+        )
+
+    def get_edge(self, index: int) -> Edge:
+        return self._edge_list()[index]
+
+    def get_vertex(self, index: int) -> Any:
+        return self._vertex_list()[index]
+
+    def _get_vertices(self) -> Iterable:
+        return iter(self._vertex_list())
+
+    def _get_incident_edges(self, vertex) -> Iterable[int]:
+        v = self._vertex_map()[vertex]
+        return set(self.get_index().incident_edges(np.array([v])).tolist())
+
+    def _attr_value(self, entry: Dict[str, Any], row: int) -> Any:
+        mask = entry["mask"]
+        if mask is not None and not self._array(mask)[row]:
+            raise KeyError(entry["key"])
+        values = self._array(entry["values"])
+        if entry["encoding"] in _ENDPOINT_KEYS:
+            prefix = entry["encoding"]
+            ptr = self._array(f"{prefix}_ptr")
+            idx = self._array(f"{prefix}_idx")[ptr[row] : ptr[row + 1]].tolist()
+            V = self._vertex_list()
+            coeffs = values[ptr[row] : ptr[row + 1]].tolist()
+            return Attributes(
+                (V[i], Attributes({Attr.VALUE.value: c})) for i, c in zip(idx, coeffs)
+            )
+        return _to_python(values[row])
+
+    def _attributes(self, which: str, row: int) -> Attributes:
+        attr = Attributes()
+        for key, entry in self._attrs[which].items():
+            try:
+                attr[key] = self._attr_value(entry, row)
+            except KeyError:
+                pass
+        return attr
+
+    def _get_edge_attributes(self, index: int) -> Attributes:
+        if not 0 <= index < self.num_edges:
+            raise IndexError(f"Edge index {index} out of range")
+        return self._attributes("edge", index)
+
+    def _get_vertex_attributes(self, v) -> Attributes:
+        return self._attributes("vertex", self._vertex_map()[v])
+
+    def get_graph_attributes(self) -> Attributes:
+        return self._cached(
+            "graph_attr", lambda: Attributes(self._array("graph_attr").item())
+        )
+
+    def _attr_array(
+        self, which: str, key: str, default: Any, dtype: Optional[Any]
+    ) -> Optional[np.ndarray]:
+        entry = self._attrs[which].get(key, None)
+        if entry is not None and entry["encoding"] != "column":
+            return None
+        n = self.num_edges if which == "edge" else self.num_vertices
+        if entry is None:
+            values = np.array([default] * n, dtype=dtype)
+        else:
+            values = self._array(entry["values"])
+            if entry["mask"] is not None:
+                values = _fill_column(values, self._array(entry["mask"]), default)
+        if dtype is not None:
+            values = values.astype(dtype, copy=False)
+        return values
+
+    def get_edge_attr_array(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        values = self._attr_array("edge", key, default, dtype)
+        if values is None:
+            return super().get_edge_attr_array(key, default=default, dtype=dtype)
+        return values
+
+    def get_vertex_attr_array(
+        self, key: str, default: Any = None, dtype: Optional[Any] = None
+    ) -> np.ndarray:
+        values = self._attr_array("vertex", key, default, dtype)
+        if values is None:
+            return super().get_vertex_attr_array(key, default=default, dtype=dtype)
+        return values
+
+    def _num_vertices(self) -> int:
+        return self._header["num_vertices"]
+
+    def _num_edges(self) -> int:
+        return self._header["num_edges"]
+
+    def extract_subgraph(
+        self, vertices: Optional[Iterable] = None, edges: Optional[Iterable[int]] = None
+    ):
+        return self.materialize().extract_subgraph(vertices=vertices, edges=edges)
+
+    def materialize(self, columnar: Optional[bool] = None) -> Graph:
+        """Create a modifiable copy of the graph in memory.
+
+        Args:
+            columnar (Optional[bool]): Store the attributes in columns. Defaults
+                to the mode of the original graph.
+
+        Returns:
+            Graph: The graph.
+        """
+        with _gc_paused():
+            return _read_graph(self._reader, None, columnar)
+
+    def copy(self) -> Graph:
+        return self.materialize()
+
+    def reverse(self) -> Graph:
+        return self.materialize().reverse()
+
+
+def _attach(source: Tuple[str, str]) -> ReadOnlyGraph:
+    kind, location = source
+    if kind == "shm":
+        return ReadOnlyGraph.attach(location)
+    return ReadOnlyGraph.open(location)
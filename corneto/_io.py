@@ -1,7 +1,10 @@
+from itertools import islice
 from pathlib import Path
 from typing import (
+    Any,
     Dict,
     Iterable,
+    Iterator,
     List,
     Optional,
     Set,
@@ -11,31 +14,139 @@ from typing import (
 
 import numpy as np
 
+from corneto._settings import LOGGER
 from corneto._types import CobraModel, TupleSIF
 
 
-def _read_sif(
+def _open_text(filename: Union[str, Path]):
+    # Text stream of a plain, gzip, xz or bz2 compressed file
+    filename = str(filename)
+    if filename.endswith(".gz"):
+        import gzip
+
+        return gzip.open(filename, "rt", newline="")
+    if filename.endswith((".xz", ".lzma")):
+        import lzma
+
+        return lzma.open(filename, "rt", newline="")
+    if filename.endswith(".bz2"):
+        import bz2
+
+        return bz2.open(filename, "rt", newline="")
+    return open(filename, "r", newline="")
+
+
+def _read_sif_chunks(
     sif_file: Union[str, Path],
     delimiter: str = "\t",
     has_header: bool = False,
     discard_self_loops: Optional[bool] = True,
     column_order: List[int] = [0, 1, 2],  # source interaction target
-) -> List[TupleSIF]:
+    chunk_size: int = 100_000,
+    deduplicate: bool = False,
+) -> Iterator[Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]]:
+    """Read a SIF file in chunks, with vertex names mapped to integer ids.
+
+    The file (optionally compressed with gzip, xz or bz2) is read `chunk_size`
+    lines at a time, so memory usage does not depend on the size of the file
+    but on the number of distinct vertices and (if `deduplicate` is True)
+    edges.
+
+    Args:
+        sif_file (Union[str, Path]): Path of the file.
+        delimiter (str): Column delimiter. Defaults to tab.
+        has_header (bool): Skip the first line. Defaults to False.
+        discard_self_loops (Optional[bool]): Skip lines with the same source and
+            target. Defaults to True.
+        column_order (List[int]): Position of the source, interaction and
+            target columns. Defaults to [0, 1, 2].
+        chunk_size (int): Number of lines per chunk. Defaults to 100000.
+        deduplicate (bool): Skip repeated (source, interaction, target) lines.
+            Defaults to False.
+
+    Yields:
+        Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]: The list of vertex
+        names seen so far (the id of a vertex is its position in the list, the
+        list only grows between chunks), and the source ids, interactions and
+        target ids of the edges in the chunk.
+
+    Raises:
+        ValueError: If a (non-empty) line does not have 3 columns.
+    """
     import csv
 
-    reactions = set()
-    with open(sif_file, "r") as f:
+    vertices: List[str] = []
+    vertex_ids: Dict[str, int] = dict()
+    # Interaction -> packed (source, target) ids of the edges already read
+    seen: Dict[int, Set[int]] = dict()
+    si, di, ti = column_order
+
+    def intern(name: str) -> int:
+        vid = vertex_ids.get(name, None)
+        if vid is None:
+            vid = len(vertices)
+            vertex_ids[name] = vid
+            vertices.append(name)
+        return vid
+
+    with _open_text(sif_file) as f:
         reader = csv.reader(f, delimiter=delimiter)
-        for i, line in enumerate(reader):
-            if has_header and i == 0:
-                continue
-            if len(line) != 3:
-                raise ValueError(f"Invalid SIF line: {line}: expected 3 columns")
-            s, d, t = [line[idx] for idx in column_order]
-            if discard_self_loops and s == t:
-                continue
-            reactions |= set([(s, int(d), t)])
-    return list(reactions)
+        if has_header:
+            next(reader, None)
+        while True:
+            lines = list(islice(reader, chunk_size))
+            if len(lines) == 0:
+                break
+            source, interaction, target = [], [], []
+            for line in lines:
+                if len(line) != 3:
+                    if len(line) == 0:
+                        continue
+                    raise ValueError(f"Invalid SIF line: {line}: expected 3 columns")
+                s, d, t = line[si], int(line[di]), line[ti]
+                if discard_self_loops and s == t:
+                    continue
+                sid, tid = intern(s), intern(t)
+                if deduplicate:
+                    pairs = seen.setdefault(d, set())
+                    key = (sid << 32) | tid
+                    if key in pairs:
+                        continue
+                    pairs.add(key)
+                source.append(sid)
+                interaction.append(d)
+                target.append(tid)
+            if len(source) > 0:
+                yield (
+                    vertices,
+                    np.array(source, dtype=np.int64),
+                    np.array(interaction, dtype=np.int64),
+                    np.array(target, dtype=np.int64),
+                )
+
+
+def _read_sif(
+    sif_file: Union[str, Path],
+    delimiter: str = "\t",
+    has_header: bool = False,
+    discard_self_loops: Optional[bool] = True,
+    column_order: List[int] = [0, 1, 2],  # source interaction target
+) -> List[TupleSIF]:
+    reactions: List[TupleSIF] = []
+    chunks = _read_sif_chunks(
+        sif_file,
+        delimiter=delimiter,
+        has_header=has_header,
+        discard_self_loops=discard_self_loops,
+        column_order=column_order,
+        deduplicate=True,
+    )
+    for vertices, source, interaction, target in chunks:
+        reactions.extend(
+            (vertices[s], d, vertices[t])
+            for s, d, t in zip(source.tolist(), interaction.tolist(), target.tolist())
+        )
+    return reactions
 
 
 def _read_sif_iter(
@@ -47,7 +158,7 @@ def _read_sif_iter(
 ) -> Iterable[TupleSIF]:
     import csv
 
-    with open(sif_file, "r") as f:
+    with _open_text(sif_file) as f:
         reader = csv.reader(f, delimiter=delimiter)
         for i, line in enumerate(reader):
             if has_header and i == 0:
@@ -95,15 +206,44 @@ def _get_reaction_species(reactions: Dict[str, Dict[str, int]]) -> Set[str]:
     return species
 
 
+def _coo_matrix(
+    data: List[float],
+    rows: List[int],
+    cols: List[int],
+    shape: Tuple[int, int],
+    sparse: bool = False,
+) -> Any:
+    # Dense array, or scipy CSR array if sparse is True (and scipy is installed)
+    if sparse:
+        try:
+            from scipy import sparse as sp  # type: ignore
+
+            return sp.csr_array(
+                (np.asarray(data, dtype=float), (rows, cols)), shape=shape
+            )
+        except ImportError:
+            LOGGER.warning("Scipy not installed, using a dense matrix instead.")
+    S = np.zeros(shape)
+    S[rows, cols] = data
+    return S
+
+
 def _stoichiometry(
     reactions: Dict[str, Dict[str, int]],
-) -> Tuple[np.ndarray, List[str], List[str]]:
+    sparse: bool = False,
+) -> Tuple[Any, List[str], List[str]]:
     reactions_ids = list(reactions.keys())
     compounds_ids = list(_get_reaction_species(reactions))
-    S = np.zeros((len(compounds_ids), len(reactions_ids)))
-    for i, r in enumerate(reactions_ids):
+    compound_index = {c: i for i, c in enumerate(compounds_ids)}
+    rows, cols, coeffs = [], [], []
+    for j, r in enumerate(reactions_ids):
         for c, coeff in reactions[r].items():
-            S[compounds_ids.index(c), i] = coeff
+            rows.append(compound_index[c])
+            cols.append(j)
+            coeffs.append(coeff)
+    S = _coo_matrix(
+        coeffs, rows, cols, (len(compounds_ids), len(reactions_ids)), sparse
+    )
     return S, reactions_ids, compounds_ids
 
 
@@ -118,15 +258,26 @@ def _index_reactions(list_reactions: List[Tuple[str, int, str]]):
             rxn_id = t
         if rxn_id is None:
             rxn_id = f"{s}--({d})--{t}"
-        rxn[rxn_id] = rxn.get(rxn_id, []) + [(s, d, t)]
+        rxn.setdefault(rxn_id, []).append((s, d, t))
     return rxn
 
 
-def load_sif_from_tuples(tpl: List[TupleSIF]):
+def load_sif_from_tuples(tpl: List[TupleSIF], sparse: bool = False):
+    """Create the stoichiometric matrix of a list of SIF tuples.
+
+    Args:
+        tpl (List[TupleSIF]): (source, interaction, target) tuples.
+        sparse (bool): Return a scipy sparse (CSR) matrix instead of a dense
+            array. Defaults to False.
+
+    Returns:
+        Tuple: The stoichiometric matrix, the species, the reactions and the
+        interaction of each reaction with a single SIF tuple.
+    """
     indexed_reactions = _index_reactions(tpl)
     reactions = {k: _reaction_stoichiometry(v) for k, v in indexed_reactions.items()}
     reaction_values: Dict[int, float] = dict()
-    S, rxn_ids, species_ids = _stoichiometry(reactions)
+    S, rxn_ids, species_ids = _stoichiometry(reactions, sparse=sparse)
     for i in range(len(rxn_ids)):
         v = indexed_reactions[rxn_ids[i]]
         if len(v) == 1:
@@ -141,6 +292,7 @@ def load_sif(
     has_header: bool = False,
     discard_self_loops: Optional[bool] = True,
     column_order: List[int] = [0, 1, 2],
+    sparse: bool = False,
 ):
     reaction_tpls = _read_sif(
         sif_file,
@@ -149,7 +301,7 @@ def load_sif(
         discard_self_loops=discard_self_loops,
         column_order=column_order,
     )
-    return load_sif_from_tuples(reaction_tpls)
+    return load_sif_from_tuples(reaction_tpls, sparse=sparse)
 
 
 def import_cobra_model(model: CobraModel) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
@@ -7,7 +7,7 @@ import numpy as np
 
 from corneto._constants import *
 from corneto._graph import Graph as NGraph
-from corneto._io import load_sif
+from corneto._io import _coo_matrix, load_sif
 from corneto._types import StrOrInt, TupleSIF
 
 
@@ -821,16 +821,19 @@ class GReNet(ReNet):
     @staticmethod
     def create_stoichiometric_matrix(
         graph: Graph,
-    ) -> Tuple[np.ndarray, List[str], List[str]]:
+        sparse: bool = False,
+    ) -> Tuple[Any, List[str], List[str]]:
         nodes = list(graph._nodes.keys())
         edges = list(graph._edges.keys())
-        S = np.zeros((len(nodes), len(edges)))
-        for j in range(S.shape[1]):
-            rxn = edges[j]
+        node_index = {n: i for i, n in enumerate(nodes)}
+        rows, cols, vals = [], [], []
+        for j, rxn in enumerate(edges):
             coeffs = graph._edge_properties[rxn]["__nodes__"]
-            idx, vals = zip(*coeffs.items())
-            idx = [nodes.index(i) for i in idx]
-            S[idx, j] = vals
+            for node, coeff in coeffs.items():
+                rows.append(node_index[node])
+                cols.append(j)
+                vals.append(coeff)
+        S = _coo_matrix(vals, rows, cols, (len(nodes), len(edges)), sparse=sparse)
         return S, nodes, edges
 
     def get_stoichiometry(self) -> np.ndarray:
@@ -951,10 +954,12 @@ def legacy_graphviz(
     custom_vertex = dict()
     custom_edge = dict()
     if problem:
-        if hasattr(problem, "symbols"):
+        if hasattr(problem, "expressions"):
+            problem = {k: v.value for k, v in problem.expressions.items()}
+        elif hasattr(problem, "symbols"):
             problem = {k: v.value for k, v in problem.symbols.items()}
         # TODO: very ad-hoc, improve
-        c = [k for k in problem.keys() if k.startswith("reaction_sends_activation")]
+        c = [k for k in problem.keys() if k.startswith("reaction_sends_activation_")]
         if len(c) > 1 and condition is None:
             raise ValueError(
                 "Detected multiple conditions defined in problem, but a condition was not provided"
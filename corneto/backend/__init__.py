@@ -6,10 +6,11 @@ from corneto.backend._base import (
 )
 from corneto.backend._cvxpy_backend import CvxpyBackend
 from corneto.backend._picos_backend import PicosBackend
+from corneto.backend._scipy_backend import ScipyBackend
 
-supported_backends = [CvxpyBackend(), PicosBackend()]
+supported_backends = [CvxpyBackend(), PicosBackend(), ScipyBackend()]
 
-__all__ = ["Backend", "VarType", "CvxpyBackend", "PicosBackend", "s"]
+__all__ = ["Backend", "VarType", "CvxpyBackend", "PicosBackend", "ScipyBackend", "s"]
 
 
 def available_backends():
@@ -35,6 +36,8 @@ else:
             if solver.lower() in available:
                 DEFAULT_SOLVER = solver
                 break
+    elif isinstance(DEFAULT_BACKEND, ScipyBackend):
+        DEFAULT_SOLVER = "HIGHS"
     else:
         import picos as pc
 
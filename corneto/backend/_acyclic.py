@@ -0,0 +1,248 @@
+"""Encodings of the acyclicity of the selected edges of a graph.
+
+The edges (arcs) are given as groups of `(s_idx, t_idx, selected)`, where
+`s_idx` and `t_idx` are the indexes of the source and target vertices of the
+arcs and `selected` is an expression with the binary indicators of the
+selected arcs.
+The selected arcs have to form a directed acyclic graph. The encodings are:
+
+- `layers`: a continuous layer position `L` per vertex, with
+  `L[t] - L[s] >= 1` for every selected arc. The constraint is disabled for
+  non-selected arcs with a big-M that is computed per arc from the bounds of
+  the layers, `M = 1 + ub[s] - lb[t]`, so lower bounds of the positions
+  (e.g. BFS distances from the sources) give tighter relaxations.
+- `scc`: the same constraints, only for the arcs between vertices of the
+  same strongly connected component, with one layer position per vertex in
+  a component and `M` equal to the size of the component. Cycles can only
+  be formed inside components, so the rest of the graph needs no
+  constraints.
+- `lazy`: no constraints are created. Instead, a generator of cycle
+  elimination cuts is returned, to be registered with
+  :meth:`ProblemDef.add_lazy_constraints`. After each solve, a cycle of
+  selected arcs is found in each strongly connected component of the
+  selected graph and the cut `sum(selected[cycle]) <= len(cycle) - 1` is added,
+  until the solution is acyclic.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from corneto._constants import VarType
+
+try:
+    from scipy import sparse  # type: ignore
+    from scipy.sparse.csgraph import connected_components  # type: ignore
+except ImportError:
+    sparse = None  # type: ignore
+    connected_components = None  # type: ignore
+
+ACYCLICITY_MODES = ("layers", "scc", "lazy")
+
+Arcs = Tuple[np.ndarray, np.ndarray, Any]
+
+
+def _components(n: int, s: np.ndarray, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Strongly connected component of each vertex and size of each component
+    if sparse is None:
+        raise ImportError("scipy is required to compute strongly connected components")
+    adj = sparse.csr_array((np.ones(len(s)), (s, t)), shape=(n, n))
+    _, labels = connected_components(adj, directed=True, connection="strong")
+    return labels, np.bincount(labels)
+
+
+def _cycle(s: np.ndarray, t: np.ndarray, start: int) -> List[int]:
+    # Positions of the arcs of a cycle, following the arcs from `start`.
+    # All the vertices of the arcs have an outgoing arc (same component).
+    out = {}
+    for i in range(len(s)):
+        out.setdefault(s[i], i)
+    seen = {}
+    path: List[int] = []
+    v = start
+    while v not in seen:
+        seen[v] = len(path)
+        arc = out[v]
+        path.append(arc)
+        v = t[arc]
+    return path[seen[v] :]
+
+
+def _rows(X: Any, idx: np.ndarray, columns: Optional[int]) -> Any:
+    # Rows of a vector (`columns=None`) or a matrix with one column per graph
+    return X[idx] if columns is None else X[idx, :]
+
+
+def _tiled(x: np.ndarray, columns: Optional[int]) -> np.ndarray:
+    return x if columns is None else np.tile(np.reshape(x, (-1, 1)), (1, columns))
+
+
+def scc_layer_positions(
+    num_vertices: int, s: np.ndarray, t: np.ndarray, layers: np.ndarray
+) -> np.ndarray:
+    """Convert layer positions of all the vertices to the `scc` encoding.
+
+    Only the vertices in strongly connected components with more than one
+    vertex have a layer position in the `scc` encoding, bounded by the size of
+    their component. The positions are replaced by their rank inside the
+    component, which keeps `L[t] - L[s] >= 1` for the arcs that satisfy it.
+    This can be used to pass an initial solution (e.g. one built for the
+    `layers` encoding) to a problem that uses the `scc` encoding.
+
+    Args:
+        num_vertices (int): Number of vertices of the graph.
+        s (np.ndarray): Indexes of the source vertices of all the arcs.
+        t (np.ndarray): Indexes of the target vertices of all the arcs.
+        layers (np.ndarray): Layer position of each vertex, a vector or a
+            matrix with one column per selection of arcs.
+
+    Returns:
+        np.ndarray: Layer positions of the vertices in strongly connected
+        components, in the order of the layer variable of the `scc` encoding.
+    """
+    labels, sizes = _components(num_vertices, np.asarray(s), np.asarray(t))
+    cyclic = np.flatnonzero(sizes[labels] > 1)
+    layers = np.asarray(layers, dtype=float)[cyclic]
+    positions = np.zeros_like(layers)
+    for comp in np.unique(labels[cyclic]):
+        rows = np.flatnonzero(labels[cyclic] == comp)
+        ranks = np.argsort(np.argsort(layers[rows], axis=0, kind="stable"), axis=0)
+        positions[rows] = ranks
+    return positions
+
+
+def acyclic_constraints(
+    backend: Any,
+    num_vertices: int,
+    arcs: Sequence[Arcs],
+    mode: str = "layers",
+    lb: Optional[np.ndarray] = None,
+    ub: Optional[np.ndarray] = None,
+    name: str = "_dag_layer_pos",
+    columns: Optional[int] = None,
+) -> Tuple[List[Any], Optional[Callable]]:
+    """Create the constraints that force the selected arcs to be acyclic.
+
+    Args:
+        backend (Backend): Backend used to create the layer variables.
+        num_vertices (int): Number of vertices of the graph.
+        arcs (Sequence[Tuple[np.ndarray, np.ndarray, CExpression]]): Groups of
+            arcs `(s_idx, t_idx, selected)` with the indexes of the source and
+            target vertices and the indicators of the selected arcs.
+        mode (str): Encoding, one of `layers`, `scc` or `lazy`.
+        lb (Optional[np.ndarray]): Lower bounds of the layer position of each
+            vertex (only for `layers`). Defaults to 0.
+        ub (Optional[np.ndarray]): Upper bounds of the layer position of each
+            vertex (only for `layers`). Defaults to `num_vertices - 1`.
+        name (str): Name of the layer variable.
+        columns (Optional[int]): If provided, the indicators are matrices with
+            one column per independent selection of arcs (e.g. one per
+            condition), each of them has to be acyclic. The layer variable is
+            then a matrix with one column per selection.
+
+    Returns:
+        Tuple[List[CExpression], Optional[Callable]]: The constraints, and for
+        the `lazy` mode the generator of cuts for
+        :meth:`ProblemDef.add_lazy_constraints`.
+    """
+    if mode not in ACYCLICITY_MODES:
+        raise ValueError(
+            f"Unknown acyclicity mode {mode}, supported modes are {ACYCLICITY_MODES}"
+        )
+    arcs = [
+        (np.asarray(s, dtype=int), np.asarray(t, dtype=int), selected)
+        for s, t, selected in arcs
+        if len(s) > 0
+    ]
+    if mode == "lazy":
+        return [], _cycle_cuts(num_vertices, arcs, columns)
+    shape: Tuple[int, ...] = () if columns is None else (columns,)
+    constraints = []
+    if mode == "scc":
+        s_all = np.concatenate([s for s, _, _ in arcs] or [np.zeros(0, dtype=int)])
+        t_all = np.concatenate([t for _, t, _ in arcs] or [np.zeros(0, dtype=int)])
+        labels, sizes = _components(num_vertices, s_all, t_all)
+        cyclic = np.flatnonzero(sizes[labels] > 1)
+        pos = np.full(num_vertices, -1)
+        pos[cyclic] = np.arange(len(cyclic))
+        size = sizes[labels]
+        L = None
+        if len(cyclic) > 0:
+            L = backend.Variable(
+                name,
+                (len(cyclic), *shape),
+                np.zeros((len(cyclic), *shape)),
+                _tiled(size[cyclic] - 1.0, columns),
+            )
+        for s, t, selected in arcs:
+            # Self loops are cycles of a single arc
+            loops = np.flatnonzero(s == t)
+            if len(loops) > 0:
+                constraints.append(_rows(selected, loops, columns) == 0)
+            inner = np.flatnonzero((labels[s] == labels[t]) & (s != t))
+            if len(inner) > 0:
+                M = _tiled(size[s[inner]], columns)
+                D = _rows(L, pos[t[inner]], columns) - _rows(L, pos[s[inner]], columns)
+                selected_inner = _rows(selected, inner, columns)
+                constraints.append(D + (1 - selected_inner).multiply(M) >= 1)
+        return constraints, None
+    lb = np.zeros(num_vertices) if lb is None else np.asarray(lb, dtype=float)
+    ub = np.full(num_vertices, num_vertices - 1.0) if ub is None else np.asarray(ub)
+    L = backend.Variable(
+        name,
+        (num_vertices, *shape),
+        _tiled(lb, columns),
+        _tiled(ub, columns),
+        vartype=VarType.CONTINUOUS,
+    )
+    for s, t, selected in arcs:
+        M = _tiled(1 + ub[s] - lb[t], columns)
+        D = _rows(L, t, columns) - _rows(L, s, columns)
+        constraints.append(D + (1 - selected).multiply(M) >= 1)
+    return constraints, None
+
+
+def _cycle_cuts(
+    num_vertices: int, arcs: List[Arcs], columns: Optional[int] = None
+) -> Callable:
+    def select(indicators: Any, positions: np.ndarray, j: Optional[int]) -> Any:
+        return indicators[positions] if j is None else indicators[positions, j]
+
+    def column_cuts(j: Optional[int]) -> List[Any]:
+        selected = []
+        for k, (s, t, indicators) in enumerate(arcs):
+            value = np.asarray(indicators.value, dtype=float)
+            value = value.reshape(-1) if j is None else value.reshape(len(s), -1)[:, j]
+            for i in np.flatnonzero(value > 0.5):
+                selected.append((k, i, s[i], t[i]))
+        if len(selected) == 0:
+            return []
+        s_sel = np.array([a[2] for a in selected])
+        t_sel = np.array([a[3] for a in selected])
+        labels, sizes = _components(num_vertices, s_sel, t_sel)
+        result = []
+        for k, i, u, v in selected:
+            # Self loops are cycles of a single arc
+            if u == v:
+                result.append(select(arcs[k][2], np.array([i]), j) == 0)
+        inner = np.flatnonzero((labels[s_sel] == labels[t_sel]) & (s_sel != t_sel))
+        inner = inner[sizes[labels[s_sel[inner]]] > 1]
+        for comp in np.unique(labels[s_sel[inner]]):
+            idx = inner[labels[s_sel[inner]] == comp]
+            path = _cycle(s_sel[idx], t_sel[idx], s_sel[idx[0]])
+            cycle = [selected[a] for a in idx[path]]
+            total = 0
+            for k in sorted({a[0] for a in cycle}):
+                positions = np.array([a[1] for a in cycle if a[0] == k], dtype=int)
+                total = total + np.ones(len(positions)) @ select(
+                    arcs[k][2], positions, j
+                )
+            result.append(total <= len(cycle) - 1)
+        return result
+
+    def cuts(problem: Any) -> List[Any]:
+        if columns is None:
+            return column_cuts(None)
+        return [c for j in range(columns) for c in column_cuts(j)]
+
+    return cuts
@@ -1,7 +1,18 @@
 import abc
 import numbers
 from numbers import Number
-from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 
@@ -9,9 +20,21 @@ from corneto._constants import *
 from corneto._decorators import _delegate
 from corneto._graph import BaseGraph
 from corneto._settings import LOGGER, _get_matrix_builder
+from corneto.backend._acyclic import acyclic_constraints
+from corneto.backend._presolve import FlowReduction, presolve_flow
 from corneto.utils import Attributes
 
 
+def _expand_flow(
+    P: "ProblemDef", reduction: FlowReduction, names: List[str], builder: Callable
+) -> None:
+    # Map the registered expressions of the kept edges to all the edges
+    E = reduction.expansion(builder)
+    for name in names:
+        if name in P._expressions:
+            P._expressions[name] = E @ P._expressions[name]
+
+
 def _eq_shape(a: np.ndarray, b: np.ndarray) -> bool:
     if a.shape != b.shape:
         if len(a.shape) == 1 and len(b.shape) == 2:
@@ -44,29 +67,37 @@ class CExpression(abc.ABC):
     # See: https://www.cvxpy.org/_modules/cvxpy/expressions/expression.html#Expression
     __array_priority__ = 100
 
-    def __init__(self, expr: Any, symbols: Optional[Set["CSymbol"]] = None) -> None:
+    def __init__(
+        self, expr: Any, symbols: Optional[Iterable["CExpression"]] = None
+    ) -> None:
         super().__init__()
         self._expr = expr
-        self._proxy_symbols: Set["CSymbol"] = set()
+        # Symbols and expressions this expression was created from. The
+        # symbols are collected from this DAG only when they are needed
+        # (see `_proxy_symbols`), so creating an expression is O(1)
+        self._sources: Tuple[CExpression, ...] = tuple(symbols) if symbols else ()
+        self._symbols: Optional[FrozenSet["CSymbol"]] = None
         self._name = ""
-        if symbols:
-            self._proxy_symbols.update(symbols)
 
     def is_symbol(self) -> bool:
         return False
 
+    @property
+    def _proxy_symbols(self) -> FrozenSet["CSymbol"]:
+        """Symbols used by the expression."""
+        if self._symbols is None:
+            self._symbols = _collect_symbols(self)
+            # The sources are not needed anymore
+            self._sources = ()
+        return self._symbols
+
     def _create(self, expr: Any, atoms: Iterable) -> "CExpression":
-        symbols = {s for s in atoms if isinstance(s, CSymbol)}
-        if isinstance(self, CSymbol):
-            symbols.add(self)
-        if isinstance(self, CExpression):
-            symbols.update(self._proxy_symbols)
-        if isinstance(expr, CSymbol):
-            symbols.add(expr)
+        sources = [s for s in atoms if isinstance(s, CExpression)]
+        sources.append(self)
         if isinstance(expr, CExpression):
-            symbols.update(expr._proxy_symbols)
+            sources.append(expr)
         # Ask to create a CVXPY/PICOS/.. expression
-        return self._create_proxy_expr(expr, symbols)
+        return self._create_proxy_expr(expr, sources)
 
     @property
     def name(self):
@@ -74,7 +105,7 @@ class CExpression(abc.ABC):
 
     @abc.abstractmethod
     def _create_proxy_expr(
-        self, expr: Any, symbols: Optional[Set["CSymbol"]] = None
+        self, expr: Any, symbols: Optional[Iterable["CExpression"]] = None
     ) -> "CExpression":
         pass
 
@@ -145,6 +176,15 @@ class CExpression(abc.ABC):
     def _max(self, axis: Optional[int] = None) -> Any:
         pass
 
+    @abc.abstractmethod
+    def _reshape(self, shape: Tuple[int, ...]) -> Any:
+        pass
+
+    def reshape(self, shape: Tuple[int, ...]) -> "CExpression":
+        """Reshape the expression, reading the elements in C (row-major) order."""
+        # Not delegated: the native methods of the backends use other orders
+        return self._create(self._reshape(shape), [])
+
     @_delegate
     def max(self, axis: Optional[int] = None) -> "CExpression":
         return self._max(axis=axis)
@@ -246,6 +286,25 @@ class CExpression(abc.ABC):
     # TODO: add functions along axis: https://www.cvxpy.org/tutorial/functions/index.html
 
 
+def _collect_symbols(expr: CExpression) -> FrozenSet["CSymbol"]:
+    # Iterative traversal of the sources of the expression (expression
+    # trees can be deeper than the recursion limit)
+    symbols: Set[CSymbol] = set()
+    visited = {id(expr)}
+    stack = [expr]
+    while stack:
+        for s in stack.pop()._sources:
+            if isinstance(s, CSymbol):
+                symbols.add(s)
+            elif isinstance(s, CExpression) and id(s) not in visited:
+                visited.add(id(s))
+                if s._symbols is not None:
+                    symbols.update(s._symbols)
+                else:
+                    stack.append(s)
+    return frozenset(symbols)
+
+
 class CSymbol(CExpression):
     def __init__(
         self,
@@ -371,6 +430,25 @@ class CSymbol(CExpression):
         return self._is_variable
 
 
+class _SymbolTable(dict):
+    """Symbols by name that fall back to the registered expressions.
+
+    Only lookups (`table[name]`) fall back, so iterating over the table or
+    checking membership only sees the symbols. This keeps the names of
+    symbols that were replaced by columns of a shared variable (e.g.
+    `species_activated_c0` in `signflow`) working.
+    """
+
+    def __init__(self, expressions: Dict[str, CExpression]) -> None:
+        super().__init__()
+        self._expressions = expressions
+
+    def __missing__(self, name: str) -> CExpression:
+        if name in self._expressions:
+            return self._expressions[name]
+        raise KeyError(name)
+
+
 class ProblemDef:
     def __init__(
         self,
@@ -404,20 +482,45 @@ class ProblemDef:
         # where edges/nodes have associated optimization variables
         # TODO: check which use cases are using _graph
         self._graph = graph
+        # Named inputs of the problem that can be changed with `update`
+        self._parameters: Dict[str, Callable[[Any], None]] = dict()
+        # Initial values of the variables (MIP start)
+        self._start: Dict[str, np.ndarray] = dict()
+        # Symbols by name of the first (constraints, objectives) indexed
+        self._symbols: Dict[str, CSymbol] = _SymbolTable(self._expressions)
+        self._indexed = (0, 0)
+        # Generators of constraints added after each solve (see add_lazy_constraints)
+        self._lazy: List[Callable[["ProblemDef"], List[CExpression]]] = []
 
     @property
     def symbols(self) -> Dict[str, CSymbol]:
+        """Symbols of the constraints and objectives, by name.
+
+        The mapping is cached: only the constraints and objectives added
+        since the last access are scanned. It should not be modified. Looking
+        up a name that is not a symbol returns the registered expression with
+        that name, if any.
+        """
         # show deprecated warning:
         # warnings.warn("Use ProblemDef.expressions instead.", DeprecationWarning)
-        return {
-            s.name: s for s in Backend.get_symbols(self._constraints + self._objectives)
-        }
+        nc, no = self._indexed
+        if nc > len(self._constraints) or no > len(self._objectives):
+            self._symbols, nc, no = _SymbolTable(self._expressions), 0, 0
+        if nc < len(self._constraints) or no < len(self._objectives):
+            symbols = self._symbols
+            for e in self._constraints[nc:] + self._objectives[no:]:
+                if isinstance(e, CSymbol):
+                    symbols[e.name] = e
+                for s in getattr(e, "_proxy_symbols", ()):
+                    symbols[s.name] = s
+            self._indexed = (len(self._constraints), len(self._objectives))
+        return self._symbols
 
     @property
     def expressions(self) -> Attributes:
         attr = Attributes()
         sym = self.symbols
-        attr.update(self.symbols)
+        attr.update(sym)
         attr.update({k: v for k, v in self._expressions.items() if k not in sym})
         return attr
 
@@ -426,6 +529,8 @@ class ProblemDef:
         return self.expressions
 
     def get_symbol(self, name) -> CSymbol:
+        """Symbol with the given name, or the registered expression if there is
+        no symbol with that name (see `symbols`)."""
         return self.symbols[name]
 
     def get_symbols(self, *args) -> List[CSymbol]:
@@ -450,6 +555,142 @@ class ProblemDef:
     def copy(self) -> "ProblemDef":
         raise NotImplementedError()
 
+    @property
+    def parameters(self) -> List[str]:
+        """Names of the inputs that can be changed with `update`."""
+        names = [s.name for s in self.symbols.values() if not s.is_variable]
+        return list(self._parameters.keys()) + [
+            n for n in names if n not in self._parameters
+        ]
+
+    def register_parameter(
+        self, name: str, setter: Callable[[Any], None]
+    ) -> "ProblemDef":
+        """Register a named input of the problem.
+
+        Problem builders use this to expose data (e.g., measurements or
+        weights) that is stored in one or more parameters of the problem.
+        The setter receives the new value passed to `update` and assigns the
+        values of the parameters derived from it.
+
+        Args:
+            name (str): Name of the input.
+            setter (Callable[[Any], None]): Function that updates the parameters.
+
+        Returns:
+            ProblemDef: The problem.
+        """
+        if name in self._parameters:
+            raise ValueError(f"Parameter with name {name} already exists")
+        self._parameters[name] = setter
+        return self
+
+    def add_lazy_constraints(
+        self, generator: Callable[["ProblemDef"], List[CExpression]]
+    ) -> "ProblemDef":
+        """Register a generator of constraints that are added on demand.
+
+        After each solve, the generator receives the solved problem and returns
+        the constraints violated by the solution (e.g. cuts that eliminate
+        cycles, see `Backend.AcyclicFlow`). `solve` adds them to the problem and
+        solves it again, until no generator returns new constraints.
+
+        Args:
+            generator (Callable[[ProblemDef], List[CExpression]]): Function that
+                returns the violated constraints, or an empty list.
+
+        Returns:
+            ProblemDef: The problem.
+        """
+        self._lazy.append(generator)
+        return self
+
+    def update(self, **values) -> "ProblemDef":
+        """Change the data of the problem without building it again.
+
+        Each keyword is either the name of an input registered with
+        `register_parameter` or the name of a parameter symbol of the problem
+        (see `Backend.Parameter`). The constraints and the objectives keep
+        referring to the same parameters, so the next call to `solve` uses the
+        new values.
+
+        Args:
+            **values: New values of the parameters.
+
+        Returns:
+            ProblemDef: The problem, e.g. to call `P.update(w=w).solve()`.
+
+        Raises:
+            NotImplementedError: If the parameters of the backend can not be
+                changed once they are used in expressions (e.g. PICOS).
+        """
+        if self._backend is not None and not self._backend._updatable_parameters:
+            raise NotImplementedError(
+                f"{self._backend} parameters can not be updated, "
+                "build the problem again with the new values"
+            )
+        symbols = self.symbols
+        for name, value in values.items():
+            if name in self._parameters:
+                self._parameters[name](value)
+            elif name in symbols and not symbols[name].is_variable:
+                symbols[name].value = value
+            else:
+                raise ValueError(f"The problem has no parameter named {name}")
+        return self
+
+    @property
+    def start(self) -> Dict[str, np.ndarray]:
+        """Initial values of the variables, by name (see `set_start`)."""
+        return self._start
+
+    def set_start(self, values: Optional[Dict[str, Any]] = None) -> "ProblemDef":
+        """Set initial values of the variables for the next solves.
+
+        The values are passed to the solver as an initial solution (a MIP
+        start), which can reduce the time to find the first feasible
+        solution. Values of integer and binary variables are rounded, and all
+        values are clipped to the bounds of the variables. Solvers without
+        support for initial solutions ignore them. Partial starts (only some
+        variables) are supported by solvers that can complete them.
+
+        Args:
+            values (Optional[Dict[str, Any]]): Values of the variables, by
+                name. Scalars are broadcast to the shape of the variable. If
+                None, the initial values are removed.
+
+        Returns:
+            ProblemDef: The problem.
+        """
+        if values is None:
+            self._start.clear()
+            return self
+        symbols = self.symbols
+        for name, value in values.items():
+            s = symbols.get(name, None)
+            if s is None or not s.is_variable:
+                raise ValueError(f"The problem has no variable named {name}")
+            value = np.broadcast_to(np.asarray(value, dtype=float), s.shape)
+            if s._vartype != VarType.CONTINUOUS:
+                value = np.round(value)
+            lb = -np.inf if s.lb is None else np.reshape(s.lb, value.shape)
+            ub = np.inf if s.ub is None else np.reshape(s.ub, value.shape)
+            if s._vartype == VarType.BINARY:
+                lb, ub = 0, 1
+            self._start[name] = np.clip(value, lb, ub)
+        return self
+
+    def _derive(self, p: "ProblemDef") -> "ProblemDef":
+        p._parameters.update(self._parameters)
+        p._start.update(self._start)
+        p._lazy.extend(g for g in self._lazy if g not in p._lazy)
+        # The constraints and objectives of derived problems start with the
+        # ones of this problem, so only the new ones have to be indexed
+        p._symbols = _SymbolTable(p._expressions)
+        p._symbols.update(self.symbols)
+        p._indexed = self._indexed
+        return p
+
     def _add(self, other: Any, inplace: bool = False):
         if isinstance(other, ProblemDef):
             return self.merge(other, inplace=inplace)
@@ -514,10 +755,16 @@ class ProblemDef:
             raise ValueError(
                 "The two problems have different instantiations of the backend."
             )
+        for name in other._parameters:
+            if name in self._parameters:
+                raise ValueError(f"Parameter with name {name} already exists")
         if inplace:
             self.add_constraints(other._constraints, inplace=True)
             self.add_objectives(other._objectives, other._weights, inplace=True)
             self.add_expressions(other._expressions, inplace=True)
+            self._parameters.update(other._parameters)
+            self._start.update(other._start)
+            self._lazy.extend(g for g in other._lazy if g not in self._lazy)
             return self
         c = self._constraints + other._constraints
         e = self._expressions.copy()
@@ -525,7 +772,11 @@ class ProblemDef:
         w = self._weights + other._weights
         o = self._objectives + other._objectives
         # TODO: Subclasses of ProblemDef not supported
-        return self.__class__(b, c, o, e, w)
+        p = self._derive(self.__class__(b, c, o, e, w))
+        p._parameters.update(other._parameters)
+        p._start.update(other._start)
+        p._lazy.extend(g for g in other._lazy if g not in p._lazy)
+        return p
 
     def register(
         self, name: str, expr: CExpression, inplace: bool = True
@@ -550,12 +801,14 @@ class ProblemDef:
             self._constraints.extend(constraints)
             return self
         # TODO: generalize for subclasses of ProblemDef?
-        return ProblemDef(
-            self._backend,
-            self._constraints + constraints,
-            self._objectives,
-            self._expressions,
-            self._weights,
+        return self._derive(
+            ProblemDef(
+                self._backend,
+                self._constraints + constraints,
+                self._objectives,
+                self._expressions,
+                self._weights,
+            )
         )
 
     def add_objectives(
@@ -574,12 +827,14 @@ class ProblemDef:
             self._objectives.extend(objectives)
             self._weights.extend(weights)
             return self
-        return ProblemDef(
-            self._backend,
-            self._constraints,
-            self._objectives + objectives,
-            self._expressions,
-            self._weights + weights,
+        return self._derive(
+            ProblemDef(
+                self._backend,
+                self._constraints,
+                self._objectives + objectives,
+                self._expressions,
+                self._weights + weights,
+            )
         )
 
     def add_expressions(
@@ -593,12 +848,14 @@ class ProblemDef:
         e = dict()
         e.update(self._expressions)
         e.update(expressions)
-        return ProblemDef(
-            self._backend,
-            self._constraints,
-            self._objectives,
-            e,
-            self._weights,
+        return self._derive(
+            ProblemDef(
+                self._backend,
+                self._constraints,
+                self._objectives,
+                e,
+                self._weights,
+            )
         )
 
 
@@ -614,6 +871,10 @@ class ProblemBuilder(ProblemDef):
 
 
 class Backend(abc.ABC):
+    # False if the values of the parameters are copied into the expressions
+    # that use them, so `ProblemDef.update` can not change them
+    _updatable_parameters = True
+
     def __init__(
         self,
         default_solver: Optional[str] = None,
@@ -637,10 +898,9 @@ class Backend(abc.ABC):
     def get_symbols(expressions: Iterable[CExpression]) -> Set[CSymbol]:
         symbols: Set[CSymbol] = set()
         for e in expressions:
-            s: Set[CSymbol] = getattr(e, "_proxy_symbols", {})  # type: ignore
             if isinstance(e, CSymbol):
-                s.add(e)
-            symbols.update(s)
+                symbols.add(e)
+            symbols.update(getattr(e, "_proxy_symbols", ()))
         return symbols
 
     @abc.abstractmethod
@@ -748,15 +1008,25 @@ class Backend(abc.ABC):
                 if p.objectives and p.weights[0] != 0
                 else None
             )
-        return self._solve(
-            p,
-            objective=o,
-            solver=solver,
-            max_seconds=max_seconds,
-            warm_start=warm_start,
-            verbosity=verbosity,
-            **options,
-        )
+        if p.start:
+            warm_start = True
+        while True:
+            result = self._solve(
+                p,
+                objective=o,
+                solver=solver,
+                max_seconds=max_seconds,
+                warm_start=warm_start,
+                verbosity=verbosity,
+                **options,
+            )
+            # Add the constraints violated by the solution and solve again
+            cuts = [c for generator in p._lazy for c in generator(p)]
+            if len(cuts) == 0:
+                return result
+            if verbosity > 0:
+                LOGGER.info(f"Adding {len(cuts)} lazy constraints")
+            p.add_constraints(cuts, inplace=True)
 
     @abc.abstractmethod
     def _solve(
@@ -786,7 +1056,35 @@ class Backend(abc.ABC):
         alias_flow_ineg: str = EXPR_NAME_FLOW_INEG,
         alias_nonzero_flow: str = EXPR_NAME_FLOW_NZI,
         indicator_tolerance: float = 1e-4,
+        presolve: bool = False,
     ) -> ProblemDef:
+        """Create a flow problem `A @ F == 0` over the edges of a graph.
+
+        Args:
+            g (BaseGraph): Graph whose vertex incidence matrix is `A`.
+            lb (Union[float, List, np.ndarray]): Lower bounds of the flows.
+            ub (Union[float, List, np.ndarray]): Upper bounds of the flows.
+            n_flows (int): Number of flows (columns of `F`).
+            values (bool): Use the values of the vertices in the edges as
+                coefficients of `A`.
+            shared_bounds (bool): Bound the sum of the flows instead of each flow.
+            varname (str): Name of the flow variable.
+            create_nonzero_indicators (bool): Add indicators of non-zero flow.
+            alias_flow (str): Name of the flow expression.
+            alias_flow_ipos (str): Name of the positive flow indicators.
+            alias_flow_ineg (str): Name of the negative flow indicators.
+            alias_nonzero_flow (str): Name of the non-zero flow indicators.
+            indicator_tolerance (float): Minimum absolute flow of an edge with
+                an active indicator.
+            presolve (bool): Remove the edges that can only have zero flow
+                (see :func:`presolve_flow`) before creating the variables. The
+                variables and indicators are created only for the kept edges,
+                and the registered expressions map them back to all the edges
+                of the graph (with zeros in the removed ones).
+
+        Returns:
+            ProblemDef: The flow problem.
+        """
         shape: Tuple = (g.num_edges,)
         if isinstance(lb, list):
             lb = np.array(lb)
@@ -803,6 +1101,11 @@ class Backend(abc.ABC):
                 lb = np.tile(lb, (n_flows, 1)).T
             if isinstance(ub, np.ndarray) and len(ub.shape) == 1:
                 ub = np.tile(ub, (n_flows, 1)).T
+        reduction = None
+        if presolve:
+            reduction = presolve_flow(g, lb, ub, values=values)
+            g, lb, ub = reduction.graph, reduction.lb, reduction.ub
+            shape = (g.num_edges, *shape[1:])
         F = self.Variable(name=varname, shape=shape, lb=lb, ub=ub)
         A = self._sparse(g.get_vertex_incidence_matrix_as_lists(values=values))
         P = self.Problem(A @ F == 0)
@@ -827,6 +1130,13 @@ class Backend(abc.ABC):
             P.register(alias_flow_ineg, In)
             P.register(alias_nonzero_flow, Ip + In)
         P.register(alias_flow, F)
+        if reduction is not None:
+            _expand_flow(
+                P,
+                reduction,
+                [alias_flow, alias_flow_ipos, alias_flow_ineg, alias_nonzero_flow],
+                self._sparse,
+            )
         return P
 
     def AcyclicFlow(
@@ -843,7 +1153,44 @@ class Backend(abc.ABC):
         alias_flow_ineg: str = EXPR_NAME_FLOW_INEG,
         alias_nonzero_flow: str = EXPR_NAME_FLOW_NZI,
         indicator_tolerance: float = 1e-4,
+        presolve: bool = False,
+        acyclicity: str = "layers",
     ) -> ProblemDef:
+        """Create a flow problem where the edges with flow form a DAG.
+
+        Args:
+            g (BaseGraph): Graph of the flow problem (hyperedges are not
+                supported).
+            lb (Union[float, np.ndarray]): Lower bounds of the flows. Edges with
+                negative lower bound can carry flow in reverse direction.
+            ub (Union[float, np.ndarray]): Upper bounds of the flows.
+            values (bool): Use the values of the vertices in the edges as
+                coefficients of the incidence matrix.
+            max_parents (Optional[Union[int, Dict[Any, int]]]): Maximum number of
+                incoming edges with flow per vertex.
+            vertex_lb_dist (Optional[np.ndarray]): Lower bounds of the layer
+                position of each vertex in the DAG, such as BFS distances from
+                the sources (`layers` encoding). Tighter bounds give smaller
+                big-M constants.
+            varname (str): Name of the flow variable.
+            alias_flow (str): Name of the flow expression.
+            alias_flow_ipos (str): Name of the positive flow indicators.
+            alias_flow_ineg (str): Name of the negative flow indicators.
+            alias_nonzero_flow (str): Name of the non-zero flow indicators.
+            indicator_tolerance (float): Minimum absolute flow of an edge with
+                an active indicator.
+            presolve (bool): Remove the edges that can only have zero flow
+                before creating the problem (see `Flow`), including the ones
+                that are not in a path from an inflow to an outflow edge.
+            acyclicity (str): Encoding of the acyclicity constraints: `layers`
+                (layer position per vertex and big-M constraints per edge),
+                `scc` (layer constraints only inside strongly connected
+                components) or `lazy` (cycle elimination cuts added after each
+                solve). See :mod:`corneto.backend._acyclic`.
+
+        Returns:
+            ProblemDef: The flow problem.
+        """
         if not varname:
             varname = VAR_FLOW
         if isinstance(lb, list):
@@ -857,6 +1204,11 @@ class Backend(abc.ABC):
         for s, t in g.E:
             if len(s) > 1 or len(t) > 1:
                 raise NotImplementedError("Hyperedges not supported")
+        reduction = None
+        if presolve:
+            # The DAG constraints are created only for the kept edges
+            reduction = presolve_flow(g, lb, ub, values=values, acyclic=True)
+            g, lb, ub = reduction.graph, reduction.lb, reduction.ub
         if isinstance(max_parents, int):
             max_parents = {v: max_parents for v in g.vertices}
         P = self.Flow(
@@ -873,7 +1225,6 @@ class Backend(abc.ABC):
             create_nonzero_indicators=True,
         )
         # TODO: recover easily the created indicators!
-        # TODO: Optionally provide a lower bound of pos for each vertex
         Ip = P.get_symbol(varname + "_ipos") if any(ub > 0) else None
         In = P.get_symbol(varname + "_ineg") if any(lb < 0) else None
         if Ip is not None and In is not None:
@@ -887,45 +1238,54 @@ class Backend(abc.ABC):
         # Limit the number of parents per node, if requested
         if max_parents is not None:
             # Get indexes of edges vi->vj for all vi
+            vertices = set(g.vertices)
             for v, max in max_parents.items():
+                if v not in vertices:
+                    continue
                 edges_idx = [i for i, _ in g.in_edges(v)]
                 if len(edges_idx) > 0:
                     # Sum selected parent edges
                     P += np.ones((len(edges_idx),)) @ I[edges_idx] <= max
-        # Create a DAG layer num for each vertex
-        L = self.Variable("_dag_layer_pos", (g.num_vertices,), 0, g.num_vertices - 1)
+        # Arcs that can be selected: s -> t for edges with positive flow and
+        # t -> s for edges with negative flow (reversed edges)
         vix = {v: i for i, v in enumerate(g.vertices)}
-        # These constraints are not compatible with hyperedges
-        if np.any(ub > 0):
-            # Get edges s->t that can have a positive flow
-            e_pos = [(i, g.get_edge(i)) for i in np.flatnonzero(ub > 0)]
-            e_ix = np.array([i for i, (s, t) in e_pos if len(s) > 0 and len(t) > 0])
+        arcs = []
+        for I_dir, mask, reverse in [(Ip, ub > 0, False), (In, lb < 0, True)]:
+            if I_dir is None:
+                continue
+            e_ix = [
+                i
+                for i in np.flatnonzero(mask)
+                if len(g.get_edge(i)[0]) > 0 and len(g.get_edge(i)[1]) > 0
+            ]
+            if len(e_ix) == 0:
+                continue
             edges = [g.get_edge(i) for i in e_ix]
-            # Get the index of the source / target vertices of the edge
             s_idx = np.array([vix[next(iter(s))] for (s, _) in edges])
             t_idx = np.array([vix[next(iter(t))] for (_, t) in edges])
-            # The layer position in a DAG of the target vertex of the edge
-            # has to be greater than the source vertex, otherwise Ip (pos flow) has to be 0
-            if len(e_ix) > 0:
-                P += L[t_idx] - L[s_idx] >= Ip[e_ix] + (1 - g.num_vertices) * (
-                    1 - Ip[e_ix]
-                )
-                P += L[t_idx] - L[s_idx] <= g.num_vertices - 1
-        if np.any(lb < 0):
-            # NOTE: Negative flows eq. to reversed directed edge
-            # Get edges s->t that can have a positive flow
-            e_neg = [(i, g.get_edge(i)) for i in np.flatnonzero(lb < 0)]
-            # Check if vertex not empty! print(e_neg)
-            e_ix = np.array([i for i, (s, t) in e_neg if len(s) > 0 and len(t) > 0])
-            edges = [g.get_edge(i) for i in e_ix]
-            # Get the index of the source / target vertices of the edge
-            s_idx = np.array([vix[next(iter(s))] for (s, _) in edges])
-            t_idx = np.array([vix[next(iter(t))] for (_, t) in edges])
-            if len(e_ix) > 0:
-                P += L[s_idx] - L[t_idx] >= In[e_ix] + (1 - g.num_vertices) * (
-                    1 - In[e_ix]
-                )
-                P += L[s_idx] - L[t_idx] <= g.num_vertices - 1
+            if reverse:
+                s_idx, t_idx = t_idx, s_idx
+            arcs.append((s_idx, t_idx, I_dir[np.array(e_ix)]))
+        if vertex_lb_dist is not None and reduction is not None:
+            vertex_lb_dist = np.asarray(vertex_lb_dist)[reduction.vertices]
+        constraints, cuts = acyclic_constraints(
+            self,
+            g.num_vertices,
+            arcs,
+            mode=acyclicity,
+            lb=vertex_lb_dist,
+            name="_dag_layer_pos",
+        )
+        P.add_constraints(constraints)
+        if cuts is not None:
+            P.add_lazy_constraints(cuts)
+        if reduction is not None:
+            _expand_flow(
+                P,
+                reduction,
+                [alias_flow, alias_flow_ipos, alias_flow_ineg, alias_nonzero_flow],
+                self._sparse,
+            )
         # TODO: Raise error if hypergraph
         return P
 
@@ -1,5 +1,5 @@
 from numbers import Number
-from typing import Any, List, Optional, Set, Tuple, Union
+from typing import Any, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -20,11 +20,13 @@ except ImportError:
 
 
 class CvxpyExpression(CExpression):
-    def __init__(self, expr: Any, symbols: Optional[Set["CSymbol"]] = None) -> None:
+    def __init__(
+        self, expr: Any, symbols: Optional[Iterable[CExpression]] = None
+    ) -> None:
         super().__init__(expr, symbols)
 
     def _create_proxy_expr(
-        self, expr: Any, symbols: Optional[Set["CSymbol"]] = None
+        self, expr: Any, symbols: Optional[Iterable[CExpression]] = None
     ) -> "CvxpyExpression":
         return CvxpyExpression(expr, symbols)
 
@@ -37,6 +39,9 @@ class CvxpyExpression(CExpression):
     def _sum(self, axis: Optional[int] = None) -> Any:
         return cp.sum(self._expr, axis=axis)
 
+    def _reshape(self, shape: Tuple[int, ...]) -> Any:
+        return cp.reshape(self._expr, shape, order="C")
+
     def _max(self, axis: Optional[int] = None) -> Any:
         return cp.max(self._expr, axis=axis)
 
@@ -65,6 +70,70 @@ class CvxpySymbol(CSymbol, CvxpyExpression):
         super().__init__(
             expr, name, shape=shape, lb=lb, ub=ub, vartype=vartype, variable=variable
         )
+        self._bound_constraints: Optional[List[Any]] = None
+
+    def _bounds_as_constraints(self) -> List[Any]:
+        # Provided bounds that are not attributes of the cvxpy variable, as
+        # constraints over their finite entries (computed once)
+        if self._bound_constraints is None:
+            constraints = []
+            native = getattr(self._expr, "attributes", {}).get("bounds", None)
+            provided = self._provided_lb is not None or self._provided_ub is not None
+            if native is None and provided:
+                x = cp.reshape(self._expr, (int(np.prod(self.shape)),), order="F")
+                for bound, given, sense in (
+                    (self._lb, self._provided_lb, 1),
+                    (self._ub, self._provided_ub, -1),
+                ):
+                    if given is None:
+                        continue
+                    values = np.ravel(bound, order="F")
+                    idx = np.flatnonzero(np.isfinite(values))
+                    if len(idx) == 0:
+                        continue
+                    xi = x if len(idx) == len(values) else x[idx]
+                    if sense > 0:
+                        constraints.append(xi >= values[idx])
+                    else:
+                        constraints.append(xi <= values[idx])
+            self._bound_constraints = constraints
+        return self._bound_constraints
+
+
+def _native_bounds(shape: Tuple[int, ...], lb: Any, ub: Any) -> Optional[List[Any]]:
+    # Bounds for the `bounds` attribute of cvxpy variables (cvxpy >= 1.5)
+    if lb is None and ub is None:
+        return None
+    bounds = []
+    for b, default in ((lb, -np.inf), (ub, np.inf)):
+        if b is None:
+            bounds.append(default)
+        else:
+            b = np.asarray(b, dtype=float)
+            if b.ndim > 0:
+                try:
+                    b = np.broadcast_to(b, shape)
+                except ValueError:
+                    # Not supported, added as constraints
+                    return None
+            bounds.append(b if b.ndim > 0 else float(b))
+    if all(np.all(np.isinf(b)) for b in bounds):
+        return None
+    return bounds
+
+
+_SUPPORTS_BOUNDS: Optional[bool] = None
+
+
+def _supports_bounds() -> bool:
+    global _SUPPORTS_BOUNDS
+    if _SUPPORTS_BOUNDS is None:
+        try:
+            cp.Variable(1, bounds=[0, 1])
+            _SUPPORTS_BOUNDS = True
+        except Exception:
+            _SUPPORTS_BOUNDS = False
+    return _SUPPORTS_BOUNDS
 
 
 class CvxpyBackend(Backend):
@@ -91,12 +160,17 @@ class CvxpyBackend(Backend):
             lb, ub = None, None
         shape = shape or ()
         name = name or _get_unique_name()
+        attributes = dict()
         if vartype == VarType.INTEGER:
-            v = cp.Variable(shape, name=name, integer=True)
+            attributes["integer"] = True
         elif vartype == VarType.BINARY:
-            v = cp.Variable(shape, name=name, boolean=True)
-        else:
-            v = cp.Variable(shape, name=name)
+            attributes["boolean"] = True
+        # Pass the bounds to the variable, so they are not added as
+        # constraints and solvers with variable bounds get them directly
+        bounds = _native_bounds(tuple(shape), lb, ub) if _supports_bounds() else None
+        if bounds is not None:
+            attributes["bounds"] = bounds
+        v = cp.Variable(shape, name=name, **attributes)
         return CvxpySymbol(v, name, shape=shape, lb=lb, ub=ub, vartype=vartype)
 
     def Parameter(
@@ -133,16 +207,12 @@ class CvxpyBackend(Backend):
         if o is None:
             o = cp.Minimize(0)
 
-        # Go through all the vars/params/etc to check bounds
-        # and add the required ones.
-        extras = []
-        # Get variables
+        # Bounds of the variables that are not attributes of the variables
+        cstr = []
         for v in p.symbols.values():
-            if v._provided_lb is not None:
-                extras.append(v >= v.lb)
-            if v._provided_ub is not None:
-                extras.append(v <= v.ub)
-        cstr = [c.e for c in extras + p.constraints]
+            if isinstance(v, CvxpySymbol):
+                cstr.extend(v._bounds_as_constraints())
+        cstr.extend(c.e for c in p.constraints)
         P = cp.Problem(o, cstr)
         s = solver
         if solver:
@@ -187,5 +257,10 @@ class CvxpyBackend(Backend):
                             the parameter TimeLimit can be directly passed with
                             `problem.solve(solver='GUROBI', TimeLimit=max_seconds)`""")
 
+        # Initial values are passed to the solvers that accept them
+        # (e.g., GUROBI, CPLEX or SCIP) when warm_start is True
+        symbols = p.symbols
+        for name, value in p.start.items():
+            symbols[name]._expr.value = value
         P.solve(solver=s, verbose=verbosity > 0, warm_start=warm_start, **options)
         return P
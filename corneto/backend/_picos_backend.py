@@ -1,5 +1,5 @@
 from numbers import Number
-from typing import Any, List, Optional, Set, Tuple, Union
+from typing import Any, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -20,11 +20,13 @@ except ImportError:
 
 
 class PicosExpression(CExpression):
-    def __init__(self, expr: Any, symbols: Optional[Set["CSymbol"]] = None) -> None:
+    def __init__(
+        self, expr: Any, symbols: Optional[Iterable[CExpression]] = None
+    ) -> None:
         super().__init__(expr, symbols)
 
     def _create_proxy_expr(
-        self, expr: Any, symbols: Optional[Set["CSymbol"]] = None
+        self, expr: Any, symbols: Optional[Iterable[CExpression]] = None
     ) -> "PicosExpression":
         return PicosExpression(expr, symbols)
 
@@ -37,6 +39,12 @@ class PicosExpression(CExpression):
     def _sum(self, axis: Optional[int] = None) -> Any:
         return pc.sum(self._expr, axis=axis)
 
+    def _reshape(self, shape: Tuple[int, ...]) -> Any:
+        # PICOS vectors are columns
+        if len(shape) == 1:
+            shape = (shape[0], 1)
+        return self._expr.reshaped(shape, order="C")
+
     def _max(self, axis: Optional[int] = None) -> Any:
         raise NotImplementedError()
 
@@ -98,6 +106,9 @@ class PicosSymbol(CSymbol, PicosExpression):
 
 
 class PicosBackend(Backend):
+    # PICOS constants are immutable and derived expressions copy their values
+    _updatable_parameters = False
+
     def __init__(self, default_solver: Optional[str] = None) -> None:
         super().__init__(default_solver, _numpy_array)
 
@@ -145,7 +156,7 @@ class PicosBackend(Backend):
         value: Any = None,
     ) -> CSymbol:
         shape = shape or ()
-        value = value or 0
+        value = value if value is not None else 0
         name = name or _get_unique_name()
         param = pc.Constant(name, value=value, shape=shape)
         return PicosSymbol(param, name, shape=shape, variable=False)
@@ -169,10 +180,10 @@ class PicosBackend(Backend):
                 P.minimize = obj
             else:
                 P.maximize = obj
-        if warm_start:
-            from corneto._settings import LOGGER
-
-            LOGGER.warn("warm_start is not supported yet, ignored")
+        # Initial values are used by the solvers that support hotstart
+        symbols = p.symbols
+        for name, value in p.start.items():
+            symbols[name]._expr.value = value
         P.solve(
             timelimit=max_seconds,
             solver=solver,
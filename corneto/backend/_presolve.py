@@ -0,0 +1,255 @@
+"""Graph presolve for flow problems.
+
+:func:`presolve_flow` removes the edges that can only carry a zero flow in
+any solution of the steady state constraints `A @ F == 0`, given the bounds
+of the flows, before the problem is built:
+
+- Blocked edges, with both bounds equal to zero.
+- Dead-end edges. If all the edges of a vertex can only produce it (or only
+  consume it), or the vertex has a single edge (also if the edge is
+  reversible), the flow through all of them has to be zero. Fixing these
+  edges to zero can create new dead-ends, so the rule is propagated with
+  sparse products over the vertices of the removed edges until no more
+  edges are removed.
+- Unreachable edges, only for acyclic flows (`acyclic=True`). Without
+  cycles, the flow of an edge comes from an inflow edge and goes to an
+  outflow edge, so the edges that are not in such a path have zero flow.
+
+Vertices without any remaining edge are removed too. The reductions are
+exact: the reduced problem has the same feasible flows as the original one
+once they are mapped back with :meth:`FlowReduction.expand`.
+"""
+
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+
+from corneto._graph import BaseGraph
+from corneto._settings import _get_matrix_builder
+
+try:
+    from scipy import sparse  # type: ignore
+    from scipy.sparse import csgraph  # type: ignore
+except ImportError:
+    sparse = None  # type: ignore
+    csgraph = None  # type: ignore
+
+
+class FlowReduction:
+    """Result of :func:`presolve_flow`.
+
+    Attributes:
+        graph (BaseGraph): Reduced graph (a view of the original graph).
+        edges (np.ndarray): Indexes of the kept edges in the original graph.
+        vertices (np.ndarray): Indexes of the kept vertices in the original graph.
+        lb (np.ndarray): Lower bounds of the flows of the kept edges.
+        ub (np.ndarray): Upper bounds of the flows of the kept edges.
+        num_edges (int): Number of edges of the original graph.
+    """
+
+    def __init__(
+        self,
+        graph: BaseGraph,
+        edges: np.ndarray,
+        vertices: np.ndarray,
+        lb: np.ndarray,
+        ub: np.ndarray,
+        num_edges: int,
+    ) -> None:
+        self.graph = graph
+        self.edges = edges
+        self.vertices = vertices
+        self.lb = lb
+        self.ub = ub
+        self.num_edges = num_edges
+
+    @property
+    def num_removed(self) -> int:
+        """Number of edges removed by the presolve."""
+        return self.num_edges - len(self.edges)
+
+    def expansion(self, builder: Optional[Callable] = None) -> Any:
+        """Matrix `E` that maps the kept edges to the original edges.
+
+        `E @ F` has one row per edge of the original graph, with the values of
+        `F` in the rows of the kept edges and zeros in the removed ones. It can
+        be applied to expressions of the backends.
+
+        Args:
+            builder (Optional[Callable]): Constructor of the matrix from
+                `(data, (row_ind, col_ind))`, such as `Backend._sparse`.
+                Defaults to a scipy sparse array.
+        """
+        n = len(self.edges)
+        builder = builder or _get_matrix_builder()
+        return builder(
+            (np.ones(n), (self.edges, np.arange(n))), shape=(self.num_edges, n)
+        )
+
+    def expand(self, values: Union[np.ndarray, Any], fill: float = 0.0) -> np.ndarray:
+        """Map values of the kept edges back to the edges of the original graph.
+
+        Args:
+            values (np.ndarray): Values with one row per kept edge.
+            fill (float): Value of the removed edges. Defaults to 0.
+
+        Returns:
+            np.ndarray: Values with one row per edge of the original graph.
+        """
+        values = np.asarray(values)
+        full = np.full((self.num_edges, *values.shape[1:]), fill, dtype=float)
+        full[self.edges] = values
+        return full
+
+    def __repr__(self) -> str:
+        return (
+            f"FlowReduction(edges={len(self.edges)}/{self.num_edges}, "
+            f"vertices={len(self.vertices)})"
+        )
+
+
+def _edge_bounds(bound: Any, num_edges: int, reduce) -> np.ndarray:
+    b = np.asarray(bound if bound is not None else np.nan, dtype=float)
+    if b.ndim > 1:
+        b = reduce(b.reshape(b.shape[0], -1), axis=1)
+    return np.broadcast_to(b, (num_edges,))
+
+
+def _unreachable_edges(
+    A_pos: Any, A_neg: Any, can_pos: np.ndarray, can_neg: np.ndarray
+) -> np.ndarray:
+    # Edges that are not in a path from an edge that only produces vertices
+    # (an inflow) to an edge that only consumes vertices (an outflow). The
+    # search runs on a bipartite graph with the vertices, the two directions
+    # of each edge and a super source and sink. A direction of an edge
+    # consumes the vertices it takes flow from and produces the other ones.
+    # An edge direction is reached if any of the vertices it consumes is
+    # reached, a relaxation for hyperedges that keeps the removal exact.
+    n_v, n_e = A_pos.shape
+    fwd_pos = can_pos.astype(bool)
+    fwd_neg = can_neg.astype(bool)
+    src, tgt = n_v + 2 * n_e, n_v + 2 * n_e + 1
+    rows, cols = [], []
+    for d, (consume, produce), allowed in [
+        (0, (A_neg, A_pos), fwd_pos),
+        (1, (A_pos, A_neg), fwd_neg),
+    ]:
+        node = n_v + 2 * np.arange(n_e) + d
+        c, p = consume.tocoo(), produce.tocoo()
+        keep_c, keep_p = allowed[c.col], allowed[p.col]
+        rows += [c.row[keep_c], node[p.col[keep_p]]]
+        cols += [node[c.col[keep_c]], p.row[keep_p]]
+        no_input = allowed & (np.diff(consume.indptr) == 0)
+        no_output = allowed & (np.diff(produce.indptr) == 0)
+        rows += [np.full(no_input.sum(), src), node[no_output]]
+        cols += [node[no_input], np.full(no_output.sum(), tgt)]
+    r, c = np.concatenate(rows), np.concatenate(cols)
+    n = n_v + 2 * n_e + 2
+    G = sparse.csr_array((np.ones(len(r)), (r, c)), shape=(n, n))
+    fwd = np.zeros(n, dtype=bool)
+    bck = np.zeros(n, dtype=bool)
+    fwd[csgraph.breadth_first_order(G, src, return_predecessors=False)] = True
+    bck[csgraph.breadth_first_order(G.T, tgt, return_predecessors=False)] = True
+    used = (fwd & bck)[n_v : n_v + 2 * n_e].reshape(n_e, 2).any(axis=1)
+    return np.flatnonzero(~used)
+
+
+def presolve_flow(
+    g: BaseGraph,
+    lb: Optional[Union[float, np.ndarray]] = 0,
+    ub: Optional[Union[float, np.ndarray]] = None,
+    values: bool = False,
+    acyclic: bool = False,
+) -> FlowReduction:
+    """Remove the edges that can not carry flow in `A @ F == 0`.
+
+    Args:
+        g (BaseGraph): Graph of the flow problem.
+        lb (Union[float, np.ndarray]): Lower bounds of the flows, a scalar or
+            an array with one row per edge (and one column per flow). None is
+            unbounded.
+        ub (Union[float, np.ndarray]): Upper bounds of the flows. None is
+            unbounded.
+        values (bool): If True, use the values of the vertices in the edges as
+            coefficients (see `BaseGraph.get_vertex_incidence_matrix_as_lists`).
+        acyclic (bool): If True, the edges with flow can not form cycles (see
+            `Backend.AcyclicFlow`), so the edges that are not in a path from
+            an inflow edge to an outflow edge are removed too. Defaults to
+            False.
+
+    Returns:
+        FlowReduction: The kept edges and vertices, the reduced graph and the
+        bounds of the kept edges.
+    """
+    if sparse is None:
+        raise ImportError("scipy is required for the presolve of flow problems")
+    n_v, n_e = g.num_vertices, g.num_edges
+    # With several flows, an edge is removed only if it is removed in all of them
+    lo = np.nan_to_num(_edge_bounds(lb, n_e, np.min), nan=-np.inf)
+    hi = np.nan_to_num(_edge_bounds(ub, n_e, np.max), nan=np.inf)
+    A = sparse.csr_array(
+        g.get_vertex_incidence_matrix_as_lists(values=values), shape=(n_v, n_e)
+    )
+    A.eliminate_zeros()
+    A_csc = A.tocsc()
+    A_pos = (A_csc > 0).astype(np.int64)
+    A_neg = (A_csc < 0).astype(np.int64)
+    A_abs = A_pos + A_neg
+    can_pos = (hi > 0).astype(np.int64)
+    can_neg = (lo < 0).astype(np.int64)
+    active = (can_pos + can_neg) > 0
+    removable = (lo <= 0) & (hi >= 0)
+    # Number of active edges that can produce / consume each vertex, and
+    # number of active edges of each vertex
+    pos, neg = can_pos * active, can_neg * active
+    produce = A_pos @ pos + A_neg @ neg
+    consume = A_pos @ neg + A_neg @ pos
+    degree = A_abs @ active.astype(np.int64)
+
+    def dead_ends(v: np.ndarray) -> np.ndarray:
+        # Vertices that are only produced or only consumed, or with a single
+        # edge (A[v, e] * F[e] == 0, also for reversible edges)
+        p, c = produce[v], consume[v]
+        return (((p == 0) | (c == 0)) & (p + c > 0)) | (degree[v] == 1)
+
+    def remove(cols: np.ndarray) -> None:
+        active[cols] = False
+        produce[:] -= A_pos[:, cols] @ can_pos[cols] + A_neg[:, cols] @ can_neg[cols]
+        consume[:] -= A_pos[:, cols] @ can_neg[cols] + A_neg[:, cols] @ can_pos[cols]
+        degree[:] -= A_abs[:, cols] @ np.ones(len(cols), dtype=np.int64)
+
+    frontier = np.flatnonzero(dead_ends(np.arange(n_v)))
+    while True:
+        processed = np.zeros(n_v, dtype=bool)
+        while len(frontier) > 0:
+            processed[frontier] = True
+            cols = np.unique(A[frontier].indices)
+            cols = cols[active[cols] & removable[cols]]
+            if len(cols) == 0:
+                break
+            remove(cols)
+            touched = np.unique(A_csc[:, cols].indices)
+            frontier = touched[dead_ends(touched) & ~processed[touched]]
+        if not acyclic:
+            break
+        cols = _unreachable_edges(A_pos, A_neg, can_pos * active, can_neg * active)
+        cols = cols[active[cols] & removable[cols]]
+        if len(cols) == 0:
+            break
+        # Removing edges can create new dead-ends
+        remove(cols)
+        touched = np.unique(A_csc[:, cols].indices)
+        frontier = touched[dead_ends(touched)]
+    edges = np.flatnonzero(active)
+    view = g.edge_subgraph(active, view=True)
+    vertices = np.flatnonzero(view.vertex_mask)
+    b_lb = np.asarray(lb, dtype=float) if lb is not None else None
+    b_ub = np.asarray(ub, dtype=float) if ub is not None else None
+    return FlowReduction(
+        view,
+        edges,
+        vertices,
+        b_lb[edges] if b_lb is not None and b_lb.ndim > 0 else lb,
+        b_ub[edges] if b_ub is not None and b_ub.ndim > 0 else ub,
+        n_e,
+    )
@@ -0,0 +1,161 @@
+from numbers import Number
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from corneto._constants import Solver, VarType
+from corneto._settings import LOGGER
+from corneto.backend._base import (
+    Backend,
+    CExpression,
+    CSymbol,
+    ProblemDef,
+    _get_unique_name,
+)
+from corneto.backend._standard_form import (
+    LinearParameter,
+    StandardForm,
+    VariableSpace,
+    compile_problem,
+)
+
+try:
+    from scipy.optimize import milp
+except ImportError:
+    milp = None  # type: ignore
+
+
+class ScipyExpression(CExpression):
+    def __init__(
+        self, expr: Any, symbols: Optional[Iterable[CExpression]] = None
+    ) -> None:
+        super().__init__(expr, symbols)
+
+    def _create_proxy_expr(
+        self, expr: Any, symbols: Optional[Iterable[CExpression]] = None
+    ) -> "ScipyExpression":
+        return ScipyExpression(expr, symbols)
+
+    def _elementwise_mul(self, other: Any) -> Any:
+        return self._expr.multiply(other)
+
+    def _norm(self, p: int = 2) -> Any:
+        return self._expr.norm(p)
+
+    def _sum(self, axis: Optional[int] = None) -> Any:
+        return self._expr.sum(axis=axis)
+
+    def _reshape(self, shape: Tuple[int, ...]) -> Any:
+        return self._expr.reshape(shape)
+
+    def _max(self, axis: Optional[int] = None) -> Any:
+        return self._expr.max(axis)
+
+    def _hstack(self, other: CExpression) -> Any:
+        return self._expr.hstack(other)
+
+    def _vstack(self, other: CExpression) -> Any:
+        return self._expr.vstack(other)
+
+    @property
+    def value(self) -> np.ndarray:
+        return self._expr.value
+
+
+class ScipySymbol(CSymbol, ScipyExpression):
+    def __init__(
+        self,
+        expr: Any,
+        name: str,
+        shape: Optional[Tuple[int, ...]] = None,
+        lb: Optional[Union[Number, np.ndarray]] = None,
+        ub: Optional[Union[Number, np.ndarray]] = None,
+        vartype: VarType = VarType.CONTINUOUS,
+        variable: bool = True,
+    ) -> None:
+        super().__init__(
+            expr, name, shape=shape, lb=lb, ub=ub, vartype=vartype, variable=variable
+        )
+
+
+class ScipyBackend(Backend):
+    """Backend for mixed integer linear problems solved with HiGHS.
+
+    Symbols are ranges of columns of a flat vector of variables and linear
+    expressions are blocks of rows of a sparse matrix (see
+    :mod:`corneto.backend._standard_form`). Problems are compiled to standard
+    form and solved with `scipy.optimize.milp`, without a modeling layer.
+    Only linear expressions are supported. The columns of the variables are
+    released when the variables are no longer used.
+    """
+
+    def __init__(self, default_solver: Optional[str] = "HIGHS") -> None:
+        super().__init__(default_solver)
+        self._space = VariableSpace()
+
+    def _load(self):
+        import scipy
+        from scipy.optimize import milp  # noqa: F401
+
+        return scipy
+
+    def __str__(self) -> str:
+        return "SCIPY"
+
+    def available_solvers(self) -> List[str]:
+        return ["HIGHS"]
+
+    def Variable(
+        self,
+        name: Optional[str] = None,
+        shape: Optional[Tuple[int, ...]] = None,
+        lb: Optional[Union[Number, np.ndarray]] = None,
+        ub: Optional[Union[Number, np.ndarray]] = None,
+        vartype: VarType = VarType.CONTINUOUS,
+    ) -> CSymbol:
+        if vartype == VarType.BINARY:
+            lb, ub = None, None
+        shape = shape or ()
+        name = name or _get_unique_name()
+        if vartype == VarType.BINARY:
+            v = self._space.add(shape, 0, 1, integer=True)
+        else:
+            v = self._space.add(shape, lb, ub, integer=vartype == VarType.INTEGER)
+        return ScipySymbol(v, name, shape=shape, lb=lb, ub=ub, vartype=vartype)
+
+    def Parameter(
+        self,
+        name: Optional[str] = None,
+        shape: Optional[Tuple[int, ...]] = None,
+        value: Any = None,
+    ) -> CSymbol:
+        shape = shape or ()
+        name = name or _get_unique_name()
+        param = LinearParameter(shape, value=value)
+        return ScipySymbol(param, name, shape=shape, variable=False)
+
+    def build(self, p: ProblemDef) -> StandardForm:
+        return compile_problem(p)
+
+    def _solve(
+        self,
+        p: ProblemDef,
+        objective: Optional[CExpression] = None,
+        solver: Optional[Union[str, Solver]] = None,
+        max_seconds: Optional[int] = None,
+        warm_start: bool = False,
+        verbosity: int = 0,
+        **options,
+    ) -> Any:
+        s = solver.upper() if isinstance(solver, str) else solver
+        if s is not None and s not in ("HIGHS", "SCIPY"):
+            raise ValueError(
+                f"Solver {solver} is not supported, supported solvers are: "
+                f"{self.available_solvers()}"
+            )
+        # Initial values of `p.start` are always used (see StandardForm.solve)
+        sf = compile_problem(p, objective=objective)
+        result = sf.solve(max_seconds=max_seconds, verbosity=verbosity, **options)
+        if verbosity > 0:
+            LOGGER.info(result.message)
+        return result
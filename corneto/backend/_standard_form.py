@@ -0,0 +1,935 @@
+"""Linear expressions over a flat vector of variables and their standard form.
+
+The classes in this module represent linear (affine) expressions and
+constraints directly as sparse matrices, without a modeling layer. Every
+variable is a range of columns of a :class:`VariableSpace`, an expression of
+shape `s` is the pair `(A, b)` with `A` a sparse matrix with `prod(s)` rows
+(the elements of the expression in C order) such that the expression is
+`A @ x[cols] + b`, and a constraint is a block of rows `lo <= A @ x[cols] <= hi`.
+`cols` are the columns of the space used by the expression, so the size of
+the matrices does not depend on the number of variables created before.
+
+Operations are computed eagerly with sparse matrix products, so the blocks
+of `Backend.Flow`, `Backend.Indicator` or `Backend.AcyclicFlow` are already
+in matrix form once they are created. Expressions that depend on parameters
+keep the operations that created them and are re-evaluated only when the
+value of a parameter changes.
+
+:func:`compile_problem` lowers a problem into a :class:`StandardForm`
+(objective vector, sparse constraint matrix, row and column bounds and
+integrality), which is solved with `scipy.optimize.milp` (HiGHS).
+"""
+
+import weakref
+from numbers import Number
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from corneto._constants import Direction
+from corneto._settings import LOGGER
+
+try:
+    from scipy import sparse  # type: ignore
+except ImportError:
+    sparse = None  # type: ignore
+
+try:
+    import highspy  # type: ignore
+except ImportError:
+    highspy = None  # type: ignore
+
+# (A, b, shape, cols) of an evaluated expression, with `A` over the columns
+# `cols` (sorted) of the variable space
+_Block = Tuple[Any, np.ndarray, Tuple[int, ...], np.ndarray]
+
+_NO_COLUMNS = np.zeros(0, dtype=np.int64)
+
+
+def _size(shape: Tuple[int, ...]) -> int:
+    return int(np.prod(shape, dtype=np.int64))
+
+
+def _union(*cols: np.ndarray) -> np.ndarray:
+    cols = tuple(c for c in cols if len(c) > 0)
+    if len(cols) == 0:
+        return _NO_COLUMNS
+    first = cols[0]
+    if all(len(c) == len(first) and np.array_equal(c, first) for c in cols[1:]):
+        return first
+    # Merge of sorted arrays (the stable sort merges the sorted runs)
+    merged = np.sort(np.concatenate(cols), kind="stable")
+    keep = np.ones(len(merged), dtype=bool)
+    np.not_equal(merged[1:], merged[:-1], out=keep[1:])
+    return merged[keep]
+
+
+def _align(A: Any, cols: np.ndarray, target: np.ndarray) -> Any:
+    # Coefficients over `cols` as coefficients over `target` (a superset)
+    if len(cols) == len(target):
+        return A
+    A = sparse.csr_array(A)
+    idx = np.searchsorted(target, cols)
+    return sparse.csr_array(
+        (A.data, idx[A.indices], A.indptr), shape=(A.shape[0], len(target))
+    )
+
+
+def _empty(rows: int, n: int = 0) -> Any:
+    return sparse.csr_array((rows, n))
+
+
+def _constant(value: Any) -> _Block:
+    if sparse is not None and sparse.issparse(value):
+        value = value.toarray()
+    value = np.asarray(value, dtype=float)
+    return _empty(value.size), value.ravel(), value.shape, _NO_COLUMNS
+
+
+def _to_block(x: Any) -> _Block:
+    if isinstance(x, LinearExpr):
+        return x._eval()
+    if isinstance(x, tuple) and len(x) == 4 and sparse.issparse(x[0]):
+        return x
+    return _constant(x)
+
+
+def _is_constant(x: _Block) -> bool:
+    return x[0].nnz == 0
+
+
+def _take(x: _Block, idx: np.ndarray) -> _Block:
+    A, b, _, cols = x
+    flat = idx.ravel()
+    return A[flat], b[flat], idx.shape, cols
+
+
+def _eye(n: int) -> Any:
+    return sparse.csr_array((np.ones(n), (np.arange(n), np.arange(n))), shape=(n, n))
+
+
+def _positions(shape: Tuple[int, ...]) -> np.ndarray:
+    return np.arange(_size(shape)).reshape(shape)
+
+
+def _broadcast(x: _Block, shape: Tuple[int, ...]) -> _Block:
+    if x[2] == shape:
+        return x
+    return _take(x, np.broadcast_to(_positions(x[2]), shape))
+
+
+def _scale_rows(A: Any, w: np.ndarray) -> Any:
+    A = sparse.csr_array(A)
+    data = A.data * np.repeat(w, np.diff(A.indptr))
+    return sparse.csr_array((data, A.indices, A.indptr), shape=A.shape)
+
+
+def _add(x: Any, y: Any) -> _Block:
+    x, y = _to_block(x), _to_block(y)
+    shape = np.broadcast_shapes(x[2], y[2])
+    (Ax, bx, _, cx), (Ay, by, _, cy) = _broadcast(x, shape), _broadcast(y, shape)
+    cols = _union(cx, cy)
+    return _align(Ax, cx, cols) + _align(Ay, cy, cols), bx + by, shape, cols
+
+
+def _neg(x: _Block) -> _Block:
+    A, b, shape, cols = x
+    return -A, -b, shape, cols
+
+
+def _coefficients(x: Any, y: Any) -> Tuple[_Block, np.ndarray]:
+    # Split a product into the expression and the constant coefficients
+    x, y = _to_block(x), _to_block(y)
+    if _is_constant(y):
+        return x, y[1].reshape(y[2])
+    if _is_constant(x):
+        return y, x[1].reshape(x[2])
+    raise ValueError("The product of two non-constant expressions is not linear")
+
+
+def _multiply(x: Any, y: Any) -> _Block:
+    (A, b, shape, cols), c = _coefficients(x, y)
+    out = np.broadcast_shapes(shape, c.shape)
+    A, b, _, _ = _broadcast((A, b, shape, cols), out)
+    w = np.broadcast_to(c, out).ravel()
+    return _scale_rows(A, w), b * w, out, cols
+
+
+def _as_matrix(M: Any) -> Any:
+    if isinstance(M, LinearExpr):
+        block = M._eval()
+        if not _is_constant(block):
+            raise ValueError(
+                "The product of two non-constant expressions is not linear"
+            )
+        M = block[1].reshape(block[2])
+    if sparse is not None and sparse.issparse(M):
+        return sparse.csr_array(M)
+    M = np.asarray(M, dtype=float)
+    if M.ndim == 0:
+        raise ValueError("Scalar operands are not allowed in matmul, use * instead")
+    if M.ndim > 2:
+        raise ValueError(f"Matrix of shape {M.shape} not supported")
+    return M
+
+
+def _matmul(M: Any, x: Any) -> _Block:
+    # Left product M @ x
+    M = _as_matrix(M)
+    A, b, shape, cols = _to_block(x)
+    vector = len(M.shape) == 1
+    M2 = sparse.csr_array(M.reshape(1, -1) if vector else M)
+    if len(shape) == 1:
+        T = M2
+    elif len(shape) == 2:
+        T = sparse.kron(M2, _eye(shape[1]), format="csr")
+    else:
+        raise ValueError(f"Expression of shape {shape} not supported in matmul")
+    if M2.shape[1] != shape[0]:
+        raise ValueError(f"Shapes {M.shape} and {shape} are not aligned")
+    out = (M2.shape[0],) if not vector else ()
+    out = out + tuple(shape[1:])
+    return sparse.csr_array(T @ A), T @ b, out, cols
+
+
+def _rmatmul(x: Any, M: Any) -> _Block:
+    # Right product x @ M
+    M = _as_matrix(M)
+    A, b, shape, cols = _to_block(x)
+    vector = len(M.shape) == 1
+    M2 = sparse.csr_array(M.reshape(-1, 1) if vector else M)
+    if len(shape) == 1:
+        T = M2.T
+    elif len(shape) == 2:
+        T = sparse.kron(_eye(shape[0]), M2.T, format="csr")
+    else:
+        raise ValueError(f"Expression of shape {shape} not supported in matmul")
+    if M2.shape[0] != shape[-1]:
+        raise ValueError(f"Shapes {shape} and {M.shape} are not aligned")
+    out = tuple(shape[:-1]) + ((M2.shape[1],) if not vector else ())
+    return sparse.csr_array(T @ A), T @ b, out, cols
+
+
+def _sum(x: _Block, axis: Optional[int] = None) -> _Block:
+    A, b, shape, cols = x
+    n = _size(shape)
+    if axis is None:
+        rows, out = np.zeros(n, dtype=np.int64), ()
+    else:
+        axis = axis % max(len(shape), 1)
+        out = shape[:axis] + shape[axis + 1 :]
+        labels = np.expand_dims(_positions(out), axis)
+        rows = np.broadcast_to(labels, shape).ravel()
+    R = sparse.csr_array((np.ones(n), (rows, np.arange(n))), shape=(_size(out), n))
+    return sparse.csr_array(R @ A), R @ b, out, cols
+
+
+def _stack(blocks: List[_Block], fn: Callable) -> _Block:
+    cols = _union(*(c for _, _, _, c in blocks))
+    offset, positions = 0, []
+    for _, _, shape, _ in blocks:
+        positions.append(_positions(shape) + offset)
+        offset += _size(shape)
+    A = sparse.vstack([_align(A, c, cols) for A, _, _, c in blocks], format="csr")
+    b = np.concatenate([b for _, b, _, _ in blocks])
+    return _take((A, b, (offset,), cols), fn(positions))
+
+
+class _Columns:
+    # Bounds, integrality and last values of the columns of a variable
+    __slots__ = ("integer", "lb", "ref", "ub", "values")
+
+
+class VariableSpace:
+    """Columns of the variables of a set of problems.
+
+    Each variable is a contiguous range of columns, numbered in order of
+    creation. The space stores the bounds, the integrality and the last value
+    of the columns of each variable, and releases them once the variable is
+    garbage collected (the numbers of the columns are not reused).
+    Expressions only have coefficients for the columns they use, so the cost
+    of building a problem does not depend on the number of variables that
+    were created before in the same space.
+
+    Methods that take an array of columns expect it to be sorted.
+    """
+
+    def __init__(self) -> None:
+        self._n = 0
+        # Offset of each variable -> storage of its columns (sorted by offset)
+        self._columns: Dict[int, _Columns] = dict()
+        self._index: Optional[Tuple[np.ndarray, np.ndarray, List[_Columns]]] = None
+
+    @property
+    def num_columns(self) -> int:
+        """Number of columns of the variables that are in use."""
+        return sum(len(c.lb) for c in self._columns.values())
+
+    def add(
+        self,
+        shape: Tuple[int, ...],
+        lb: Optional[Union[Number, np.ndarray]] = None,
+        ub: Optional[Union[Number, np.ndarray]] = None,
+        integer: bool = False,
+    ) -> "LinearVariable":
+        """Add a variable to the space.
+
+        Args:
+            shape (Tuple[int, ...]): Shape of the variable.
+            lb (Optional[Union[Number, np.ndarray]]): Lower bounds. Defaults to None
+                (unbounded).
+            ub (Optional[Union[Number, np.ndarray]]): Upper bounds. Defaults to None
+                (unbounded).
+            integer (bool): Whether the variable is integer. Defaults to False.
+
+        Returns:
+            LinearVariable: The variable.
+        """
+        size = _size(shape)
+        offset = self._n
+        columns = _Columns()
+        columns.lb = np.full(size, -np.inf)
+        columns.ub = np.full(size, np.inf)
+        if lb is not None:
+            columns.lb[:] = np.broadcast_to(np.asarray(lb, dtype=float), shape).ravel()
+        if ub is not None:
+            columns.ub[:] = np.broadcast_to(np.asarray(ub, dtype=float), shape).ravel()
+        columns.integer = np.full(size, int(integer), dtype=np.int8)
+        columns.values = np.full(size, np.nan)
+        variable = LinearVariable(self, offset, shape)
+        columns.ref = weakref.ref(variable, lambda _: self._release(offset))
+        self._columns[offset] = columns
+        self._index = None
+        self._n = offset + size
+        return variable
+
+    def _release(self, offset: int) -> None:
+        self._columns.pop(offset, None)
+        self._index = None
+
+    def _ranges(self, columns: np.ndarray) -> Iterator[Tuple[_Columns, slice, Any]]:
+        # Storage of the variables that own some of the (sorted) columns, with
+        # the positions of the columns in the array and in the storage
+        if self._index is None:
+            storage = list(self._columns.values())
+            offsets = np.fromiter(self._columns.keys(), np.int64, len(storage))
+            sizes = np.fromiter((len(c.lb) for c in storage), np.int64, len(storage))
+            self._index = (offsets, sizes, storage)
+        offsets, sizes, storage = self._index
+        columns = np.asarray(columns, dtype=np.int64)
+        if len(columns) == 0 or len(offsets) == 0:
+            return
+        first = max(int(np.searchsorted(offsets, columns[0], side="right")) - 1, 0)
+        last = int(np.searchsorted(offsets, columns[-1], side="right"))
+        starts = np.searchsorted(columns, offsets[first:last])
+        ends = np.searchsorted(columns, offsets[first:last] + sizes[first:last])
+        for k, start, end in zip(range(first, last), starts, ends):
+            if end > start:
+                yield storage[k], slice(start, end), columns[start:end] - offsets[k]
+
+    def _gather(self, field: str, columns: np.ndarray, fill: Any) -> np.ndarray:
+        dtype = np.int8 if field == "integer" else float
+        out = np.full(len(columns), fill, dtype=dtype)
+        for storage, pos, local in self._ranges(columns):
+            out[pos] = getattr(storage, field)[local]
+        return out
+
+    def bounds(self, columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the lower and upper bounds and the integrality of the columns."""
+        return (
+            self._gather("lb", columns, -np.inf),
+            self._gather("ub", columns, np.inf),
+            self._gather("integer", columns, 0),
+        )
+
+    def values(self, columns: np.ndarray) -> np.ndarray:
+        """Get the last values of the given columns (NaN if not available)."""
+        return self._gather("values", columns, np.nan)
+
+    def set_values(self, columns: np.ndarray, values: Any) -> None:
+        """Set the values of the given columns."""
+        values = np.broadcast_to(np.asarray(values, dtype=float), (len(columns),))
+        for storage, pos, local in self._ranges(columns):
+            storage.values[local] = values[pos]
+
+
+class LinearExpr:
+    """Affine expression `A @ x[columns] + b` over a variable space.
+
+    Expressions support the linear operations of numpy arrays (addition,
+    multiplication by constants, `@` with dense or sparse matrices, indexing,
+    `sum`, transposition and stacking). Comparisons create
+    :class:`LinearConstraint` objects.
+    """
+
+    # Let numpy defer binary operations (e.g. `ndarray @ expr`) to this class
+    __array_ufunc__ = None
+    __array_priority__ = 100
+
+    def __init__(
+        self,
+        space: Optional[VariableSpace],
+        build: Callable[[], _Block],
+        params: Tuple["LinearParameter", ...] = (),
+    ) -> None:
+        self._space = space
+        self._params = params
+        self._key: Tuple[int, ...] = tuple(p._version for p in params)
+        self._A, self._b, self._shape, self._cols = build()
+        # Only expressions with parameters need to be re-evaluated
+        self._build = build if params else None
+
+    def _eval(self) -> _Block:
+        if self._build is not None:
+            key = tuple(p._version for p in self._params)
+            if key != self._key:
+                self._A, self._b, _, self._cols = self._build()
+                self._key = key
+        return self._A, self._b, self._shape, self._cols
+
+    def _op(self, fn: Callable, *operands: Any) -> "LinearExpr":
+        # Parameters are compared by identity (== creates a constraint)
+        space, params = self._space, {id(p): p for p in self._params}
+        for o in operands:
+            if isinstance(o, LinearExpr):
+                if space is None:
+                    space = o._space
+                elif o._space is not None and o._space is not space:
+                    raise ValueError(
+                        "Expressions from different backends can not be combined"
+                    )
+                params.update((id(p), p) for p in o._params)
+        return LinearExpr(space, lambda: fn(*operands), tuple(params.values()))
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self._shape
+
+    @property
+    def size(self) -> int:
+        return _size(self._shape)
+
+    @property
+    def ndim(self) -> int:
+        return len(self._shape)
+
+    @property
+    def A(self) -> Any:
+        """Sparse matrix of coefficients (one row per element).
+
+        The matrix has one column per element of `columns`.
+        """
+        return self._eval()[0]
+
+    @property
+    def columns(self) -> np.ndarray:
+        """Columns of the variable space used by the expression (sorted)."""
+        return self._eval()[3]
+
+    @property
+    def b(self) -> np.ndarray:
+        """Constant term (one value per element)."""
+        return self._eval()[1]
+
+    @property
+    def value(self) -> Optional[np.ndarray]:
+        A, b, shape, cols = self._eval()
+        if A.nnz == 0:
+            return b.reshape(shape)
+        if self._space is None:
+            return None
+        x = self._space.values(cols)
+        if np.any(np.isnan(x[A.indices])):
+            return None
+        return (A @ np.nan_to_num(x) + b).reshape(shape)
+
+    def __hash__(self) -> int:
+        return id(self)
+
+    def __getitem__(self, item: Any) -> "LinearExpr":
+        return self._op(lambda x: _take(x._eval(), _positions(x.shape)[item]), self)
+
+    @property
+    def T(self) -> "LinearExpr":
+        return self._op(lambda x: _take(x._eval(), _positions(x.shape).T), self)
+
+    def reshape(self, *shape: Any) -> "LinearExpr":
+        return self._op(
+            lambda x: _take(x._eval(), _positions(x.shape).reshape(*shape)), self
+        )
+
+    def __add__(self, other: Any) -> "LinearExpr":
+        return self._op(_add, self, other)
+
+    def __radd__(self, other: Any) -> "LinearExpr":
+        return self._op(_add, other, self)
+
+    def __neg__(self) -> "LinearExpr":
+        return self._op(lambda x: _neg(x._eval()), self)
+
+    def __sub__(self, other: Any) -> "LinearExpr":
+        return self._op(lambda x, y: _add(x, _neg(_to_block(y))), self, other)
+
+    def __rsub__(self, other: Any) -> "LinearExpr":
+        return self._op(lambda x, y: _add(_neg(x._eval()), y), self, other)
+
+    def multiply(self, other: Any) -> "LinearExpr":
+        """Elementwise product (with broadcasting)."""
+        return self._op(_multiply, self, other)
+
+    __mul__ = multiply
+    __rmul__ = multiply
+
+    def __truediv__(self, other: Any) -> "LinearExpr":
+        return self._op(lambda x, y: _multiply(x, 1.0 / _as_constant(y)), self, other)
+
+    def __rtruediv__(self, other: Any) -> "LinearExpr":
+        return self._op(lambda x, y: _multiply(y, 1.0 / _as_constant(x)), self, other)
+
+    def __matmul__(self, other: Any) -> "LinearExpr":
+        if isinstance(other, LinearExpr) and not _is_constant(other._eval()):
+            return self._op(_matmul, self, other)
+        return self._op(_rmatmul, self, other)
+
+    def __rmatmul__(self, other: Any) -> "LinearExpr":
+        return self._op(_matmul, other, self)
+
+    def sum(self, axis: Optional[int] = None) -> "LinearExpr":
+        return self._op(lambda x: _sum(x._eval(), axis=axis), self)
+
+    def hstack(self, *others: Any) -> "LinearExpr":
+        def fn(*items):
+            blocks = [_to_block(i) for i in items]
+            return _stack(blocks, np.hstack)
+
+        return self._op(fn, self, *others)
+
+    def vstack(self, *others: Any) -> "LinearExpr":
+        def fn(*items):
+            blocks = [_to_block(i) for i in items]
+            return _stack(blocks, np.vstack)
+
+        return self._op(fn, self, *others)
+
+    def _not_linear(self, *args, **kwargs):
+        raise NotImplementedError("Only linear expressions are supported")
+
+    __abs__ = _not_linear
+    __pow__ = _not_linear
+    __rpow__ = _not_linear
+    norm = _not_linear
+    max = _not_linear
+
+    def _compare(self, other: Any, sense: str) -> "LinearConstraint":
+        return LinearConstraint(self - other, sense)
+
+    def __le__(self, other: Any) -> "LinearConstraint":  # type: ignore
+        return self._compare(other, "<=")
+
+    def __ge__(self, other: Any) -> "LinearConstraint":  # type: ignore
+        return self._compare(other, ">=")
+
+    def __eq__(self, other: Any) -> "LinearConstraint":  # type: ignore
+        return self._compare(other, "==")
+
+    def __lt__(self, other: Any) -> "LinearConstraint":
+        raise ValueError("Strict inequalities are not supported")
+
+    __gt__ = __lt__
+
+    def __str__(self) -> str:
+        return f"LinearExpr(shape={self._shape})"
+
+    __repr__ = __str__
+
+
+def _as_constant(x: Any) -> np.ndarray:
+    block = _to_block(x)
+    if not _is_constant(block):
+        raise ValueError("Division by a non-constant expression is not linear")
+    return block[1].reshape(block[2])
+
+
+class LinearVariable(LinearExpr):
+    """Variable of a :class:`VariableSpace` (a range of columns)."""
+
+    def __init__(self, space: VariableSpace, offset: int, shape: Tuple[int, ...]):
+        size = _size(shape)
+
+        def build():
+            cols = np.arange(offset, offset + size, dtype=np.int64)
+            return _eye(size), np.zeros(size), shape, cols
+
+        super().__init__(space, build)
+        self.offset = offset
+
+    @property
+    def value(self) -> Optional[np.ndarray]:
+        values = self._space.values(self.columns)  # type: ignore
+        if np.any(np.isnan(values)):
+            return None
+        return values.reshape(self._shape)
+
+    @value.setter
+    def value(self, value: Any) -> None:
+        value = np.broadcast_to(np.asarray(value, dtype=float), self._shape)
+        self._space.set_values(self.columns, value.ravel())  # type: ignore
+
+
+class LinearParameter(LinearExpr):
+    """Constant whose value can change after it is used in expressions."""
+
+    def __init__(self, shape: Tuple[int, ...], value: Any = None) -> None:
+        self._version = 0
+        self._value = None
+        self._set(shape, value)
+        super().__init__(None, self._block, (self,))
+
+    def _set(self, shape: Tuple[int, ...], value: Any) -> None:
+        if value is not None:
+            value = np.broadcast_to(np.asarray(value, dtype=float), shape).copy()
+        self._param_shape = shape
+        self._value = value
+        self._version += 1
+
+    def _block(self) -> _Block:
+        shape = self._param_shape
+        value = self._value if self._value is not None else np.zeros(shape)
+        return _empty(_size(shape)), value.ravel(), shape, _NO_COLUMNS
+
+    @property
+    def value(self) -> Optional[np.ndarray]:
+        return self._value
+
+    @value.setter
+    def value(self, value: Any) -> None:
+        self._set(self._param_shape, value)
+
+
+class LinearConstraint:
+    """Block of linear constraints `expr <= 0`, `expr >= 0` or `expr == 0`."""
+
+    def __init__(self, expr: LinearExpr, sense: str) -> None:
+        if sense not in ("<=", ">=", "=="):
+            raise ValueError(f"Invalid sense {sense}")
+        self.expr = expr
+        self.sense = sense
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.expr.shape
+
+    def rows(self) -> Tuple[Any, np.ndarray, np.ndarray, np.ndarray]:
+        """Get the rows `lo <= A @ x[cols] <= hi` of the constraint.
+
+        Returns:
+            Tuple: `A`, `lo`, `hi` and the columns `cols` of the space.
+        """
+        A, b, _, cols = self.expr._eval()
+        lo = np.full(len(b), -np.inf) if self.sense == "<=" else -b
+        hi = np.full(len(b), np.inf) if self.sense == ">=" else -b
+        return A, lo, hi, cols
+
+    @property
+    def value(self) -> Optional[np.ndarray]:
+        v = self.expr.value
+        if v is None:
+            return None
+        tol = 1e-6
+        if self.sense == "<=":
+            return v <= tol
+        if self.sense == ">=":
+            return v >= -tol
+        return np.abs(v) <= tol
+
+    def __hash__(self) -> int:
+        return id(self)
+
+    def __str__(self) -> str:
+        return f"LinearConstraint(shape={self.shape}, sense={self.sense})"
+
+    __repr__ = __str__
+
+
+class StandardForm:
+    """Linear problem `min c @ x` s.t. `lo <= A @ x <= hi`, `lb <= x <= ub`.
+
+    Attributes:
+        c (np.ndarray): Objective vector (for minimization).
+        offset (float): Constant term of the objective.
+        A: Sparse constraint matrix (CSR).
+        lo (np.ndarray): Lower bounds of the rows.
+        hi (np.ndarray): Upper bounds of the rows.
+        lb (np.ndarray): Lower bounds of the variables.
+        ub (np.ndarray): Upper bounds of the variables.
+        integrality (np.ndarray): 1 for integer variables, 0 otherwise.
+        columns (np.ndarray): Column of each variable in the variable space.
+        direction (Direction): Direction of the original objective.
+        start (Optional[np.ndarray]): Initial solution (NaN for the variables
+            without an initial value), or None.
+    """
+
+    def __init__(
+        self,
+        space: Optional[VariableSpace],
+        c: np.ndarray,
+        offset: float,
+        A: Any,
+        lo: np.ndarray,
+        hi: np.ndarray,
+        columns: np.ndarray,
+        direction: Direction = Direction.MIN,
+        start: Optional[np.ndarray] = None,
+    ) -> None:
+        self.space = space
+        self.c = c
+        self.offset = offset
+        self.A = A
+        self.lo = lo
+        self.hi = hi
+        self.columns = columns
+        self.direction = direction
+        self.start = start
+        if space is None:
+            n = len(columns)
+            self.lb, self.ub = np.full(n, -np.inf), np.full(n, np.inf)
+            self.integrality = np.zeros(n, dtype=np.int8)
+        else:
+            self.lb, self.ub, self.integrality = space.bounds(columns)
+
+    @property
+    def num_variables(self) -> int:
+        return len(self.columns)
+
+    @property
+    def num_constraints(self) -> int:
+        return self.A.shape[0]
+
+    def solve(
+        self,
+        max_seconds: Optional[float] = None,
+        verbosity: int = 0,
+        **options,
+    ) -> Any:
+        """Solve the problem with `scipy.optimize.milp` (HiGHS).
+
+        The values of the variables are stored in the variable space, so
+        they are available in the `value` of the variables and expressions
+        (None if no solution was found). `scipy.optimize.milp` does not accept
+        initial solutions: if the problem has a `start`, it is solved with
+        the HiGHS API (`highspy`) instead, using the start as a MIP start.
+
+        Args:
+            max_seconds (Optional[float]): Time limit. Defaults to None.
+            verbosity (int): Show the solver output if > 0. Defaults to 0.
+            **options: Other options of `scipy.optimize.milp` (e.g.,
+                `mip_rel_gap`, `node_limit` or `presolve`).
+
+        Returns:
+            OptimizeResult: The result of `scipy.optimize.milp`. The `fun`
+            attribute is the value of the original objective.
+        """
+        from scipy.optimize import Bounds, LinearConstraint, milp
+
+        opts = {"disp": verbosity > 0}
+        if max_seconds is not None:
+            opts["time_limit"] = float(max_seconds)
+        opts.update(options)
+        if self.start is not None and highspy is None:
+            LOGGER.warn("Initial values require highspy, ignored")
+        if self.start is not None and highspy is not None:
+            result = self._solve_highs(opts)
+        else:
+            constraints = None
+            if self.num_constraints > 0:
+                constraints = LinearConstraint(self.A, self.lo, self.hi)
+            result = milp(
+                self.c,
+                integrality=self.integrality,
+                bounds=Bounds(self.lb, self.ub),
+                constraints=constraints,
+                options=opts,
+            )
+        if result.x is not None:
+            result.fun = self._objective(result.fun)
+        if self.space is not None:
+            x = result.x if result.x is not None else np.nan
+            self.space.set_values(self.columns, x)
+        return result
+
+    def _solve_highs(self, options: dict) -> Any:
+        # Same problem and result as `milp`, with the start as MIP start
+        from scipy.optimize import OptimizeResult
+
+        h = highspy.Highs()
+        for key, value in options.items():
+            if key == "disp":
+                key, value = "output_flag", bool(value)
+            elif key == "node_limit":
+                key = "mip_max_nodes"
+            elif key == "presolve":
+                value = "on" if value else "off"
+            h.setOptionValue(key, value)
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.num_variables
+        lp.num_row_ = self.num_constraints
+        lp.col_cost_ = self.c
+        lp.col_lower_ = self.lb
+        lp.col_upper_ = self.ub
+        lp.row_lower_ = self.lo
+        lp.row_upper_ = self.hi
+        A = sparse.csc_array(self.A)
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.num_col_ = self.num_variables
+        lp.a_matrix_.num_row_ = self.num_constraints
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+        if np.any(self.integrality):
+            lp.integrality_ = [
+                highspy.HighsVarType.kInteger if i else highspy.HighsVarType.kContinuous
+                for i in self.integrality
+            ]
+        h.passModel(lp)
+        idx = np.flatnonzero(~np.isnan(self.start))
+        h.setSolution(len(idx), idx.astype(np.int32), self.start[idx])
+        h.run()
+        status = h.getModelStatus()
+        M = highspy.HighsModelStatus
+        codes = {
+            M.kOptimal: 0,
+            M.kTimeLimit: 1,
+            M.kIterationLimit: 1,
+            M.kSolutionLimit: 1,
+            M.kInterrupt: 1,
+            M.kInfeasible: 2,
+            M.kUnbounded: 3,
+            M.kUnboundedOrInfeasible: 3,
+        }
+        info = h.getInfo()
+        x, fun = None, None
+        if info.primal_solution_status == highspy.kSolutionStatusFeasible:
+            x = np.array(h.getSolution().col_value)
+            fun = info.objective_function_value
+        code = codes.get(status, 4)
+        return OptimizeResult(
+            x=x,
+            fun=fun,
+            status=code,
+            success=code == 0,
+            message=h.modelStatusToString(status),
+            mip_gap=info.mip_gap,
+            mip_node_count=info.mip_node_count,
+        )
+
+    def _objective(self, fun: float) -> float:
+        if self.direction == Direction.MAX:
+            fun = -fun
+        return fun + self.offset
+
+
+def _unwrap(e: Any) -> Any:
+    # Get the linear expression of a backend expression
+    if isinstance(e, (LinearExpr, LinearConstraint)):
+        return e
+    return getattr(e, "_expr", e)
+
+
+def _weighted_objective(
+    objectives: Iterable[Any], weights: Iterable[float]
+) -> Optional[LinearExpr]:
+    total: Optional[LinearExpr] = None
+    for o, w in zip(objectives, weights):
+        if w == 0:
+            continue
+        term = _unwrap(o) * w
+        total = term if total is None else total + term
+    return total
+
+
+def compile_problem(
+    p: Any,
+    objective: Optional[Any] = None,
+) -> StandardForm:
+    """Lower a problem with linear expressions into standard form.
+
+    Args:
+        p (ProblemDef): The problem. The constraints have to be
+            :class:`LinearConstraint` objects (or expressions wrapping them).
+        objective (Optional[Any]): The objective. Defaults to the weighted sum
+            of the objectives of the problem.
+
+    Returns:
+        StandardForm: The problem in standard form.
+    """
+    if sparse is None:
+        raise ImportError("scipy is required to compile problems")
+    if objective is None:
+        objective = _weighted_objective(p.objectives, p.weights)
+    objective = _unwrap(objective) if objective is not None else None
+    direction = getattr(p, "direction", Direction.MIN)
+
+    space: Optional[VariableSpace] = None
+    blocks: List[Tuple[Any, np.ndarray, np.ndarray, np.ndarray]] = []
+    exprs: List[LinearExpr] = []
+    for c in p.constraints:
+        c = _unwrap(c)
+        if not isinstance(c, LinearConstraint):
+            raise ValueError(f"Constraint of type {type(c)} is not linear")
+        blocks.append(c.rows())
+        exprs.append(c.expr)
+    if objective is not None:
+        if not isinstance(objective, LinearExpr):
+            objective = LinearExpr(None, lambda: _constant(objective))
+        if objective.size != 1:
+            raise ValueError(
+                f"The objective has shape {objective.shape}, a scalar is required"
+            )
+        exprs.append(objective)
+    # Variables of the problem (including those without coefficients)
+    used = [cols for _, _, _, cols in blocks]
+    for s in getattr(p, "symbols", {}).values():
+        e = _unwrap(s)
+        if isinstance(e, LinearVariable):
+            used.append(e.columns)
+            exprs.append(e)
+    for e in exprs:
+        if e._space is not None:
+            if space is not None and e._space is not space:
+                raise ValueError("The problem has variables from different backends")
+            space = e._space
+    if objective is not None:
+        used.append(objective.columns)
+    columns = _union(*used)
+    if blocks:
+        A = sparse.vstack(
+            [_align(A, cols, columns) for A, _, _, cols in blocks], format="csr"
+        )
+        lo = np.concatenate([lo for _, lo, _, _ in blocks])
+        hi = np.concatenate([hi for _, _, hi, _ in blocks])
+    else:
+        A = _empty(0, len(columns))
+        lo, hi = np.zeros(0), np.zeros(0)
+    c, offset = np.zeros(len(columns)), 0.0
+    if objective is not None:
+        Ao, bo, _, co = objective._eval()
+        c = _align(Ao, co, columns).toarray().ravel()
+        offset = float(bo[0])
+    if direction == Direction.MAX:
+        c = -c
+    for e in exprs:
+        for param in e._params:
+            if param.value is None:
+                raise ValueError("A parameter of the problem has no value")
+    start = None
+    if getattr(p, "start", None):
+        symbols = p.symbols
+        start = np.full(len(columns), np.nan)
+        for name, value in p.start.items():
+            e = _unwrap(symbols[name])
+            if isinstance(e, LinearVariable) and e._space is space:
+                start[np.searchsorted(columns, e.columns)] = np.ravel(value)
+    LOGGER.debug(
+        f"Compiled problem with {len(columns)} variables and {A.shape[0]} constraints"
+    )
+    return StandardForm(space, c, offset, A, lo, hi, columns, direction, start)
@@ -1,9 +1,20 @@
+import heapq
+import multiprocessing
 import time
-from typing import Dict, List, Tuple, Union
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-from corneto._graph import Graph
+import numpy as np
+
+from corneto._graph import BaseGraph, Graph
+from corneto._graph_index import EDGE_DIRECTED, GraphIndex
+from corneto._graph_readonly import ReadOnlyGraph
 from corneto._settings import LOGGER
-from corneto.methods.signaling import create_flow_graph, signflow
+from corneto.methods.signaling import create_flow_graph, signflow, signflow_start
+
+# Budget of the search used to build the initial solution in
+# `runVanillaCarnival(heuristic_start=True)`
+_HEURISTIC_START_OPTIONS = dict(max_time=60, max_iters=100_000)
 
 
 def _info(s, show=True):
@@ -71,12 +82,14 @@ def read_dataset(zip_path):
 def runVanillaCarnival(
     perturbations: Dict,
     measurements: Dict,
-    priorKnowledgeNetwork: Union[List[Tuple], Graph],
+    priorKnowledgeNetwork: Union[List[Tuple], BaseGraph],
     betaWeight: float = 0.2,
     solver=None,
     backend_options=dict(),
     solve=True,
     verbose=True,
+    heuristic_start=False,
+    heuristic_options=None,
     **kwargs,
 ):
     if backend_options is None:
@@ -91,7 +104,7 @@ def runVanillaCarnival(
     conditions = {"c0": data}
     if isinstance(priorKnowledgeNetwork, List):
         G = Graph.from_sif_tuples(priorKnowledgeNetwork)
-    elif isinstance(priorKnowledgeNetwork, Graph):
+    elif isinstance(priorKnowledgeNetwork, BaseGraph):
         G = priorKnowledgeNetwork
     else:
         raise ValueError("Provide a list of sif tuples or a graph")
@@ -104,7 +117,7 @@ def runVanillaCarnival(
     _info(f"{len(c_inputs)}/{len(inputs)} inputs mapped to the graph", show=verbose)
     _info(f"{len(c_outputs)}/{len(outputs)} outputs mapped to the graph", show=verbose)
     _info(f"Pruning the graph with size: V x E = {G.shape}...", show=verbose)
-    Gp = G.prune(list(c_inputs), list(c_outputs))
+    Gp = G.prune(list(c_inputs), list(c_outputs), view=True)
     _info(f"Finished. Final size: V x E = {Gp.shape}.", show=verbose)
     V = set(Gp.vertices)
     cp_inputs = {input: v for input, v in perturbations.items() if input in V}
@@ -115,6 +128,18 @@ def runVanillaCarnival(
     Gf = create_flow_graph(Gp, conditions)
     _info("Creating a network flow problem...", show=verbose)
     P = signflow(Gf, conditions, l0_penalty_vertices=betaWeight, **kwargs)
+    if heuristic_start:
+        _info("Searching an initial solution with the heuristic...", show=verbose)
+        # Options of bfs_search, the default budget is used for the ones
+        # that are not provided
+        options = {**_HEURISTIC_START_OPTIONS, **(heuristic_options or dict())}
+        selected_edges, paths, stats = bfs_search(
+            Gp, cp_inputs, cp_outputs, verbose=False, **options
+        )
+        _info(f"Heuristic finished after {stats['iters']} iterations.", show=verbose)
+        # The edges of Gp keep their index in the flow graph
+        signs = {v: value for _, path in paths for v, (_, value, _) in path.items()}
+        P.set_start(signflow_start(P, selected_edges, signs, "c0"))
     _info("Preprocess completed.", show=verbose)
     if solve:
         P.solve(solver=solver, **backend_options)
@@ -134,7 +159,7 @@ def runInverseCarnival(
     raise NotImplementedError()
     if isinstance(priorKnowledgeNetwork, List):
         G = Graph.from_sif_tuples(priorKnowledgeNetwork)
-    elif isinstance(priorKnowledgeNetwork, Graph):
+    elif isinstance(priorKnowledgeNetwork, BaseGraph):
         G = priorKnowledgeNetwork
     else:
         raise ValueError("Provide a list of sif tuples or a graph")
@@ -145,7 +170,7 @@ def runInverseCarnival(
 
 
 def heuristic_carnival(
-    priorKnowledgeNetwork: Union[List[Tuple], Graph],
+    priorKnowledgeNetwork: Union[List[Tuple], BaseGraph],
     perturbations: Dict,
     measurements: Dict,
     restricted_search: bool = False,
@@ -153,7 +178,41 @@ def heuristic_carnival(
     verbose=True,
     max_time=None,
     max_edges=None,
+    beam_width=None,
+    n_starts=1,
+    max_iters=None,
+    processes=1,
+    seed=None,
 ):
+    """Find a sign consistent network with a search of paths (no MILP).
+
+    Args:
+        priorKnowledgeNetwork (Union[List[Tuple], BaseGraph]): Signed network.
+        perturbations (Dict): Sign of the perturbed vertices.
+        measurements (Dict): Sign of the measured vertices.
+        restricted_search (bool): Search only the edges of the
+            `reachability_graph` of the inputs.
+        prune (bool): Remove the vertices that are not in a path from the
+            inputs to the measurements before the search.
+        verbose (bool): Print the progress.
+        max_time (Optional[float]): Time budget in seconds (for all the
+            starts).
+        max_edges (Optional[int]): Stop when the network has this number of
+            edges.
+        beam_width (Optional[int]): Use a beam search of this width (see
+            `bfs_search`).
+        n_starts (int): Number of searches with a randomized order. The
+            network with the lowest error is returned (see
+            `multistart_bfs_search`). Defaults to 1 (a single search in the
+            order of the graph).
+        max_iters (Optional[int]): Budget of expanded states per search.
+        processes (Optional[int]): Number of processes for the starts.
+        seed (Optional[int]): Seed of the randomized searches.
+
+    Returns:
+        Tuple: The pruned graph, the selected edges, the paths, the stats of
+        the search and the error of each measurement.
+    """
     if isinstance(priorKnowledgeNetwork, List):
         G = Graph.from_sif_tuples(priorKnowledgeNetwork)
     elif isinstance(priorKnowledgeNetwork, Graph):
@@ -184,21 +243,36 @@ def heuristic_carnival(
     selected_edges = None
     if restricted_search:
         selected_edges = reachability_graph(Gp, inputs_p, outputs_p, verbose=verbose)
-    selected_edges, paths, stats = bfs_search(
-        Gp,
-        inputs_p,
-        outputs_p,
-        subset_edges=selected_edges,
-        max_time=max_time,
-        max_edges=max_edges,
-        verbose=verbose,
-    )
+    if n_starts > 1:
+        best = multistart_bfs_search(
+            Gp,
+            inputs_p,
+            outputs_p,
+            n_starts=n_starts,
+            beam_width=beam_width,
+            subset_edges=selected_edges,
+            max_time=max_time,
+            max_iters=max_iters,
+            max_edges=max_edges,
+            processes=processes,
+            seed=seed,
+        )
+        _, selected_edges, paths, stats = best[0]
+    else:
+        selected_edges, paths, stats = bfs_search(
+            Gp,
+            inputs_p,
+            outputs_p,
+            subset_edges=selected_edges,
+            max_time=max_time,
+            max_edges=max_edges,
+            verbose=verbose,
+            beam_width=beam_width,
+            seed=seed,
+            max_iters=max_iters,
+        )
     # Estimate error, using inputs and outputs and comparing to what was selected
-    predicted_values = {p[0]: p[1][p[0]][1] for p in paths}
-    errors = dict()
-    for k, v in measurements.items():
-        error = abs(v - predicted_values.get(k, 0))
-        errors[k] = error
+    errors = _measurement_errors(paths, measurements)
     total_error = sum(errors.values())
     if verbose:
         print(f"Total error: {total_error}")
@@ -254,20 +328,6 @@ def _str_state(state, max_steps=3):
     return " -> ".join(nodes)
 
 
-def _extract_nodes(path, values=False, subset=None):
-    d = []
-    v, pd = path
-    for k, v in pd.items():
-        e = k
-        if values:
-            e = (k, v[1])
-        if subset is not None:
-            if k not in subset:
-                continue
-        d.append(e)
-    return tuple(d)
-
-
 def reachability_graph(
     G,
     input_nodes,
@@ -329,20 +389,6 @@ def reachability_graph(
     return selected_edges
 
 
-def _path_conflict(p, paths):
-    nodes_in_path = _extract_nodes(p)
-    valid = True
-    p_a, p_b = None, None
-    for path in paths:
-        common = set(nodes_in_path).intersection(_extract_nodes(path))
-        p_a = _extract_nodes(p, values=True, subset=common)
-        p_b = _extract_nodes(path, values=True, subset=common)
-        if p_a != p_b:
-            valid = False
-            break
-    return valid, p_a, p_b
-
-
 def _str_path_nodes(a):
     nodes = []
     for k, v in a:
@@ -353,6 +399,160 @@ def _str_path_nodes(a):
     return "/".join(nodes)
 
 
+class _SearchTree:
+    """States of `bfs_search`, stored with pointers to their parent state.
+
+    Each state is a vertex reached through an edge from its parent state, so
+    a path is recovered by following the parents up to a starting vertex,
+    without copying the path at each step.
+
+    The states that are not expanded yet also keep the vertices of their path
+    with their values as a bitset (a Python int with bit `2 * vertex` for
+    positive values and `2 * vertex + 1` for negative ones), built from the
+    bitset of the parent when the state is added. Checking if a path contains
+    a vertex, or if it has a value that conflicts with the values assigned
+    with `assign`, is a single bitwise operation instead of a walk over the
+    path. Bitsets are dropped with `release` once the state is expanded.
+    """
+
+    def __init__(self) -> None:
+        self.vertex: List[int] = []
+        self.parent: List[int] = []
+        self.depth: List[int] = []
+        self.value: List[int] = []
+        self.edge: List[Any] = []
+        self.assigned: Dict[int, int] = dict()
+        self._bits: Dict[int, int] = dict()
+        # Bits of the values that conflict with the assigned values
+        self._conflicting = 0
+
+    @staticmethod
+    def _bit(vertex: int, value: int) -> int:
+        return 1 << (2 * vertex + (value < 0))
+
+    def add(self, vertex: int, parent: int, value: int, edge: Any) -> int:
+        state = len(self.vertex)
+        self.vertex.append(vertex)
+        self.parent.append(parent)
+        self.depth.append(self.depth[parent] + 1 if parent >= 0 else 0)
+        self.value.append(value)
+        self.edge.append(edge)
+        bits = self._bits[parent] if parent >= 0 else 0
+        self._bits[state] = bits | self._bit(vertex, value)
+        return state
+
+    def release(self, state: int) -> None:
+        """Drop the bitset of a state that is expanded or discarded."""
+        self._bits.pop(state, None)
+
+    def states(self, state: int) -> List[int]:
+        """States from the starting vertex to `state`."""
+        path = []
+        while state >= 0:
+            path.append(state)
+            state = self.parent[state]
+        return path[::-1]
+
+    def contains(self, state: int, vertex: int) -> bool:
+        """Check if the path that ends in `state` contains the vertex."""
+        return (self._bits[state] >> (2 * vertex)) & 3 != 0
+
+    def assign(self, state: int) -> None:
+        """Assign the values of the vertices in the path that ends in `state`."""
+        for j in self.states(state):
+            v, value = self.vertex[j], self.value[j]
+            if v not in self.assigned:
+                self.assigned[v] = value
+                self._conflicting |= self._bit(v, -value)
+
+    def conflicts(self, state: int) -> bool:
+        """Check if the path has a value that differs from the assigned one."""
+        return self._bits[state] & self._conflicting != 0
+
+    def path(self, state: int, V: List) -> Tuple[Any, Dict]:
+        """Path as `(vertex, {vertex: (dist. from source, value, edge index)})`."""
+        states = self.states(state)
+        return V[self.vertex[state]], {
+            V[self.vertex[i]]: (self.depth[i], self.value[i], self.edge[i])
+            for i in states
+        }
+
+
+def _measurement_scores(G: BaseGraph, final_dict: Dict) -> np.ndarray:
+    # Priority of each vertex for the best-first search: the largest absolute
+    # value of a measurement that can be reached from the vertex, discounted
+    # by the distance to the measurement
+    index = G.get_index()
+    score = np.zeros(G.num_vertices)
+    vids = G.vertex_indices(final_dict.keys())
+    for m, w in zip(vids.tolist(), final_dict.values()):
+        dist = index.bfs([m], reverse=True)
+        reached = dist >= 0
+        score[reached] = np.maximum(score[reached], abs(w) / (1.0 + dist[reached]))
+    return score
+
+
+class _ErrorBound:
+    """Lower bound of the measurement error of the states of `bfs_search`.
+
+    A state with a value in a vertex can still fix a measurement if there is
+    a path from the vertex to the measurement whose signs turn the value of
+    the state into the value of the measurement. The bound of a state is the
+    error of the measurements that are not reached yet, minus the error of the
+    ones that the state can still fix. Paths are searched in a graph with two
+    vertices per vertex (positive and negative value), all the measurements
+    at once with `GraphIndex.reachable`.
+    """
+
+    def __init__(
+        self,
+        index: GraphIndex,
+        sign: np.ndarray,
+        goal: Dict[int, int],
+        subset_edges: Optional[Set[int]] = None,
+    ) -> None:
+        n = index.num_vertices
+        owner = np.repeat(np.arange(n), np.diff(index.out_ptr))
+        edges = index.out_idx
+        target = index.first_target()[edges]
+        sign = sign[edges]
+        keep = (target >= 0) & (target != owner) & (sign != 0)
+        if subset_edges is not None:
+            keep &= np.isin(edges, np.fromiter(subset_edges, dtype=np.int64))
+        u, v, pos = owner[keep], target[keep], sign[keep] > 0
+        # Vertex v holds the positive values and v + n the negative ones
+        src = np.concatenate([u, u + n])
+        tgt = np.concatenate([np.where(pos, v, v + n), np.where(pos, v + n, v)])
+        ptr = np.arange(len(src) + 1)
+        self._index = GraphIndex(
+            2 * n, np.full(len(src), EDGE_DIRECTED), ptr, src, ptr, tgt
+        )
+        self._n = n
+        self._goal = goal
+        self.remaining = float(sum(abs(w) for w in goal.values()))
+        self._fixable = np.zeros(2 * n)
+        items = list(goal.items())
+        for k in range(0, len(items), 64):
+            chunk = items[k : k + 64]
+            reach = self._index.reachable(
+                [[self._node(m, w)] for m, w in chunk], reverse=True
+            )
+            self._fixable += reach @ np.array([abs(w) for _, w in chunk], dtype=float)
+
+    def _node(self, vertex: int, value: int) -> int:
+        return vertex if value > 0 else vertex + self._n
+
+    def reach(self, vertex: int) -> None:
+        """Remove a measurement that is reached by the selected paths."""
+        w = self._goal[vertex]
+        reach = self._index.reachable([[self._node(vertex, w)]], reverse=True)
+        self._fixable[reach[:, 0]] -= abs(w)
+        self.remaining -= abs(w)
+
+    def __call__(self, vertex: int, value: int) -> float:
+        return self.remaining - self._fixable[self._node(vertex, value)]
+
+
 def bfs_search(
     G,
     initial_dict,
@@ -362,8 +562,50 @@ def bfs_search(
     subset_edges=None,
     max_edges=None,
     verbose=True,
+    best_first=False,
+    beam_width=None,
+    seed=None,
+    max_iters=None,
 ):
-    Q = []
+    """Search sign consistent paths from the inputs to the measurements.
+
+    Paths are expanded in breadth-first order from the inputs, propagating
+    the sign of the inputs through the edges. A path that reaches a
+    measurement with its sign is selected if the vertices that it shares with
+    the selected paths have the same sign in all of them.
+
+    Args:
+        G (BaseGraph): Signed graph (edges with an `interaction` attribute).
+        initial_dict (Dict): Sign of each input vertex.
+        final_dict (Dict): Sign of each measurement vertex.
+        max_time (Optional[float]): Maximum time in seconds.
+        queue_max_size (Optional[int]): Stop expanding a state once the queue
+            exceeds this size.
+        subset_edges (Optional[Set[int]]): Edges that can be used (all if
+            not provided).
+        max_edges (Optional[int]): Stop when the selected paths have this
+            number of edges.
+        verbose (bool): Print the progress of the search.
+        best_first (bool): Expand first the states with the lowest bound of
+            the measurement error: the error of the measurements that are not
+            reached, minus the ones that can still be reached with their sign
+            from the state (none if the path of the state has a sign that
+            conflicts with the selected paths). Ties are broken by the
+            distance to the measurements with largest absolute values.
+            Defaults to False.
+        beam_width (Optional[int]): Beam search: keep only the best
+            `beam_width` states of each layer of the search, ranked as in
+            `best_first`.
+        seed (Optional[int]): Seed to randomize the order of the inputs and
+            of the out-edges of each vertex (for random restarts). If None,
+            the order of the graph is used.
+        max_iters (Optional[int]): Maximum number of expanded states.
+
+    Returns:
+        Tuple[Set[int], List, Dict]: Edges of the selected paths, the paths as
+        `(measurement, {vertex: (dist. from source, value, edge index)})` and
+        statistics of the search.
+    """
     reached = set()
     stats = dict(loops=0, iters=0, conflicts=0)
     paths = []
@@ -377,61 +619,135 @@ def bfs_search(
         outs.append(str(k) + f" (L{first_level[k]})")
     if verbose:
         print(", ".join(outs))
-    for k, w in initial_dict.items():
-        Q.append((k, {k: (0, w, None)}))
+    # Compiled out-edges, target and sign of the edges
+    V = list(G.V)
+    index = G.get_index()
+    out_ptr, out_idx = index.out_ptr, index.out_idx
+    target = index.first_target().tolist()
+    sign = G.get_edge_attr_array("interaction", default=0).astype(int).tolist()
+    goal = dict(zip(G.vertex_indices(final_dict.keys()).tolist(), final_dict.values()))
+    if best_first and beam_width is not None:
+        raise ValueError("best_first and beam_width can not be used together")
+    if beam_width is not None and beam_width < 1:
+        raise ValueError("The beam width has to be at least 1")
+    rng = np.random.default_rng(seed) if seed is not None else None
+    # States of the search and sign of the vertices in the selected paths
+    tree = _SearchTree()
+    bound = None
+    if best_first or beam_width is not None:
+        score = _measurement_scores(G, final_dict)
+        bound = _ErrorBound(index, np.asarray(sign), goal, subset_edges)
+
+    def error_bound(state):
+        if tree.conflicts(state):
+            return bound.remaining
+        return bound(tree.vertex[state], tree.value[state])
+
+    def rank(state):
+        return error_bound(state), -score[tree.vertex[state]], state
+
+    if best_first:
+        Q: Any = []
+        counter = 0
+
+        def push(state):
+            nonlocal counter
+            v = tree.vertex[state]
+            key = (error_bound(state), -score[v], tree.depth[state], counter)
+            heapq.heappush(Q, (*key, state))
+            counter += 1
+
+        def pop():
+            return heapq.heappop(Q)[-1]
+    else:
+        Q = deque()
+        push, pop = Q.append, Q.popleft
+    inputs = list(
+        zip(G.vertex_indices(initial_dict.keys()).tolist(), initial_dict.values())
+    )
+    if rng is not None:
+        inputs = [inputs[i] for i in rng.permutation(len(inputs))]
+    for k, w in inputs:
+        push(tree.add(k, -1, w, None))
     start = time.time()
     while len(Q) > 0 and not exit:
         if max_time is not None and time.time() - start > max_time:
             if verbose:
                 print("Timeout reached.")
             break
-        current = Q.pop(0)
-        n, v = current
-        if v[n][0] > last_level:
-            last_level = v[n][0]
+        if max_iters is not None and stats["iters"] >= max_iters:
+            if verbose:
+                print("Max iterations reached.")
+            break
+        current = pop()
+        if tree.depth[current] > last_level:
+            last_level = tree.depth[current]
             if verbose:
                 elapsed = time.time() - start
                 print(f"L{last_level:<3}: {stats['iters']:>6} iters, {elapsed:.2f} s.")
-        for i, (s, t) in G.out_edges(n):
+            if beam_width is not None and len(Q) >= beam_width:
+                # The queue has the rest of the new layer
+                layer = sorted([current, *Q], key=rank)
+                for state in layer[beam_width:]:
+                    tree.release(state)
+                Q.clear()
+                Q.extend(layer[1:beam_width])
+                current = layer[0]
+        n = tree.vertex[current]
+        out = out_idx[out_ptr[n] : out_ptr[n + 1]]
+        if rng is not None:
+            out = rng.permutation(out)
+        for i in out.tolist():
             if subset_edges is not None and i not in subset_edges:
                 continue
-            val = int(G.get_attr_edge(i).get("interaction", 0))
-            nt = list(t)
-            if len(nt) == 0:
+            nt = target[i]
+            if nt < 0:
                 continue
-            nt = nt[0]
-            if nt == n or nt in v:
+            if nt == n or tree.contains(current, nt):
                 stats["loops"] += 1
                 continue
-            nv = dict(v)
-            pos, w, _ = nv[n]
-            value = w * val
-            nv[nt] = (pos + 1, value, i)
-            # State = (vertex, (dist. from source, value=+1/-1, edge index))
-            new_state = (nt, nv)
+            value = tree.value[current] * sign[i]
+            new_state = tree.add(nt, current, value, i)
             # Check if the vertex is in the goal set
             if nt not in reached:
-                vf = final_dict.get(nt, None)
+                vf = goal.get(nt, None)
                 if vf is not None and vf == value:
-                    valid, p_a, p_b = _path_conflict(new_state, paths)
+                    states = tree.states(new_state)
                     if verbose:
-                        print(" >", _str_state(new_state))
-                    if not valid:
-                        print(
-                            "   ! conflict: {} != {}".format(
-                                _str_path_nodes(p_a), _str_path_nodes(p_b)
+                        print(" >", _str_state(tree.path(new_state, V)))
+                    if tree.conflicts(new_state):
+                        if verbose:
+                            assigned = tree.assigned
+                            conflicts = [
+                                j
+                                for j in states
+                                if assigned.get(tree.vertex[j], tree.value[j])
+                                != tree.value[j]
+                            ]
+                            p_a = [
+                                (V[tree.vertex[j]], tree.value[j]) for j in conflicts
+                            ]
+                            p_b = [
+                                (V[tree.vertex[j]], assigned[tree.vertex[j]])
+                                for j in conflicts
+                            ]
+                            print(
+                                "   ! conflict: {} != {}".format(
+                                    _str_path_nodes(p_a), _str_path_nodes(p_b)
+                                )
                             )
-                        )
                         stats["conflicts"] += 1
+                        tree.release(new_state)
                         continue
                     reached |= {nt}
-                    paths.append(new_state)
+                    if bound is not None:
+                        bound.reach(nt)
+                    paths.append(tree.path(new_state, V))
+                    tree.assign(new_state)
                     # Add edges
-                    selected_edges |= set(
-                        edge_idx
-                        for (_, _, edge_idx) in nv.values()
-                        if edge_idx is not None
-                    )
+                    selected_edges |= {
+                        tree.edge[j] for j in states if tree.edge[j] is not None
+                    }
                     if max_edges is not None and len(selected_edges) >= max_edges:
                         if verbose:
                             print("Max edges reached.")
@@ -442,7 +758,7 @@ def bfs_search(
                 exit = True
                 break
             # No loop, add new state
-            Q.append(new_state)
+            push(new_state)
             if len(Q) > maxq:
                 maxq = len(Q)
             if (
@@ -451,6 +767,7 @@ def bfs_search(
                 and len(Q) > queue_max_size
             ):
                 break
+        tree.release(current)
         stats["iters"] += 1
     if verbose:
         print(f"Finished ({time.time() - start:.2f} s)")
@@ -459,3 +776,118 @@ def bfs_search(
         print(f" > Detected loops: {stats['loops']}")
         print(f" > Conflicts: {stats['conflicts']}")
     return selected_edges, paths, stats
+
+
+def _measurement_errors(paths: List, measurements: Dict) -> Dict[Any, float]:
+    # Error of each measurement, comparing its value with the value of the
+    # path that reaches it (0 if no path reaches the measurement)
+    predicted_values = {p[0]: p[1][p[0]][1] for p in paths}
+    return {k: abs(v - predicted_values.get(k, 0)) for k, v in measurements.items()}
+
+
+# Graph of the worker processes of `multistart_bfs_search`
+_SEARCH_GRAPH = None
+
+
+def _init_search(G: BaseGraph) -> None:
+    global _SEARCH_GRAPH
+    _SEARCH_GRAPH = G
+
+
+def _search(args: Tuple) -> Tuple[float, Set[int], List, Dict]:
+    initial_dict, final_dict, deadline, options = args
+    max_time = None
+    if deadline is not None:
+        max_time = max(0.0, deadline - time.time())
+    edges, paths, stats = bfs_search(
+        _SEARCH_GRAPH, initial_dict, final_dict, max_time=max_time, **options
+    )
+    stats["seed"] = options["seed"]
+    error = sum(_measurement_errors(paths, final_dict).values())
+    return error, edges, paths, stats
+
+
+def multistart_bfs_search(
+    G: BaseGraph,
+    initial_dict: Dict,
+    final_dict: Dict,
+    n_starts: int = 8,
+    top_k: int = 1,
+    beam_width: Optional[int] = None,
+    max_time: Optional[float] = None,
+    max_iters: Optional[int] = None,
+    max_edges: Optional[int] = None,
+    subset_edges: Optional[Set[int]] = None,
+    processes: Optional[int] = 1,
+    seed: Optional[int] = None,
+) -> List[Tuple[float, Set[int], List, Dict]]:
+    """Run several randomized `bfs_search` and keep the best networks.
+
+    The first search uses the order of the graph, and the rest randomize
+    the order of the inputs and of the edges of each vertex, so different
+    conflict-free sets of paths are found. The networks are ranked by the
+    total error of the measurements (as in `heuristic_carnival`), and then
+    by their number of edges.
+
+    Args:
+        G (BaseGraph): Signed graph (edges with an `interaction` attribute).
+        initial_dict (Dict): Sign of each input vertex.
+        final_dict (Dict): Sign of each measurement vertex.
+        n_starts (int): Number of searches. Defaults to 8.
+        top_k (int): Number of networks to return. Defaults to 1.
+        beam_width (Optional[int]): Use a beam search of this width in each
+            start (see `bfs_search`).
+        max_time (Optional[float]): Time budget in seconds for all the
+            searches. The searches that are running when the budget is
+            exhausted return the paths found so far, and the remaining
+            searches are not started.
+        max_iters (Optional[int]): Budget of expanded states per search.
+        max_edges (Optional[int]): Maximum number of edges of each network.
+        subset_edges (Optional[Set[int]]): Edges that can be used (all if
+            not provided).
+        processes (Optional[int]): Number of worker processes. If 1, the
+            searches run in this process. If None, the number of CPUs.
+        seed (Optional[int]): Seed of the randomized searches.
+
+    Returns:
+        List[Tuple[float, Set[int], List, Dict]]: Up to `top_k` networks,
+        best first, as `(error, edges, paths, stats)` tuples (the output of
+        `bfs_search` with the total error).
+    """
+    if n_starts < 1:
+        raise ValueError("The number of starts has to be at least 1")
+    seeds = np.random.SeedSequence(seed).generate_state(n_starts - 1).tolist()
+    deadline = None if max_time is None else time.time() + max_time
+    options = dict(
+        subset_edges=subset_edges,
+        max_edges=max_edges,
+        max_iters=max_iters,
+        beam_width=beam_width,
+        verbose=False,
+    )
+    tasks = [
+        (initial_dict, final_dict, deadline, dict(options, seed=s))
+        for s in [None, *seeds]
+    ]
+    results = []
+    if processes == 1:
+        _init_search(G)
+        try:
+            for task in tasks:
+                if results and deadline is not None and time.time() >= deadline:
+                    break
+                results.append(_search(task))
+        finally:
+            _init_search(None)
+    else:
+        shared = G if isinstance(G, ReadOnlyGraph) else G.share()
+        try:
+            with multiprocessing.Pool(
+                processes, initializer=_init_search, initargs=(shared,)
+            ) as pool:
+                results = pool.map(_search, tasks)
+        finally:
+            if shared is not G:
+                shared.unlink()
+    results.sort(key=lambda r: (r[0], len(r[1])))
+    return results[:top_k]
@@ -52,14 +52,9 @@ class FBAProblem(ProblemDef):
 
 
 def fba_problem(G, create_reaction_indicators=False, num_fluxes=1, eps=1e-4, backend=K):
-    lb, ub = [], []
-    for i in range(G.ne):
-        attr = G.get_attr_edge(i)
-        lb.append(attr.default_lb)
-        ub.append(attr.default_ub)
-    P = backend.Flow(
-        G, lb=np.array(lb), ub=np.array(ub), values=True, n_flows=num_fluxes
-    )
+    lb = G.get_edge_attr_array("default_lb")
+    ub = G.get_edge_attr_array("default_ub")
+    P = backend.Flow(G, lb=lb, ub=ub, values=True, n_flows=num_fluxes)
     if create_reaction_indicators:
         P += NonZeroIndicator(tolerance=eps)
     return P
@@ -73,7 +68,10 @@ def multicondition_imat(
     use_unblocked_flux_indicators=False,
     scale=False,
     backend=K,
+    parametric=False,
 ):
+    # If parametric, the weights are parameters that can be changed
+    # with P.update(w=...) without building the problem again
     # Use or of blocked reactions (indicator=0)
     if len(w.shape) == 1:
         n_conditions = 1
@@ -89,9 +87,16 @@ def multicondition_imat(
             )
         # Scale the weights of each condition dividing by the total weight per condition
         # Scale in %, avoid very small error numbers (solver tolerances)
-        w = (w / np.abs(w).sum(axis=0)) * 100  # error is in %
         loss_w = 1 - alpha
 
+    def scaled(w):
+        if scale:
+            return (w / np.abs(w).sum(axis=0)) * 100  # error is in %
+        return w
+
+    w_shape = w.shape
+    w = scaled(w)
+
     # Loss is 100 * n_conditions
     # Scale reg. term, so is scale=True, alpha=0.01 means
     # that in the total loss, the size of the network only
@@ -99,7 +104,11 @@ def multicondition_imat(
     # has a penalty of 100 (%).
 
     P = fba_problem(
-        model, create_reaction_indicators=True, num_fluxes=n_conditions, eps=eps
+        model,
+        create_reaction_indicators=True,
+        num_fluxes=n_conditions,
+        eps=eps,
+        backend=backend,
     )
     active = P.symbols["_flow_ineg"] + P.symbols["_flow_ipos"]
     if use_unblocked_flux_indicators and np.abs(alpha) > 0:
@@ -108,6 +117,7 @@ def multicondition_imat(
         P += active <= unblocked
     else:
         unblocked = active
+    w_params = []
     for i in range(n_conditions):
         if n_conditions > 1:
             active_condition = active[:, i]
@@ -115,22 +125,47 @@ def multicondition_imat(
         else:
             active_condition = active
             weights = w
-        idx_pos = np.where(weights > 0)[0]
-        idx_neg = np.where(weights < 0)[0]
-        # print(len(idx_pos), len(idx_neg))
-        if len(idx_pos) > 0:
-            # errors of not selecting positive reactions
-            obj_pos = weights[idx_pos] @ (1 - active_condition[idx_pos])
-        else:
-            obj_pos = 0
-        if len(idx_neg) > 0:
-            # errors of not selecting negative reactions
-            obj_neg = np.abs(weights[idx_neg]) @ active_condition[idx_neg]
+        if parametric:
+            # Use all the reactions, with 0 weights for the non selected ones
+            w_pos = backend.Parameter(
+                f"_w_pos_{i}", weights.shape, weights.clip(0, np.inf)
+            )
+            w_neg = backend.Parameter(
+                f"_w_neg_{i}", weights.shape, np.abs(weights.clip(-np.inf, 0))
+            )
+            w_params.append((w_pos, w_neg))
+            loss = w_pos @ (1 - active_condition) + w_neg @ active_condition
         else:
-            obj_neg = 0
-        loss = obj_pos + obj_neg  # minimize loss
+            idx_pos = np.where(weights > 0)[0]
+            idx_neg = np.where(weights < 0)[0]
+            # print(len(idx_pos), len(idx_neg))
+            if len(idx_pos) > 0:
+                # errors of not selecting positive reactions
+                obj_pos = weights[idx_pos] @ (1 - active_condition[idx_pos])
+            else:
+                obj_pos = 0
+            if len(idx_neg) > 0:
+                # errors of not selecting negative reactions
+                obj_neg = np.abs(weights[idx_neg]) @ active_condition[idx_neg]
+            else:
+                obj_neg = 0
+            loss = obj_pos + obj_neg  # minimize loss
         P.add_objectives(loss, weights=loss_w)
 
+    if parametric:
+
+        def set_weights(values):
+            values = np.asarray(values, dtype=float)
+            if values.shape != w_shape:
+                raise ValueError(f"Expected weights of shape {w_shape}")
+            values = scaled(values)
+            for i, (w_pos, w_neg) in enumerate(w_params):
+                weights = values[:, i] if n_conditions > 1 else values
+                w_pos.value = weights.clip(0, np.inf)
+                w_neg.value = np.abs(weights.clip(-np.inf, 0))
+
+        P.register_parameter("w", set_weights)
+
     if n_conditions > 1:
         total = sum(unblocked.T)
         # total = sum(active.T)
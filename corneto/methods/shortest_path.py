@@ -25,20 +25,18 @@ def shortest_path(
     else:
         Gc = G
         e_start, (tail, head) = list(Gc.in_edges(s))[0]
-        if tail != ():
+        if len(tail) > 0:
             raise ValueError(
                 f"Node {s} is not a source node. It has an incoming edge from {tail}."
             )
 
         e_end, (tail, head) = list(Gc.out_edges(t))[0]
-        if head != ():
+        if len(head) > 0:
             raise ValueError(
                 f"Node {t} is not a sink node. It has an outgoing edge to {head}."
             )
     if edge_weights is None:
-        edge_weights = np.array(
-            [Gc.get_attr_edge(i).get("weight", 0) for i in range(Gc.ne)]
-        )
+        edge_weights = Gc.get_edge_attr_array("weight", default=0)
     if integral_path:
         P = backend.Flow(Gc, lb=0, ub=DEFAULT_UB)
         P += Indicator()
@@ -89,7 +87,10 @@ def solve_shortest_path(
         P, Gc = shortest_path(
             Gc, s, t, create_flow_graph=False, integral_path=True, backend=backend
         )
-        P.solve(solver=solver, warm_start=True, **solver_kwargs)
+        # Use the solution of the LP relaxation as the initial solution
+        selected = sol > integer_tolerance
+        P.set_start({"_flow": np.where(selected, sol, 0), "_flow_i": selected})
+        P.solve(solver=solver, **solver_kwargs)
         I = P.symbols["_flow_i"]
         solution = np.where(I.value > 0.5)[0]
     return solution, P, Gc
@@ -63,7 +63,7 @@ def cno_style(
 
 def get_interactions(G):
     """Get the sign of interactions from the graph G. I in [1, -1]"""
-    return np.array(G.get_attr_from_edges("interaction", 1))
+    return G.get_edge_attr_array("interaction", default=1)
 
 
 def get_AND_gate_nodes(G):
@@ -177,20 +177,21 @@ def expand_graph_for_flows(G, exp_list):
 
 def check_exp_graph_consistency(G, exp_list):
     """Check if the experiments are consistent with the graph G."""
+    vertices = set(G.V)
     for exp in exp_list:
         for node in exp_list[exp]["input"]:
-            if node not in G.V:
+            if node not in vertices:
                 raise ValueError(
                     f"Node {node} in experiment {exp} is not in the graph."
                 )
         for node in exp_list[exp]["output"]:
-            if node not in G.V:
+            if node not in vertices:
                 raise ValueError(
                     f"Node {node} in experiment {exp} is not in the graph."
                 )
         if "inhibition" in exp_list[exp]:
             for node in exp_list[exp]["inhibition"]:
-                if node not in G.V:
+                if node not in vertices:
                     raise ValueError(
                         f"Node {node} in experiment {exp} is not in the graph."
                     )
@@ -307,14 +308,14 @@ def cellnoptILP(G, exp_list, solver=None, alpha_flow=1e-3, verbose=False):
         # activation:
         p_nodes = list(exp_list[exp]["input"].keys())
         p_values = list(exp_list[exp]["input"].values())
-        p_nodes_positions = [G.V.index(key) for key in p_nodes]
+        p_nodes_positions = G.vertex_indices(p_nodes)
 
         P += V[p_nodes_positions, iexp] == p_values
 
         # measurements:
         m_nodes = list(exp_list[exp]["output"].keys())
         m_values = np.array(list(exp_list[exp]["output"].values()))
-        m_nodes_positions = [G.V.index(key) for key in m_nodes]
+        m_nodes_positions = G.vertex_indices(m_nodes)
 
         # linearization of the ABS function: https://lpsolve.sourceforge.net/5.1/absolute.htm
         P += V[m_nodes_positions, iexp] - m_values <= Z[m_nodes_positions, iexp]
@@ -388,7 +389,7 @@ def plot_fitness(G, exp_list, P, measured_only=False):
         if measured_only:
             for imarker in range(len(output_names)):
                 # output_names[imarker] is the name of the output node, find the position in the graph
-                imarker_inG = G.V.index(output_names[imarker])
+                imarker_inG = G.vertex_index(output_names[imarker])
 
                 axs[iexp - 1, imarker].plot(
                     [0, 10],
@@ -396,23 +397,23 @@ def plot_fitness(G, exp_list, P, measured_only=False):
                         P.expr.vertex_value.value[imarker_inG, 0],
                         min(P.expr.vertex_value.value[imarker_inG, iexp], 1),
                     ],
-                    label=G.V[imarker_inG],
+                    label=G.get_vertex(imarker_inG),
                     color="blue",
                     linestyle="-",
                 )
 
-                if G.V[imarker_inG] in exp_list[exp]["output"].keys():
+                if G.get_vertex(imarker_inG) in exp_list[exp]["output"].keys():
                     axs[iexp - 1, imarker].plot(
                         [0, 10],
                         [
-                            exp_list["exp0"]["output"][G.V[imarker_inG]],
-                            exp_list[exp]["output"][G.V[imarker_inG]],
+                            exp_list["exp0"]["output"][G.get_vertex(imarker_inG)],
+                            exp_list[exp]["output"][G.get_vertex(imarker_inG)],
                         ],
                         "ro-",
                     )
                 axs[iexp - 1, imarker].set_ylim([-0.01, 1.1])
                 if iexp == 1:
-                    axs[iexp - 1, imarker].set_title(G.V[imarker_inG])
+                    axs[iexp - 1, imarker].set_title(G.get_vertex(imarker_inG))
                 if imarker == 0:
                     axs[iexp - 1, imarker].set_ylabel(f"Experiment {iexp}")
         else:
@@ -423,23 +424,23 @@ def plot_fitness(G, exp_list, P, measured_only=False):
                         P.expr.vertex_value.value[imarker, 0],
                         min(P.expr.vertex_value.value[imarker, iexp], 1),
                     ],
-                    label=G.V[imarker],
+                    label=G.get_vertex(imarker),
                     color="blue",
                     linestyle="-",
                 )
 
-                if G.V[imarker] in exp_list[exp]["output"].keys():
+                if G.get_vertex(imarker) in exp_list[exp]["output"].keys():
                     axs[iexp - 1, imarker].plot(
                         [0, 10],
                         [
-                            exp_list["exp0"]["output"][G.V[imarker]],
-                            exp_list[exp]["output"][G.V[imarker]],
+                            exp_list["exp0"]["output"][G.get_vertex(imarker)],
+                            exp_list[exp]["output"][G.get_vertex(imarker)],
                         ],
                         "ro-",
                     )
                 axs[iexp - 1, imarker].set_ylim([-0.01, 1.1])
                 if iexp == 1:
-                    axs[iexp - 1, imarker].set_title(G.V[imarker])
+                    axs[iexp - 1, imarker].set_title(G.get_vertex(imarker))
                 if imarker == 0:
                     axs[iexp - 1, imarker].set_ylabel(f"Experiment {iexp}")
 
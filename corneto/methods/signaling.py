@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -9,7 +9,8 @@ from corneto._constants import *
 from corneto._graph import BaseGraph
 from corneto._settings import sparsify
 from corneto.backend import Backend
-from corneto.backend._base import Indicators, ProblemDef
+from corneto.backend._acyclic import acyclic_constraints, scc_layer_positions
+from corneto.backend._base import CExpression, CSymbol, Indicators, ProblemDef
 
 
 def create_flow_graph(
@@ -72,10 +73,47 @@ def signflow_constraints(
     dag: bool = True,
     use_flow_indicators: bool = True,
     eps: float = 1e-3,
+    acyclicity: str = "layers",
+    contract: bool = False,
 ) -> ProblemDef:
-    edges = g.E
+    """Create the sign consistency constraints of a graph with conditions.
+
+    Args:
+        g (BaseGraph): Graph created with `create_flow_graph`.
+        backend (Backend): Backend used to create the problem.
+        signal_implies_flow (bool): Edges with signal must carry flow.
+        flow_implies_signal (bool): Edges with flow must carry signal (only
+            for a single condition).
+        dag (bool): Force the edges with signal to be acyclic.
+        use_flow_indicators (bool): Create indicators of the edges with flow.
+        eps (float): Minimum flow of an active edge.
+        acyclicity (str): Encoding of the acyclicity constraints if `dag` is
+            True: `layers` (layer position per vertex, bounded below by the
+            BFS distance from `_s`, with the big-M of each edge derived from
+            the bounds), `scc` (layer constraints only inside strongly
+            connected components) or `lazy` (cycle elimination cuts added
+            after each solve). See `Backend.AcyclicFlow`.
+        contract (bool): Build the signal variables and constraints of each
+            condition only on its subgraph (the vertices reachable from its
+            perturbations that reach its measurements, and the edges between
+            them), instead of on the full graph. The flow is still shared.
+            Defaults to False.
+
+    Returns:
+        ProblemDef: The problem with the constraints. The variables of all the
+        conditions are shared matrices with one column per condition, in the
+        order of the `_pert_` vertices (`species_activated`,
+        `species_inhibited`, `reaction_sends_activation`,
+        `reaction_sends_inhibition` and `dag_layer_position`). The columns of
+        each condition are registered as expressions (`species_activated_{c}`,
+        ..., `vertex_values_{c}` and `edge_values_{c}`), which can also be
+        looked up with `get_symbol` and `symbols[...]`. With `contract`, the
+        variables are vectors with one value per (vertex, condition) or
+        (edge, condition) pair of the subgraphs, and the registered
+        expressions map them back to all the vertices and edges of `g`.
+    """
     vertices = g.vertices
-    A = g.vertex_incidence_matrix()
+    A = g.vertex_incidence_matrix(sparse=True)
     if "_s" not in vertices:
         raise ValueError(
             "The provided network does not have the `_s` and `_t` dummy nodes."
@@ -97,18 +135,11 @@ def signflow_constraints(
         p = backend.Flow(g, ub=10)
         p._graph = g
         F, Fi = p.get_symbol(VAR_FLOW), None
-        idx = -1
         # TODO: find outflow edges
         for i in range(g.num_edges):
             s, t = g.get_edge(i)
             if len(t) == 0 and len(s) > 0:
                 p += F[i] >= 1.01 * eps
-        """
-        for i, props in enumerate(g.get_attr_edges()):
-            if props.get("id", None) == "_outflow":
-                idx = i
-                break
-        p += F[idx] >= 1.01 * eps"""
         if use_flow_indicators:
             p += Indicators()
             Fi = p.get_symbol(VAR_FLOW + "_ipos")
@@ -116,158 +147,342 @@ def signflow_constraints(
         F, Fi = None, None
         p = backend.Problem()
         p._graph = g
-    dist = dict()
-    if dag:
-        dist = g.bfs("_s")
-        node_maxdist = g.num_vertices - 1
-        dist_lbound = np.array([dist.get(v, 0) for v in g.vertices])
-        dist_ubound = node_maxdist
-
-    vidx = {v: i for i, v in enumerate(vertices)}
-    eidx = {e: i for i, e in enumerate(edges)}
-
-    for c in conditions:
-        # reachable = list(g.vertices)
-        non_reachable = []
-        # If there is more than one condition, just check which nodes are reachable
-        # from this condition (forward pass from perturbation to measurements and
-        # backward pass from measurements to perturbations). Nodes and reactions
-        # that cannot be reached should have a value of 0.
-        fwd: Set[Any] = set(g.bfs([f"_pert_{c}"]).keys())
-        bck: Set[Any] = set(g.bfs([f"_meas_{c}"], reverse=True).keys())
-        reachable = list(fwd.intersection(bck) | {"_s", "_t"})
-        non_reachable = list(set(g.vertices) - set(reachable))
-        non_reachable = [vidx[v] for v in non_reachable]
-        reachable = [vidx[v] for v in reachable]
-
-        N_act = backend.Variable(
-            f"species_activated_{c}", (g.num_vertices,), vartype=VarType.BINARY
-        )
-        N_inh = backend.Variable(
-            f"species_inhibited_{c}", (g.num_vertices,), vartype=VarType.BINARY
-        )
-        R_act = backend.Variable(
-            f"reaction_sends_activation_{c}",
-            (g.num_edges,),
-            vartype=VarType.BINARY,
+    edge_src, edge_tgt = _edge_endpoints(A)
+    reach, edge_reach = _reachable_pairs(g, conditions, edge_src, edge_tgt)
+    # Encoding of the problem, used by `signflow_start`
+    p._signflow = dict(
+        conditions=conditions,
+        edge_src=edge_src,
+        edge_tgt=edge_tgt,
+        reach=reach,
+        edge_reach=edge_reach,
+        dag=dag,
+        acyclicity=acyclicity,
+        contract=contract,
+    )
+    build = _contracted_signal_constraints if contract else _signal_constraints
+    R, flow_of = build(
+        p,
+        g,
+        backend,
+        conditions,
+        reach,
+        edge_reach,
+        edge_src,
+        edge_tgt,
+        dag,
+        acyclicity,
+    )
+
+    # Link flow with signal. The flow is shared by all the conditions
+    if signal_implies_flow and flow_implies_signal:
+        # Bi-directional implication
+        if Fi is None:
+            raise NotImplementedError(
+                "flow <=> signal implication supported only with flow indicators"
+            )
+        else:
+            p += R == flow_of(Fi)
+    elif signal_implies_flow:
+        # If signal then flow (if no flow then no signal)
+        # but a reaction with non-zero flow may not carry any signal
+        if Fi is None:
+            # If reaction has signal (r_act+r_inh == 1) then the flow on
+            # that reaction has to be >= eps value (active)
+            # If reaction has no signal (r_act+r_inh == 0) then the flow
+            # can have any value
+            p += flow_of(F) >= eps * R
+        else:
+            p += R <= flow_of(Fi)
+    elif flow_implies_signal:
+        if Fi is None:
+            # If reaction has a non-zero flow (f >= eps)
+            # then the reaction has to transmit signal.
+            # If reaction has no flow, the signal can have
+            # any value. Note that this option by itself
+            # does not make sense for carnival, use only
+            # for experimentation.
+            p += eps * R <= flow_of(F)
+        else:
+            p += flow_of(Fi) <= R
+    return p
+
+
+def _edge_endpoints(A: Any) -> Tuple[np.ndarray, np.ndarray]:
+    # Source and target vertex of each edge, -1 if none (CARNIVAL edges have
+    # at most one source and one target)
+    src = sparsify(A < 0).tocoo()
+    tgt = sparsify(A > 0).tocoo()
+    edge_src = np.full(A.shape[1], -1)
+    edge_tgt = np.full(A.shape[1], -1)
+    edge_src[src.col] = src.row
+    edge_tgt[tgt.col] = tgt.row
+    return edge_src, edge_tgt
+
+
+def _reachable_pairs(
+    g: BaseGraph, conditions: List[str], edge_src: np.ndarray, edge_tgt: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Vertices (V x C) reachable from the perturbations of each condition
+    # (forward pass) that reach its measurements (backward pass), and edges
+    # (E x C) whose vertices are all reachable. The dummy `_s` and `_t`
+    # vertices are shared by all the conditions.
+    vidx = {v: i for i, v in enumerate(g.vertices)}
+    reach = g.get_index().reachable_between(
+        [[vidx[f"_pert_{c}"]] for c in conditions],
+        [[vidx[f"_meas_{c}"]] for c in conditions],
+    )
+    reach[[vidx["_s"], vidx["_t"]], :] = True
+    edge_reach = np.ones((g.num_edges, len(conditions)), dtype=bool)
+    for ends in (edge_src, edge_tgt):
+        has = ends >= 0
+        edge_reach[has] &= reach[ends[has]]
+    return reach, edge_reach
+
+
+def _signal_constraints(
+    p: ProblemDef,
+    g: BaseGraph,
+    backend: Backend,
+    conditions: List[str],
+    reach: np.ndarray,
+    edge_reach: np.ndarray,
+    edge_src: np.ndarray,
+    edge_tgt: np.ndarray,
+    dag: bool,
+    acyclicity: str,
+) -> Tuple[CExpression, Callable]:
+    # Signal variables of all the vertices and edges, with one column per
+    # condition. Returns the edges with signal and the function that maps
+    # an expression of the flow of the edges to the shape of the signal.
+    n_conditions = len(conditions)
+    vidx = {v: i for i, v in enumerate(g.vertices)}
+    shape_v = (g.num_vertices, n_conditions)
+    shape_e = (g.num_edges, n_conditions)
+    N_act = backend.Variable("species_activated", shape_v, vartype=VarType.BINARY)
+    N_inh = backend.Variable("species_inhibited", shape_v, vartype=VarType.BINARY)
+    R_act = backend.Variable(
+        "reaction_sends_activation", shape_e, vartype=VarType.BINARY
+    )
+    R_inh = backend.Variable(
+        "reaction_sends_inhibition", shape_e, vartype=VarType.BINARY
+    )
+    for k, c in enumerate(conditions):
+        p.register(f"species_activated_{c}", N_act[:, k])
+        p.register(f"species_inhibited_{c}", N_inh[:, k])
+        p.register(f"reaction_sends_activation_{c}", R_act[:, k])
+        p.register(f"reaction_sends_inhibition_{c}", R_inh[:, k])
+        p.register(f"edge_values_{c}", R_act[:, k] - R_inh[:, k])
+        p.register(f"vertex_values_{c}", N_act[:, k] - N_inh[:, k])
+
+    # Vertices that cannot be reached should have a value of 0.
+    non_reachable = ~reach
+    if non_reachable.any():
+        # TODO: Do the same for non reachable reactions
+        p += (N_act + N_inh).multiply(non_reachable.astype(float)).sum() == 0
+
+    # If the measurements are selected, their edges from the measurement to
+    # the dummy _meas_ node of the condition have to be selected. Not required,
+    # but forces to have a connected graph.
+    meas = np.array([vidx[f"_meas_{c}"] for c in conditions])
+    cond_of_vertex = np.full(g.num_vertices, -1)
+    cond_of_vertex[meas] = np.arange(n_conditions)
+    meas_rxns = np.flatnonzero((edge_tgt >= 0) & (cond_of_vertex[edge_tgt] >= 0))
+    if len(meas_rxns) > 0:
+        # One-hot selection of the column of the condition of each edge
+        H = np.zeros((len(meas_rxns), n_conditions))
+        H[np.arange(len(meas_rxns)), cond_of_vertex[edge_tgt[meas_rxns]]] = 1
+        meas_species = edge_src[meas_rxns]
+        R = R_act[meas_rxns, :] + R_inh[meas_rxns, :]
+        N = N_act[meas_species, :] + N_inh[meas_species, :]
+        p += R.multiply(H).sum(axis=1) == N.multiply(H).sum(axis=1)
+
+    # Dummy source _s connects to perturbations with activatory edges if the
+    # perturbation is up and inhibitory edges if the perturbation is down. _s
+    # could be also down and propagate the inverse signal instead. As a
+    # convention, it is forced to be always activated to avoid these options.
+    p += N_act[vidx["_s"], :] == 1
+    # Dont define activation/inhibition for reactions with no reactants or no products
+    # TODO: Filter out reactions that has reactant or product in the non reachable set
+    rids = np.flatnonzero((edge_src >= 0) & (edge_tgt >= 0))
+    ix_react = edge_src[rids]
+    ix_prod = edge_tgt[rids]
+    signs = g.get_edge_attr_array("interaction", default=0)[rids]
+    signs = np.tile(np.reshape(signs, (-1, 1)), (1, n_conditions))
+    p += R_act + R_inh <= 1
+    p += N_act + N_inh <= 1
+    if len(rids) > 0:
+        Ra = R_act[rids, :]
+        Ri = R_inh[rids, :]
+        D_ai = N_act[ix_react, :] - N_inh[ix_react, :]
+        D_ia = N_inh[ix_react, :] - N_act[ix_react, :]
+        S_ai = (N_act[ix_react, :] + N_inh[ix_react, :]).multiply(signs)
+        p += Ra <= (D_ai + S_ai).multiply(signs)
+        p += Ri <= (D_ia + S_ai).multiply(signs)
+        if dag:
+            dist = g.get_index().bfs([vidx["_s"]])
+            constraints, cuts = acyclic_constraints(
+                backend,
+                g.num_vertices,
+                [(ix_react, ix_prod, Ra + Ri)],
+                mode=acyclicity,
+                lb=np.clip(dist, 0, None),
+                ub=np.full(g.num_vertices, g.num_vertices - 1),
+                name="dag_layer_position",
+                columns=n_conditions,
+            )
+            p.add_constraints(constraints)
+            if cuts is not None:
+                p.add_lazy_constraints(cuts)
+
+    # Constrain the product species of the reactions. They can be only up or
+    # down if at least one of the reactions that have the node as product
+    # carry some signal. Clip neg. values since we only look at the positive
+    # ones in the incidence matrix (the targets of each edge)
+    has_tgt = np.flatnonzero(edge_tgt >= 0)
+    incidence_matrix = backend._sparse(
+        (np.ones(len(has_tgt)), (edge_tgt[has_tgt], has_tgt)),
+        shape=(g.num_vertices, g.num_edges),
+    )
+    p += N_act <= incidence_matrix @ R_act
+    p += N_inh <= incidence_matrix @ R_inh
+
+    ones = np.ones((1, n_conditions))
+    return R_act + R_inh, lambda X: X.reshape((g.num_edges, 1)) @ ones
+
+
+def _contracted_signal_constraints(
+    p: ProblemDef,
+    g: BaseGraph,
+    backend: Backend,
+    conditions: List[str],
+    reach: np.ndarray,
+    edge_reach: np.ndarray,
+    edge_src: np.ndarray,
+    edge_tgt: np.ndarray,
+    dag: bool,
+    acyclicity: str,
+) -> Tuple[CExpression, Callable]:
+    # Same constraints as `_signal_constraints`, with variables only for the
+    # (vertex, condition) and (edge, condition) pairs of the subgraph of each
+    # condition (`reach` and `edge_reach`). The pairs are numbered in row
+    # major order of the (V x C) and (E x C) masks.
+    n_conditions = len(conditions)
+    vidx = {v: i for i, v in enumerate(g.vertices)}
+    pv, vk = np.nonzero(reach)
+    pe, ek = np.nonzero(edge_reach)
+    vpos = np.full(reach.shape, -1)
+    vpos[pv, vk] = np.arange(len(pv))
+    N_act = backend.Variable("species_activated", (len(pv),), vartype=VarType.BINARY)
+    N_inh = backend.Variable("species_inhibited", (len(pv),), vartype=VarType.BINARY)
+    R_act = backend.Variable(
+        "reaction_sends_activation", (len(pe),), vartype=VarType.BINARY
+    )
+    R_inh = backend.Variable(
+        "reaction_sends_inhibition", (len(pe),), vartype=VarType.BINARY
+    )
+    # Map the pairs of each condition back to the vertices and edges of the
+    # graph (the values of the removed vertices and edges are 0)
+    for k, c in enumerate(conditions):
+        iv, ie = np.flatnonzero(vk == k), np.flatnonzero(ek == k)
+        Ev = backend._sparse(
+            (np.ones(len(iv)), (pv[iv], iv)), shape=(g.num_vertices, len(pv))
         )
-        R_inh = backend.Variable(
-            f"reaction_sends_inhibition_{c}",
-            (g.num_edges,),
-            vartype=VarType.BINARY,
+        Ee = backend._sparse(
+            (np.ones(len(ie)), (pe[ie], ie)), shape=(g.num_edges, len(pe))
         )
+        p.register(f"species_activated_{c}", Ev @ N_act)
+        p.register(f"species_inhibited_{c}", Ev @ N_inh)
+        p.register(f"reaction_sends_activation_{c}", Ee @ R_act)
+        p.register(f"reaction_sends_inhibition_{c}", Ee @ R_inh)
+        p.register(f"edge_values_{c}", Ee @ (R_act - R_inh))
+        p.register(f"vertex_values_{c}", Ev @ (N_act - N_inh))
 
-        p.register(f"edge_values_{c}", R_act - R_inh)
-        p.register(f"vertex_values_{c}", N_act - N_inh)
-
-        if len(non_reachable) > 0:
-            # TODO: Do the same for non reachable reactions
-            p += N_act[non_reachable] == 0
-            p += N_inh[non_reachable] == 0
-
-        # Also, if the measurements are selected, their edges from
-        # measurement to the dummy _meas_ node have to be selected.
-        # Not required, but forces to have a connected graph.
-        # meas_rxns = list(rn.get_reactions_with_product(rn.get_species_id(f"_meas_{c}")))
-
-        # meas_rxns = [eidx[e] for e in g.get_edges_with_target_vertex(f"_meas_{c}")]
-        meas_rxns = [i for i, _ in g.in_edges(f"_meas_{c}")]
-        # meas_species = [rn.get_reactants_of_reaction(r).pop() for r in meas_rxns]
-        meas_species = [
-            vidx[list(g.get_edge(i)[0])[0]] for i in meas_rxns
-        ]  # assumes a single vertex
-        p += (
-            R_act[meas_rxns] + R_inh[meas_rxns]
-            == N_act[meas_species] + N_inh[meas_species]
-        )
+    # Edges from the measurements to the dummy _meas_ node of their condition
+    cond_of_vertex = np.full(g.num_vertices, -1)
+    cond_of_vertex[[vidx[f"_meas_{c}"] for c in conditions]] = np.arange(n_conditions)
+    tgt_cond = np.where(edge_tgt >= 0, cond_of_vertex[edge_tgt], -1)
+    m = np.flatnonzero(tgt_cond[pe] == ek)
+    if len(m) > 0:
+        sp = vpos[edge_src[pe[m]], ek[m]]
+        p += R_act[m] + R_inh[m] == N_act[sp] + N_inh[sp]
 
-        # Just for convenience, force the dummy measurement node to be active. Not required
-        # p += N_act[vidx[f"_meas_{c}"]] == 1
-        # Same for source and target nodes. Assume they are active as a convention. Note that
-        # dummy source _s connects to perturbations with activatory edges if perturbation is up
-        # and inhibitory edges if perturbation is down. Dummy _s could be also down and propagate
-        # the inverse signal instead. Same for dummy target _t. As a convention, they are forced
-        # to be always activated instead to avoid these alternative options.
-        p += N_act[vidx["_s"]] == 1
-        p += N_act[vidx["_t"]] >= 0
-        # Dont define activation/inhibition for reactions with no reactants or no products
-        # rids = np.flatnonzero(np.logical_and(rn.has_reactant(), rn.has_product()))
-        # TODO: Simplify this by adding methods to ReNet
-        # TODO: Filter out reactions that has reactant or product in the non reachable set
-        valid = np.zeros(g.num_edges, dtype=bool)
-        valid[reachable] = True
-        has_reactant = np.sum(A < 0, axis=0) > 0
-        has_product = np.sum(A > 0, axis=0) > 0
-        # has_reactant = np.sum(np.logical_and(rn.stoichiometry < 0, valid), axis=0) > 0
-        # has_product = np.sum(np.logical_and(rn.stoichiometry > 0, valid), axis=0) > 0
-        rids = np.flatnonzero(np.logical_and(has_reactant, has_product))
-        # TODO: Throw error if reactions have more than one reactant or product
-        # Get reactants and products: note that reactions should have
-        # only 1 reactant 1 product at most for CARNIVAL
-        ix_react = [vidx[list(edges[i][0])[0]] for i in rids]
-        ix_prod = [vidx[list(edges[i][1])[0]] for i in rids]
-        signs = np.array([p.get("interaction", 0) for p in g.get_attr_edges()])[rids]
-        Ra = R_act[rids]
-        Ri = R_inh[rids]
-        p += R_act + R_inh <= 1
-        p += N_act + N_inh <= 1
-        D_ai = N_act[ix_react] - N_inh[ix_react]
-        D_ia = N_inh[ix_react] - N_act[ix_react]
-        S_ai = (N_act[ix_react] + N_inh[ix_react]).multiply(signs)
+    p += N_act[vpos[vidx["_s"], :]] == 1
+    r = np.flatnonzero((edge_src[pe] >= 0) & (edge_tgt[pe] >= 0))
+    react = vpos[edge_src[pe[r]], ek[r]]
+    prod = vpos[edge_tgt[pe[r]], ek[r]]
+    signs = g.get_edge_attr_array("interaction", default=0)[pe[r]]
+    p += R_act + R_inh <= 1
+    p += N_act + N_inh <= 1
+    if len(r) > 0:
+        Ra = R_act[r]
+        Ri = R_inh[r]
+        D_ai = N_act[react] - N_inh[react]
+        D_ia = N_inh[react] - N_act[react]
+        S_ai = (N_act[react] + N_inh[react]).multiply(signs)
         p += Ra <= (D_ai + S_ai).multiply(signs)
         p += Ri <= (D_ia + S_ai).multiply(signs)
         if dag:
-            L = backend.Variable(
-                f"dag_layer_position_{c}",
-                (g.num_vertices,),
-                vartype=VarType.CONTINUOUS,
-                lb=dist_lbound,
-                ub=dist_ubound,
-            )
-            p += L[ix_prod] - L[ix_react] >= Ra + Ri + (1 - g.num_vertices) * (
-                1 - (Ra + Ri)
+            # The subgraphs of the conditions are disjoint, so the layers of
+            # each one are bounded by its number of vertices
+            dist = g.get_index().bfs([vidx["_s"]])
+            size = np.bincount(vk, minlength=n_conditions)
+            constraints, cuts = acyclic_constraints(
+                backend,
+                len(pv),
+                [(react, prod, Ra + Ri)],
+                mode=acyclicity,
+                lb=np.clip(dist[pv], 0, None),
+                ub=size[vk] - 1.0,
+                name="dag_layer_position",
             )
-            p += L[ix_prod] - L[ix_react] <= g.num_vertices - 1
-
-        # Link flow with signal
-        if signal_implies_flow and flow_implies_signal:
-            # Bi-directional implication
-            if Fi is None:
-                raise NotImplementedError(
-                    "flow <=> signal implication supported only with flow indicators"
-                )
-            else:
-                p += R_act + R_inh == Fi
-        elif signal_implies_flow:
-            # If signal then flow (if no flow then no signal)
-            # but a reaction with non-zero flow may not carry any signal
-            if Fi is None:
-                # If reaction has signal (r_act+r_inh == 1) then the flow on
-                # that reaction has to be >= eps value (active)
-                # If reaction has no signal (r_act+r_inh == 0) then the flow
-                # can have any value
-                p += F >= eps * (R_act + R_inh)
-            else:
-                p += R_act + R_inh <= Fi
-        elif flow_implies_signal:
-            if Fi is None:
-                # If reaction has a non-zero flow (f >= eps)
-                # then the reaction has to transmit signal.
-                # If reaction has no flow, the signal can have
-                # any value. Note that this option by itself
-                # does not make sense for carnival, use only
-                # for experimentation.
-                p += eps * (R_act + R_inh) <= F
-            else:
-                p += Fi <= R_act + R_inh
-        # Constrain the product species of the reactions. They can be only up or
-        # down if at least one of the reactions that have the node as product
-        # carry some signal. Clip neg. values since we only look at the positive
-        # ones in the incidence matrix (the targets of each edge)
-        incidence_matrix = sparsify(A.clip(0, 1))
-        p += N_act <= incidence_matrix @ R_act
-        p += N_inh <= incidence_matrix @ R_inh
-    return p
+            p.add_constraints(constraints)
+            if cuts is not None:
+                p.add_lazy_constraints(cuts)
+
+    t = np.flatnonzero(edge_tgt[pe] >= 0)
+    incidence_matrix = backend._sparse(
+        (np.ones(len(t)), (vpos[edge_tgt[pe[t]], ek[t]], t)),
+        shape=(len(pv), len(pe)),
+    )
+    p += N_act <= incidence_matrix @ R_act
+    p += N_inh <= incidence_matrix @ R_inh
+    return R_act + R_inh, lambda X: X[pe]
+
+
+def _vertex_values(g: BaseGraph, values: Any) -> np.ndarray:
+    # Values of the vertices of the graph, from a dict with values or
+    # (type, value) tuples (missing vertices are 0) or from an array
+    if isinstance(values, dict):
+        values = {k: v[1] if isinstance(v, tuple) else v for k, v in values.items()}
+        return np.array([values.get(v, 0) for v in g.vertices], dtype=float)
+    values = np.asarray(values, dtype=float)
+    if values.shape != (g.num_vertices,):
+        raise ValueError(
+            f"Expected {g.num_vertices} values (one per vertex), got {values.shape}"
+        )
+    return values
+
+
+def _species_values_setter(
+    g: BaseGraph, pos: CSymbol, neg: CSymbol, current: np.ndarray
+):
+    # Dicts update only the given vertices (e.g. only the measurements), the
+    # other vertices keep their current values. Arrays replace all of them.
+    vidx = {v: i for i, v in enumerate(g.vertices)}
+    current = current.copy()
+
+    def setter(values: Any) -> None:
+        if isinstance(values, dict):
+            for k, v in values.items():
+                if k in vidx:
+                    current[vidx[k]] = v[1] if isinstance(v, tuple) else v
+        else:
+            current[:] = _vertex_values(g, values)
+        pos.value = current.clip(0, np.inf).reshape(1, -1)
+        neg.value = np.abs(current.clip(-np.inf, 0)).reshape(1, -1)
+
+    return setter
 
 
 # TODO: Create building block so problem is passed
@@ -280,7 +495,29 @@ def default_sign_loss(
     l1_flow: float = 0.0,
     ub_loss: Optional[Union[float, List[float]]] = None,
     lb_loss: Optional[Union[float, List[float]]] = None,
+    parametric: bool = False,
 ) -> ProblemDef:
+    """Create the loss of the sign consistency problem.
+
+    Args:
+        conditions (Dict): Perturbations and measurements per condition.
+        problem (ProblemDef): Problem created with `signflow_constraints`.
+        l0_edges (float): Penalty for the number of edges with flow.
+        l0_vertices (float): Penalty for the number of active vertices.
+        l1_flow (float): Penalty for the total flow.
+        ub_loss (Optional[Union[float, List[float]]]): Upper bound of the loss
+            (per condition if a list).
+        lb_loss (Optional[Union[float, List[float]]]): Lower bound of the loss
+            (per condition if a list).
+        parametric (bool): If True, the values of the vertices are parameters
+            that can be changed with `update(species_values_<condition>=...)`
+            without building the problem again. A dict changes the values of
+            the given vertices only (e.g. only the measurements), an array
+            with one value per vertex replaces all of them. Defaults to False.
+
+    Returns:
+        ProblemDef: The problem with the loss.
+    """
     losses = []
     p = ProblemDef()
     g = problem._graph
@@ -291,18 +528,30 @@ def default_sign_loss(
         F = problem.get_symbol(VAR_FLOW)
     if VAR_FLOW + "_ipos" in problem.symbols.keys():
         Fi = problem.get_symbol(VAR_FLOW + "_ipos")
+    exprs = problem.expressions
     for i, c in enumerate(conditions.keys()):
-        N_act, N_inh = problem.get_symbols(
-            f"species_activated_{c}", f"species_inhibited_{c}"
-        )
+        N_act = exprs[f"species_activated_{c}"]
+        N_inh = exprs[f"species_inhibited_{c}"]
         # Get the values of the species for the given condition
-        species_values = np.array(
-            [conditions[c][s][1] if s in conditions[c] else 0 for s in g.vertices]
-        )
-        pos = species_values.clip(0, np.inf).reshape(1, -1) @ (1 - (N_act - N_inh))
-        neg = np.abs(species_values.clip(-np.inf, 0)).reshape(1, -1) @ (
-            (N_act - N_inh) + 1
-        )
+        species_values = _vertex_values(g, conditions[c])
+        pos_values = species_values.clip(0, np.inf).reshape(1, -1)
+        neg_values = np.abs(species_values.clip(-np.inf, 0)).reshape(1, -1)
+        if parametric:
+            backend = problem._backend
+            if backend is None:
+                raise ValueError("The problem has no backend to create parameters")
+            pos_values = backend.Parameter(
+                f"_species_values_pos_{c}", pos_values.shape, pos_values
+            )
+            neg_values = backend.Parameter(
+                f"_species_values_neg_{c}", neg_values.shape, neg_values
+            )
+            p.register_parameter(
+                f"species_values_{c}",
+                _species_values_setter(g, pos_values, neg_values, species_values),
+            )
+        pos = pos_values @ (1 - (N_act - N_inh))
+        neg = neg_values @ ((N_act - N_inh) + 1)
         loss = pos + neg
         losses.append(loss)
         if ub_loss is not None:
@@ -358,6 +607,9 @@ def signflow(
     use_flow_indicators: bool = True,
     eps: float = 1e-3,
     backend: Backend = DEFAULT_BACKEND,
+    parametric: bool = False,
+    acyclicity: str = "layers",
+    contract: bool = False,
 ):
     p = signflow_constraints(
         g,
@@ -367,8 +619,10 @@ def signflow(
         dag=dag,
         use_flow_indicators=use_flow_indicators,
         eps=eps,
+        acyclicity=acyclicity,
+        contract=contract,
     )
-    return p + default_sign_loss(
+    P = p + default_sign_loss(
         conditions,
         p,
         l0_edges=l0_penalty_edges,
@@ -376,4 +630,207 @@ def signflow(
         l1_flow=l1_penalty_flow,
         ub_loss=ub_loss,
         lb_loss=lb_loss,
+        parametric=parametric,
     )
+    # Keep the graph and the encoding to create initial solutions
+    P._graph, P._signflow = p._graph, p._signflow
+    return P
+
+
+def signflow_start(
+    problem: ProblemDef,
+    edges: Iterable[int],
+    vertex_values: Dict[Any, int],
+    condition: Optional[str] = None,
+) -> Dict[str, np.ndarray]:
+    """Create an initial solution of a problem from a selection of edges.
+
+    The selection is a sign consistent set of edges from the perturbations to
+    the measurements of a condition, e.g. the edges of the paths found by
+    `bfs_search` on the graph used to create the flow graph. The edges of the
+    dummy vertices are added, the flow is routed from `_s` to `_t` through
+    the selected edges and the values are converted to the variables of the
+    encoding used to build the problem (`dag`, `acyclicity` and `contract`).
+
+    Args:
+        problem (ProblemDef): Problem created with `signflow` or
+            `signflow_constraints`.
+        edges (Iterable[int]): Indexes of the selected edges in the flow
+            graph, without the edges of the dummy vertices.
+        vertex_values (Dict[Any, int]): Sign (1 or -1) of the vertices of the
+            selected edges, including the perturbations.
+        condition (Optional[str]): Condition of the selection. Defaults to the
+            first condition of the problem.
+
+    Returns:
+        Dict[str, np.ndarray]: Values of the variables of the problem, to be
+        passed to `set_start`. The other conditions have no signal (only `_s`
+        is active). Empty if no measurement is selected.
+    """
+    enc = getattr(problem, "_signflow", None)
+    if enc is None:
+        raise ValueError("The problem was not created with signflow")
+    g = problem._graph
+    conditions = enc["conditions"]
+    k = 0 if condition is None else conditions.index(condition)
+    src, tgt = enc["edge_src"], enc["edge_tgt"]
+    vidx = {v: i for i, v in enumerate(g.vertices)}
+    s, t = vidx["_s"], vidx["_t"]
+    pert = vidx[f"_pert_{conditions[k]}"]
+    meas = vidx[f"_meas_{conditions[k]}"]
+    sign = g.get_edge_attr_array("interaction", default=0)
+    N = np.zeros(g.num_vertices)
+    N[[vidx[v] for v in vertex_values]] = list(vertex_values.values())
+    N[[s, pert]] = 1
+    R = np.zeros(g.num_edges)
+    selected = np.fromiter(edges, dtype=int)
+    R[selected] = N[src[selected]] * sign[selected]
+    # Edges from the perturbation to the inputs with the same sign and from
+    # the selected measurements to the dummy measurement vertex (the first
+    # one if there are duplicates)
+    ins = np.flatnonzero(src == pert)
+    ins = ins[sign[ins] * N[tgt[ins]] > 0]
+    ins = ins[np.unique(tgt[ins], return_index=True)[1]]
+    outs = np.flatnonzero((tgt == meas) & (src >= 0))
+    outs = outs[N[src[outs]] != 0]
+    outs = outs[np.unique(src[outs], return_index=True)[1]]
+    if len(outs) == 0:
+        return dict()
+    R[ins] = N[tgt[ins]]
+    R[outs] = N[src[outs]] * sign[outs]
+    # Close the signal through the dummy vertices
+    N[[meas, t]] = 1 if (R[outs] > 0).any() else -1
+    R[(src == s) & (tgt == pert)] = 1
+    inflow = (src < 0) & (tgt == s)
+    R[inflow] = 1
+    R[((src == meas) & (tgt == t)) | ((src == t) & (tgt < 0))] = N[t]
+    signal = np.flatnonzero(R)
+    F = _signal_flow(g.num_vertices, src, tgt, signal, s, t)
+    F_ub = problem.symbols[VAR_FLOW].ub if VAR_FLOW in problem.symbols else None
+    if F_ub is not None and F.max() > np.min(F_ub):
+        F *= np.min(F_ub) / F.max()
+
+    def column(x, other):
+        # Values of the condition, the other conditions only activate `_s`
+        X = np.tile(np.reshape(other, (-1, 1)), (1, len(conditions)))
+        X[:, k] = x
+        return X
+
+    start = {
+        "species_activated": column(N > 0, np.arange(len(N)) == s),
+        "species_inhibited": column(N < 0, np.zeros(len(N))),
+        "reaction_sends_activation": column(R > 0, inflow),
+        "reaction_sends_inhibition": column(R < 0, np.zeros(len(R))),
+        VAR_FLOW: F,
+        VAR_FLOW + "_ipos": F > 0,
+        VAR_FLOW + "_ineg": np.zeros_like(F),
+    }
+    arcs = signal[(src[signal] >= 0) & (tgt[signal] >= 0)]
+    L = _signal_layers(g, src[arcs], tgt[arcs], s)
+    if enc["dag"] and L is not None:
+        start["dag_layer_position"] = column(L, L)
+    if enc["contract"]:
+        masks = {
+            "species_activated": enc["reach"],
+            "species_inhibited": enc["reach"],
+            "dag_layer_position": enc["reach"],
+            "reaction_sends_activation": enc["edge_reach"],
+            "reaction_sends_inhibition": enc["edge_reach"],
+        }
+        start = {n: v[masks[n]] if n in masks else v for n, v in start.items()}
+    if enc["acyclicity"] == "scc" and "dag_layer_position" in start:
+        # Arcs of the layer constraints, between (vertex, condition) pairs
+        # of the subgraphs with `contract`
+        n = g.num_vertices
+        rids = np.flatnonzero((src >= 0) & (tgt >= 0))
+        a, b = src[rids], tgt[rids]
+        if enc["contract"]:
+            reach = enc["reach"]
+            n = int(reach.sum())
+            vpos = np.full(reach.shape, -1)
+            vpos[reach] = np.arange(n)
+            pe, ek = np.nonzero(enc["edge_reach"])
+            r = (src[pe] >= 0) & (tgt[pe] >= 0)
+            a, b = vpos[src[pe[r]], ek[r]], vpos[tgt[pe[r]], ek[r]]
+        start["dag_layer_position"] = scc_layer_positions(
+            n, a, b, start["dag_layer_position"]
+        )
+    symbols = problem.symbols
+    return {n: v for n, v in start.items() if n in symbols}
+
+
+def _signal_flow(
+    num_vertices: int,
+    edge_src: np.ndarray,
+    edge_tgt: np.ndarray,
+    signal: np.ndarray,
+    source: int,
+    target: int,
+) -> np.ndarray:
+    # Flow from the source to the target through all the edges with signal.
+    # One unit of flow goes through each edge that is not in the BFS tree
+    # from the source (and through the tree edge to the target), following
+    # the tree from the source to the edge and the BFS tree to the target
+    # from the edge. The tree edges get the flow of the units of their
+    # subtrees, so all the edges have flow and the flow is conserved.
+    F = np.zeros(len(edge_src))
+    arcs = signal[(edge_src[signal] >= 0) & (edge_tgt[signal] >= 0)]
+
+    def tree(start, ends_from, ends_to):
+        # BFS order of the vertices and edge to the parent of each vertex
+        adj = [[] for _ in range(num_vertices)]
+        for e in arcs:
+            adj[ends_from[e]].append(e)
+        parent = np.full(num_vertices, -1)
+        order, seen = [start], np.zeros(num_vertices, dtype=bool)
+        seen[start] = True
+        for v in order:
+            for e in adj[v]:
+                u = ends_to[e]
+                if not seen[u]:
+                    seen[u] = True
+                    parent[u] = e
+                    order.append(u)
+        return order, parent
+
+    fw_order, fw_parent = tree(source, edge_src, edge_tgt)
+    bw_order, bw_parent = tree(target, edge_tgt, edge_src)
+    units = np.setdiff1d(arcs, fw_parent)
+    if fw_parent[target] >= 0:
+        units = np.union1d(units, [fw_parent[target]])
+    F[units] += 1
+    for order, parent, ends, pending in (
+        (fw_order, fw_parent, edge_src, edge_src[units]),
+        (bw_order, bw_parent, edge_tgt, edge_tgt[units]),
+    ):
+        count = np.bincount(pending, minlength=num_vertices).astype(float)
+        for v in reversed(order):
+            e = parent[v]
+            if e >= 0:
+                F[e] += count[v]
+                count[ends[e]] += count[v]
+    F[signal[(edge_src[signal] < 0) | (edge_tgt[signal] < 0)]] = len(units)
+    return F
+
+
+def _signal_layers(
+    g: BaseGraph, arc_src: np.ndarray, arc_tgt: np.ndarray, source: int
+) -> Optional[np.ndarray]:
+    # Layer of each vertex: longest path through the arcs with signal,
+    # bounded below by the BFS distance from the source (None if the arcs
+    # contain a cycle or the layers exceed the number of vertices)
+    n = g.num_vertices
+    L = np.clip(g.get_index().bfs([source]), 0, None).astype(float)
+    order = np.argsort(arc_src, kind="stable")
+    ptr = np.searchsorted(arc_src[order], np.arange(n + 1))
+    indegree = np.bincount(arc_tgt, minlength=n)
+    queue = list(np.flatnonzero(indegree == 0))
+    for v in queue:
+        for u in arc_tgt[order[ptr[v] : ptr[v + 1]]]:
+            L[u] = max(L[u], L[v] + 1)
+            indegree[u] -= 1
+            if indegree[u] == 0:
+                queue.append(u)
+    if len(queue) < n or L.max() > n - 1:
+        return None
+    return L
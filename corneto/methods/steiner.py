@@ -48,11 +48,8 @@ def __exact_steiner_tree(
     # lower/upper bounds for flow. If directed, lb=0, ub>0, if undirected, lb<0, ub>0
     # NOTE: bounds are arbitrary, but very large/small numbers can introduce issues with integrality tolerances
     # TODO: lb/ub could be provided, or taken from the graph
-    lb = np.array(
-        [
-            0 if prop.has_attr(Attr.EDGE_TYPE, EdgeType.DIRECTED) else -10
-            for prop in Gc.get_attr_edges()
-        ]
+    lb = np.where(
+        Gc.get_edge_attr_array(Attr.EDGE_TYPE.value) == EdgeType.DIRECTED.value, 0, -10
     )
     if strict_acyclic:
         P = K.AcyclicFlow(Gc, lb=lb, ub=10)
@@ -71,7 +68,7 @@ def __exact_steiner_tree(
 
     # TODO: Take as argument, read from graph
     if edge_weights is None:
-        edge_weights = np.array([prop.get("weight", 0) for prop in Gc.get_attr_edges()])
+        edge_weights = Gc.get_edge_attr_array("weight", default=0)
     elif isinstance(edge_weights, (list, tuple)):
         edge_weights = np.array(edge_weights)
     else:
@@ -100,6 +97,33 @@ def __exact_steiner_tree(
     return P, Gc
 
 
+def _parameter_setter(param, name):
+    def setter(values):
+        values = np.asarray(values, dtype=float)
+        if values.shape != param.shape:
+            raise ValueError(
+                f"Expected {name} with shape {param.shape}, got {values.shape}"
+            )
+        param.value = values
+
+    return setter
+
+
+def _prizes_setter(param, prized_nodes):
+    # Prizes of the vertices that had a prize when the problem was created
+    def setter(prizes):
+        if isinstance(prizes, dict):
+            unknown = set(prizes.keys()) - set(prized_nodes)
+            if any(prizes[v] != 0 for v in unknown):
+                raise ValueError(
+                    f"Vertices {unknown} had no prize when the problem was created"
+                )
+            prizes = [prizes.get(v, 0) for v in prized_nodes]
+        _parameter_setter(param, "prizes")(prizes)
+
+    return setter
+
+
 def exact_steiner_tree(
     G: BaseGraph,
     terminals,
@@ -109,7 +133,11 @@ def exact_steiner_tree(
     strict_acyclic=False,
     flow_name=VAR_FLOW,
     backend: Backend = DEFAULT_BACKEND,
+    parametric=False,
 ):
+    # If parametric, edge weights and prizes are parameters that can be changed
+    # with P.update(edge_weights=..., prizes=...) without building the problem
+    # again (the names have the suffix _<flow_name> if flow_name is not the default)
     prized_nodes, prizes = [], []
     if isinstance(terminals, dict):
         prized = {k: v for k, v in terminals.items() if v != 0}
@@ -144,11 +172,8 @@ def exact_steiner_tree(
     # lower/upper bounds for flow. If directed, lb=0, ub>0, if undirected, lb<0, ub>0
     # NOTE: bounds are arbitrary, but very large/small numbers can introduce issues with integrality tolerances
     # TODO: lb/ub could be provided, or taken from the graph
-    lb = np.array(
-        [
-            0 if prop.has_attr(Attr.EDGE_TYPE, EdgeType.DIRECTED) else -10
-            for prop in Gc.get_attr_edges()
-        ]
+    lb = np.where(
+        Gc.get_edge_attr_array(Attr.EDGE_TYPE.value) == EdgeType.DIRECTED.value, 0, -10
     )
     if strict_acyclic:
         P = K.AcyclicFlow(Gc, lb=lb, ub=10, varname=flow_name)
@@ -164,12 +189,20 @@ def exact_steiner_tree(
 
     # TODO: Take as argument, read from graph
     if edge_weights is None:
-        edge_weights = np.array([prop.get("weight", 0) for prop in Gc.get_attr_edges()])
+        edge_weights = Gc.get_edge_attr_array("weight", default=0)
     elif isinstance(edge_weights, (list, tuple)):
         edge_weights = np.array(edge_weights)
     else:
         raise ValueError("Unknown type for edge_weights (list or tuple)")
 
+    suffix = "" if flow_name == VAR_FLOW else f"_{flow_name}"
+    if parametric:
+        edge_weights = K.Parameter(
+            f"{flow_name}_edge_weights", edge_weights.shape, edge_weights
+        )
+        P.register_parameter(
+            f"edge_weights{suffix}", _parameter_setter(edge_weights, "edge_weights")
+        )
     P.add_objectives(edge_weights @ Fi)  # sum the total cost of selected edges
 
     if len(prized_nodes) == 0:
@@ -182,7 +215,13 @@ def exact_steiner_tree(
         I_prized_selected = (
             P.symbols[f"{flow_name}_ipos"] + P.symbols[f"{flow_name}_ineg"]
         )
-        P.add_objectives(np.array(prizes) @ I_prized_selected, weights=-1)
+        prizes = np.array(prizes)
+        if parametric:
+            prizes = K.Parameter(f"{flow_name}_prizes", prizes.shape, prizes)
+            P.register_parameter(
+                f"prizes{suffix}", _prizes_setter(prizes, prized_nodes)
+            )
+        P.add_objectives(prizes @ I_prized_selected, weights=-1)
 
     # Add an objective for non-zero flow on prized nodes
 
@@ -201,6 +240,7 @@ def create_exact_multi_steiner_tree(
     lam=0.01,
     flow_name="flow",
     backend: Backend = DEFAULT_BACKEND,
+    parametric=False,
 ):
     if backend is None:
         raise ValueError("Invalid backend")
@@ -228,6 +268,7 @@ def create_exact_multi_steiner_tree(
             strict_acyclic=strict_acyclic,
             backend=backend,
             flow_name=f"{flow_name}{i}",
+            parametric=parametric,
         )
         if big_P is None:
             big_P = P
@@ -291,11 +332,10 @@ def _exact_multi_steiner_tree(
                 ids.append(idx)  # terminal -> () (sink node, remove flow)
                 dummy_edges[v] = idx
         ids = np.array(ids)
-        lb = np.array(
-            [
-                0 if prop.has_attr(Attr.EDGE_TYPE, EdgeType.DIRECTED) else -10
-                for prop in Gc.get_attr_edges()
-            ]
+        lb = np.where(
+            Gc.get_edge_attr_array(Attr.EDGE_TYPE.value) == EdgeType.DIRECTED.value,
+            0,
+            -10,
         )
 
     if strict_acyclic:
@@ -321,9 +361,7 @@ def _exact_multi_steiner_tree(
             edge_weights = edge_weights_per_condition[i]
 
         if edge_weights is None:
-            edge_weights = np.array(
-                [prop.get("weight", 0) for prop in Gc.get_attr_edges()]
-            )
+            edge_weights = Gc.get_edge_attr_array("weight", default=0)
         elif isinstance(edge_weights, (list, tuple)):
             edge_weights = np.array(edge_weights)
         else:
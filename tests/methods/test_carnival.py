@@ -1,4 +1,11 @@
+import numpy as np
+import pytest
+
+import corneto as cn
+from corneto.backend import CvxpyBackend, PicosBackend, ScipyBackend
 from corneto.methods import runVanillaCarnival
+from corneto.methods.carnival import _SearchTree, bfs_search, multistart_bfs_search
+from corneto.methods.signaling import create_flow_graph, signflow, signflow_start
 
 
 def test_vanilla_carnival():
@@ -14,11 +21,342 @@ def test_vanilla_carnival():
     perturbations = {"I1": 1, "I2": 1}
     p, Gf = runVanillaCarnival(perturbations, measurements, pkn)
     V = list(Gf.vertices)
-    act = p.get_symbol("species_activated_c0").value
-    inh = p.get_symbol("species_inhibited_c0").value
+    act = p.expr.species_activated_c0.value
+    inh = p.expr.species_inhibited_c0.value
     val = act - inh
     assert val[V.index("M1")] == 1
     assert val[V.index("M2")] == 1
     assert val[V.index("N1")] >= 0
     assert val[V.index("N2")] <= 0
     assert (abs(val[V.index("N1")]) + abs(val[V.index("N2")])) == 1
+
+
+def test_vanilla_carnival_condition_symbols():
+    pkn = [("I1", 1, "N1"), ("N1", 1, "M1"), ("N1", -1, "M2")]
+    p, _ = runVanillaCarnival({"I1": 1}, {"M1": 1, "M2": -1}, pkn, verbose=False)
+    N_act = p.symbols["species_activated"]
+    assert np.allclose(p.symbols["species_activated_c0"].value, N_act.value[:, 0])
+    assert np.allclose(
+        p.get_symbol("vertex_values_c0").value,
+        p.expr.species_activated_c0.value - p.expr.species_inhibited_c0.value,
+    )
+    assert "species_activated_c0" not in p.symbols
+    with pytest.raises(KeyError):
+        p.get_symbol("species_activated_c1")
+
+
+def test_vanilla_carnival_parametric_update():
+    pkn = [
+        ("I1", 1, "N1"),
+        ("N1", 1, "M1"),
+        ("N1", 1, "M2"),
+        ("I2", -1, "N2"),
+        ("N2", -1, "M2"),
+        ("N2", -1, "M1"),
+    ]
+    perturbations = {"I1": 1, "I2": 1}
+    p, Gf = runVanillaCarnival(
+        perturbations, {"M1": 1, "M2": 1}, pkn, verbose=False, parametric=True
+    )
+    new_measurements = {"M1": -1, "M2": -1}
+    p.update(species_values_c0={**perturbations, **new_measurements}).solve()
+    q, _ = runVanillaCarnival(perturbations, new_measurements, pkn, verbose=False)
+    assert np.isclose(p.objectives[0].value, q.objectives[0].value)
+    assert np.isclose(p.objectives[1].value, q.objectives[1].value)
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [CvxpyBackend(), ScipyBackend()],
+    ids=["cvxpy", "scipy"],
+)
+def test_vanilla_carnival_parametric_update_measurements(backend):
+    pkn = [
+        ("I1", 1, "N1"),
+        ("N1", 1, "M1"),
+        ("N1", 1, "M2"),
+        ("I2", -1, "N2"),
+        ("N2", -1, "M2"),
+        ("N2", -1, "M1"),
+    ]
+    perturbations = {"I1": 1, "I2": 1}
+    p, _ = runVanillaCarnival(
+        perturbations,
+        {"M1": 1, "M2": 1},
+        pkn,
+        backend=backend,
+        verbose=False,
+        parametric=True,
+    )
+    # Only the measurements change, the perturbations keep their values
+    new_measurements = {"M1": -1, "M2": -1}
+    p.update(species_values_c0=new_measurements).solve()
+    q, _ = runVanillaCarnival(
+        perturbations, new_measurements, pkn, backend=backend, verbose=False
+    )
+    assert np.isclose(p.objectives[0].value, q.objectives[0].value)
+    assert np.isclose(p.objectives[1].value, q.objectives[1].value)
+
+
+def test_vanilla_carnival_parametric_update_picos():
+    pkn = [("I1", 1, "N1"), ("N1", 1, "M1")]
+    p, _ = runVanillaCarnival(
+        {"I1": 1},
+        {"M1": 1},
+        pkn,
+        backend=PicosBackend("glpk"),
+        verbose=False,
+        parametric=True,
+    )
+    with pytest.raises(NotImplementedError):
+        p.update(species_values_c0={"M1": -1})
+
+
+def test_vanilla_carnival_heuristic_start():
+    pkn = [
+        ("I1", 1, "N1"),
+        ("N1", 1, "M1"),
+        ("N1", 1, "M2"),
+        ("I2", -1, "N2"),
+        ("N2", -1, "M2"),
+        ("N2", -1, "M1"),
+    ]
+    perturbations = {"I1": 1, "I2": -1}
+    measurements = {"M1": 1, "M2": -1}
+    p, Gf = runVanillaCarnival(
+        perturbations, measurements, pkn, verbose=False, heuristic_start=True
+    )
+    V = Gf.V
+    start = p.start["species_activated"][:, 0] - p.start["species_inhibited"][:, 0]
+    assert start[V.index("M1")] == 1
+    assert start[V.index("M2")] == -1
+    q, _ = runVanillaCarnival(perturbations, measurements, pkn, verbose=False)
+    assert np.isclose(p.objectives[0].value, q.objectives[0].value)
+    assert np.isclose(p.objectives[1].value, q.objectives[1].value)
+    r, _ = runVanillaCarnival(
+        perturbations,
+        measurements,
+        pkn,
+        verbose=False,
+        heuristic_start=True,
+        contract=True,
+    )
+    assert np.isclose(r.objectives[0].value, q.objectives[0].value)
+    assert np.isclose(r.objectives[1].value, q.objectives[1].value)
+    # The search stops after the budget, without reaching the measurements
+    s, _ = runVanillaCarnival(
+        perturbations,
+        measurements,
+        pkn,
+        verbose=False,
+        heuristic_start=True,
+        heuristic_options=dict(max_iters=1),
+    )
+    assert "species_activated" not in s.start
+    assert np.isclose(s.objectives[0].value, q.objectives[0].value)
+
+
+@pytest.mark.parametrize("acyclicity", ["layers", "scc", "lazy"])
+@pytest.mark.parametrize("contract", [False, True])
+def test_vanilla_carnival_heuristic_start_acyclicity(acyclicity, contract):
+    # N1, N3 and M1 form a cycle
+    pkn = [
+        ("I1", 1, "N1"),
+        ("N1", 1, "N3"),
+        ("N3", 1, "N1"),
+        ("N3", 1, "M1"),
+        ("M1", 1, "N3"),
+        ("N1", 1, "M2"),
+        ("I2", -1, "N2"),
+        ("N2", -1, "M2"),
+        ("N2", -1, "M1"),
+    ]
+    perturbations = {"I1": 1, "I2": -1}
+    measurements = {"M1": 1, "M2": -1}
+    p, _ = runVanillaCarnival(
+        perturbations,
+        measurements,
+        pkn,
+        verbose=False,
+        heuristic_start=True,
+        acyclicity=acyclicity,
+        contract=contract,
+    )
+    layers = p.start.get("dag_layer_position", None)
+    if acyclicity == "lazy":
+        assert layers is None
+    else:
+        assert layers.shape == p.symbols["dag_layer_position"].shape
+    if acyclicity == "scc":
+        assert sorted(layers.ravel().tolist()) == [0, 1, 2]
+    q, _ = runVanillaCarnival(perturbations, measurements, pkn, verbose=False)
+    assert np.isclose(p.objectives[0].value, q.objectives[0].value)
+    assert np.isclose(p.objectives[1].value, q.objectives[1].value)
+
+
+def test_signflow_multiple_conditions():
+    pkn = [
+        ("I1", 1, "N1"),
+        ("N1", 1, "M1"),
+        ("N1", 1, "M2"),
+        ("I2", -1, "N2"),
+        ("N2", -1, "M2"),
+        ("N2", -1, "M1"),
+    ]
+    conditions = {
+        "c0": {"I1": ("P", 1), "I2": ("P", 1), "M1": ("M", 1), "M2": ("M", 1)},
+        "c1": {"I2": ("P", -1), "M1": ("M", -1), "M2": ("M", -1)},
+    }
+    G = create_flow_graph(cn.Graph.from_sif_tuples(pkn), conditions)
+    p = signflow(G, conditions)
+    assert p.expr.species_activated.shape == (G.num_vertices, 2)
+    p.solve()
+    q = signflow(G, conditions, contract=True)
+    # The subgraph of c1 has no I1 and N1
+    assert q.expr.species_activated.shape[0] < 2 * G.num_vertices
+    q.solve()
+    assert np.isclose(p.objectives[0].value, q.objectives[0].value)
+    assert np.isclose(p.objectives[1].value, q.objectives[1].value)
+    V = list(G.V)
+    m = [V.index("M1"), V.index("M2")]
+    for c in conditions:
+        assert np.allclose(
+            np.ravel(p.expr[f"vertex_values_{c}"].value)[m],
+            np.ravel(q.expr[f"vertex_values_{c}"].value)[m],
+        )
+    V = list(G.V)
+    for k, c in enumerate(conditions):
+        val = np.ravel(p.expr[f"vertex_values_{c}"].value)
+        assert np.allclose(
+            val,
+            np.ravel(p.expr.species_activated.value)[k::2]
+            - np.ravel(p.expr.species_inhibited.value)[k::2],
+        )
+        assert val[V.index("M1")] == val[V.index("M2")] == (1 if k == 0 else -1)
+    # I1 is not perturbed in c1
+    assert np.ravel(p.expr.vertex_values_c1.value)[V.index("N1")] == 0
+
+
+@pytest.mark.parametrize("acyclicity", ["layers", "scc", "lazy"])
+@pytest.mark.parametrize("contract", [False, True])
+def test_signflow_start(acyclicity, contract):
+    pkn = [
+        ("I1", 1, "N1"),
+        ("N1", 1, "M1"),
+        ("N1", 1, "M2"),
+        ("I2", -1, "N2"),
+        ("N2", -1, "M2"),
+        ("N2", -1, "M1"),
+    ]
+    conditions = {
+        "c0": {"I1": ("P", 1), "I2": ("P", 1), "M1": ("M", 1), "M2": ("M", 1)},
+        "c1": {"I2": ("P", -1), "M1": ("M", -1), "M2": ("M", -1)},
+    }
+    G = create_flow_graph(cn.Graph.from_sif_tuples(pkn), conditions)
+    p = signflow(G, conditions, acyclicity=acyclicity, contract=contract)
+    edges = [i for i, (s, _) in G.edges() if s == {"I2"} or s == {"N2"}]
+    signs = {"I2": -1, "N2": 1, "M1": -1, "M2": -1}
+    start = signflow_start(p, edges, signs, "c1")
+    # The graph has no cycles, so only `layers` has layer positions
+    assert ("dag_layer_position" in start) == (acyclicity == "layers")
+    # The initial solution is feasible
+    p.set_start(start)
+    for name, value in p.start.items():
+        p += p.symbols[name] == value
+    p.solve()
+    V = list(G.V)
+    values = np.ravel(p.expr.vertex_values_c1.value)
+    assert values[V.index("N2")] == 1
+    assert values[V.index("M1")] == values[V.index("M2")] == -1
+    # No signal in c0, so the error is the value of all its vertices
+    assert np.isclose(p.objectives[0].value, 4)
+    assert np.isclose(p.objectives[1].value, 0)
+
+
+def test_bfs_search_best_first():
+    pkn = [
+        ("I1", 1, "N1"),
+        ("N1", 1, "M1"),
+        ("N1", 1, "M2"),
+        ("I2", -1, "N2"),
+        ("N2", -1, "M2"),
+        ("N2", -1, "M1"),
+    ]
+    G = cn.Graph.from_sif_tuples(pkn)
+    measurements = {"M1": 1, "M2": -1}
+    for best_first in (False, True):
+        edges, paths, _ = bfs_search(
+            G, {"I1": 1, "I2": -1}, measurements, verbose=False, best_first=best_first
+        )
+        assert {p[0]: p[1][p[0]][1] for p in paths} == measurements
+        # Shared vertices have the same sign in all the paths
+        signs = {}
+        for _, path in paths:
+            for v, (_, value, _) in path.items():
+                assert signs.setdefault(v, value) == value
+        assert all(
+            i in edges
+            for _, path in paths
+            for _, _, i in path.values()
+            if i is not None
+        )
+
+
+def test_search_tree_bitsets():
+    tree = _SearchTree()
+    a = tree.add(0, -1, 1, None)
+    b = tree.add(70, a, -1, 0)
+    c = tree.add(3, b, -1, 1)
+    d = tree.add(70, a, 1, 2)
+    assert tree.contains(c, 0) and tree.contains(c, 70)
+    assert not tree.contains(c, 1) and not tree.contains(d, 3)
+    assert tree.states(c) == [a, b, c]
+    tree.assign(c)
+    assert tree.assigned == {0: 1, 70: -1, 3: -1}
+    assert not tree.conflicts(c)
+    assert tree.conflicts(d)
+    tree.release(c)
+    assert tree.path(c, list(range(71)))[0] == 3
+
+
+def test_bfs_search_beam_measurement_error():
+    # A is closer to M, but only the path through B reaches M with its sign
+    pkn = [
+        ("I", 1, "A"),
+        ("I", 1, "B"),
+        ("A", -1, "M"),
+        ("B", 1, "C"),
+        ("C", 1, "M"),
+    ]
+    G = cn.Graph.from_sif_tuples(pkn)
+    for options in [dict(beam_width=1), dict(best_first=True, max_iters=3)]:
+        _, paths, _ = bfs_search(G, {"I": 1}, {"M": 1}, verbose=False, **options)
+        assert [p[0] for p in paths] == ["M"]
+        assert list(paths[0][1]) == ["I", "B", "C", "M"]
+
+
+def test_multistart_bfs_search():
+    pkn = [
+        ("I1", 1, "N1"),
+        ("N1", 1, "M1"),
+        ("N1", 1, "M2"),
+        ("I2", -1, "N2"),
+        ("N2", -1, "M2"),
+        ("N2", -1, "M1"),
+        ("I1", 1, "N2"),
+    ]
+    G = cn.Graph.from_sif_tuples(pkn)
+    inputs, measurements = {"I1": 1, "I2": -1}, {"M1": 1, "M2": -1}
+    best = multistart_bfs_search(
+        G, inputs, measurements, n_starts=4, top_k=2, seed=0, max_iters=100
+    )
+    assert len(best) == 2
+    assert best[0][0] <= best[1][0]
+    error, edges, paths, stats = best[0]
+    assert error == 0
+    assert stats["iters"] <= 100
+    # Beam search and random restarts through the heuristic
+    _, edges, paths, _, errors = cn.methods.fast_carnival(
+        G, inputs, measurements, verbose=False, n_starts=3, beam_width=2, seed=1
+    )
+    assert sum(errors.values()) == 0
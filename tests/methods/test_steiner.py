@@ -4,11 +4,11 @@ import numpy as np
 import pytest
 
 from corneto._graph import BaseGraph
-from corneto.backend import Backend, CvxpyBackend, PicosBackend
+from corneto.backend import Backend, CvxpyBackend, PicosBackend, ScipyBackend
 from corneto.methods.steiner import exact_steiner_tree
 
 
-@pytest.fixture(params=[CvxpyBackend, PicosBackend])
+@pytest.fixture(params=[CvxpyBackend, PicosBackend, ScipyBackend])
 def backend(request):
     K: Backend = request.param()
     # TODO: Unify solver names
@@ -30,3 +30,17 @@ def test_steiner(backend, steiner_graph):
     P, _ = exact_steiner_tree(steiner_graph, terminals, backend=backend)
     P.solve(verbosity=1)
     assert np.isclose(P.objectives[0].value, 36.0)
+
+
+def test_steiner_parametric_update(backend, steiner_graph):
+    if isinstance(backend, PicosBackend):
+        pytest.skip("PICOS parameters can not be updated")
+    terminals = [2, 6, 21, 23, 1, 7]
+    P, Gc = exact_steiner_tree(
+        steiner_graph, terminals, backend=backend, parametric=True
+    )
+    P.solve()
+    assert np.isclose(P.objectives[0].value, 36.0)
+    weights = Gc.get_edge_attr_array("weight", default=0)
+    P.update(edge_weights=2 * weights).solve()
+    assert np.isclose(P.objectives[0].value, 72.0)
@@ -4,11 +4,21 @@ import cvxpy as cp
 import numpy as np
 import pytest
 
+from corneto._constants import Direction
 from corneto._graph import Graph
-from corneto.backend import Backend, CvxpyBackend, PicosBackend, VarType
-
-
-@pytest.fixture(params=[CvxpyBackend, PicosBackend])
+from corneto.backend import (
+    Backend,
+    CvxpyBackend,
+    PicosBackend,
+    ScipyBackend,
+    VarType,
+)
+from corneto.backend._base import ProblemDef
+from corneto.backend._cvxpy_backend import CvxpySymbol
+from corneto.backend._presolve import presolve_flow
+
+
+@pytest.fixture(params=[CvxpyBackend, PicosBackend, ScipyBackend])
 def backend(request):
     K: Backend = request.param()
     if isinstance(K, CvxpyBackend):
@@ -71,6 +81,33 @@ def test_cvxpy_convex_apply():
     assert np.all(np.array(x.value) > np.array([-1e-6, 0.62, 0.36, -1e-6, -1e-6]))
 
 
+def test_cvxpy_native_bounds():
+    backend = CvxpyBackend()
+    x = backend.Variable("x", (3,), lb=np.array([0, -np.inf, 1]), ub=5)
+    assert x.e.attributes["bounds"] is not None
+    assert x._bounds_as_constraints() == []
+    P = backend.Problem()
+    P += x[1] >= -3
+    P.add_objectives(x.sum())
+    P.solve(solver="HIGHS")
+    assert np.allclose(x.value, [0, -3, 1])
+
+
+def test_cvxpy_bounds_as_constraints():
+    backend = CvxpyBackend()
+    lb = np.array([[0, -np.inf], [1, -2]])
+    x = CvxpySymbol(cp.Variable((2, 2)), "x", shape=(2, 2), lb=lb, ub=np.inf)
+    constraints = x._bounds_as_constraints()
+    assert x._bounds_as_constraints() is constraints
+    assert len(constraints) == 1
+    assert constraints[0].size == 3
+    P = backend.Problem()
+    P += x >= -5
+    P.add_objectives(x.sum())
+    P.solve(solver="HIGHS")
+    assert np.allclose(x.value, [[0, -5], [1, -2]])
+
+
 def test_sum_expr_shape(backend):
     A = backend.Variable(shape=(2, 3))
     B = backend.Variable(shape=(2, 3))
@@ -399,6 +436,96 @@ def test_fba_multiflow(backend, mitocore_small):
     assert np.allclose(np.round(obj.value, 3), [100.257, 100.257])
 
 
+def test_presolve_flow_dead_ends():
+    G = Graph.from_sif_tuples(
+        [("A", 1, "B"), ("B", 1, "C"), ("C", 1, "D"), ("B", 1, "E"), ("E", 1, "F")]
+    )
+    G.add_edge((), "A")
+    G.add_edge("D", ())
+    G.add_edge((), "F")
+    # F can only be produced once the inflow of F is blocked, E -> F and then
+    # B -> E are dead-ends
+    red = presolve_flow(G, lb=0, ub=np.array([10, 10, 10, 10, 10, 10, 10, 0]))
+    assert list(red.edges) == [0, 1, 2, 5, 6]
+    assert set(red.graph.V) == {"A", "B", "C", "D"}
+    assert list(red.ub) == [10] * 5
+    assert list(red.expand([1, 2, 3, 4, 5])) == [1, 2, 3, 0, 0, 4, 5, 0]
+
+
+def test_presolve_flow_reversible_dead_ends():
+    G = Graph.from_sif_tuples([("A", 1, "B"), ("B", 1, "C")])
+    G.add_edge((), "A")
+    # C has a single edge, so B -> C and then A -> B and the inflow of A can
+    # not carry flow, also if they are reversible
+    for lb in [0, -10]:
+        red = presolve_flow(G, lb=lb, ub=10)
+        assert list(red.edges) == []
+    G.add_edge("C", ())
+    assert list(presolve_flow(G, lb=-10, ub=10).edges) == [0, 1, 2, 3]
+
+
+def test_presolve_flow_acyclic_unreachable():
+    G = Graph.from_sif_tuples(
+        [("A", 1, "B"), ("B", 1, "C"), ("C", 1, "D"), ("D", 1, "C")]
+    )
+    G.add_edge((), "A")
+    G.add_edge("B", ())
+    # C <-> D is a cycle that can only carry a circulation
+    assert list(presolve_flow(G, lb=0, ub=10).edges) == [0, 1, 2, 3, 4, 5]
+    red = presolve_flow(G, lb=0, ub=10, acyclic=True)
+    assert list(red.edges) == [0, 4, 5]
+    assert set(red.graph.V) == {"A", "B"}
+    # Reversed inflow: flow can enter through the outflow edge of B
+    red = presolve_flow(G, lb=np.array([0, 0, 0, 0, 0, -10]), ub=10, acyclic=True)
+    assert list(red.edges) == [0, 4, 5]
+
+
+def test_acyclic_flow_presolve_unreachable(backend):
+    G = Graph.from_sif_tuples([("A", 1, "B"), ("C", 1, "D"), ("D", 1, "C")])
+    G.add_edge((), "A")
+    G.add_edge("B", ())
+    P = backend.AcyclicFlow(G, lb=0, ub=10, presolve=True)
+    assert P.symbols["_flow"].shape == (3,)
+    P.add_objectives(-sum(P.expr.flow))
+    P.solve()
+    flow = np.array(P.expr.flow.value).reshape(-1)
+    assert np.allclose(flow, [10, 0, 0, 10, 10])
+
+
+def test_fba_flow_presolve(backend, mitocore_small):
+    S, R, M = mitocore_small
+    reaction_id = np.flatnonzero(R["id"] == "EX_biomass_e")[0]
+    G = Graph.from_vertex_incidence(S, M["id"], R["id"])
+    lb, ub = np.array(R["lb"], dtype=float), np.array(R["ub"], dtype=float)
+    blocked = np.flatnonzero(R["id"] == "EX_o2_e")[0]
+    lb[blocked] = ub[blocked] = 0
+    P = backend.Flow(
+        G, lb=lb, ub=ub, values=True, presolve=True, create_nonzero_indicators=True
+    )
+    assert P.symbols["_flow"].shape[0] < G.num_edges
+    obj = P.expr.flow[reaction_id]
+    P.add_objectives(-obj)
+    P.solve()
+    assert np.isclose(np.round(obj.value, 3), 1.8)
+    flow = np.array(P.expr.flow.value).reshape(-1)
+    assert flow.shape == (G.num_edges,)
+    assert np.isclose(flow[blocked], 0)
+
+
+def test_acyclic_flow_presolve(backend):
+    G = Graph.from_sif_tuples(
+        [("A", 1, "B"), ("B", 1, "C"), ("C", 1, "D"), ("B", 1, "E"), ("E", 1, "F")]
+    )
+    G.add_edge((), "A")
+    G.add_edge("D", ())
+    P = backend.AcyclicFlow(G, lb=0, ub=10, presolve=True)
+    assert P.symbols["_flow"].shape == (5,)
+    P.add_objectives(-sum(P.expr.flow))
+    P.solve()
+    flow = np.array(P.expr.flow.value).reshape(-1)
+    assert np.allclose(flow, [10, 10, 10, 0, 0, 10, 10])
+
+
 def test_acyclic_flow_directed_graph(backend):
     G = Graph.from_sif_tuples(
         [
@@ -432,6 +559,43 @@ def test_acyclic_flow_directed_graph(backend):
     )
 
 
+@pytest.mark.parametrize("acyclicity", ["layers", "scc", "lazy"])
+@pytest.mark.parametrize("lb, n_edges", [(0, 11), (-10, 13)])
+def test_acyclic_flow_encodings(backend, acyclicity, lb, n_edges):
+    G = Graph.from_sif_tuples(
+        [
+            ("v1", 1, "v2"),
+            ("v2", 1, "v2"),
+            ("v2", 1, "v3"),
+            ("v3", -1, "v1"),
+            ("v1", -1, "v2"),
+            ("v2", 1, "v4"),
+            ("v4", -1, "v3"),
+            ("v4", 1, "v5"),
+            ("v5", 1, "v3"),
+            ("v5", -1, "v6"),
+            ("v3", 1, "v5"),
+            ("v3", 1, "v6"),
+        ]
+    )
+    G.add_edge((), "v1")
+    G.add_edge("v6", ())
+    P = backend.AcyclicFlow(G, lb=lb, ub=10, acyclicity=acyclicity)
+    P.add_objectives(-sum(P.expr.with_flow))
+    P.solve()
+    pos = np.round(P.expr.positive_flow.value).ravel()
+    neg = np.round(P.expr.negative_flow.value).ravel()
+    assert pos.sum() + neg.sum() == n_edges
+    # The selected edges (reversed if the flow is negative) form a DAG
+    selected = Graph()
+    for i, (s, t) in enumerate(G.E):
+        if len(s) > 0 and len(t) > 0 and pos[i] + neg[i] > 0:
+            (s,), (t,) = (s, t) if pos[i] > 0 else (t, s)
+            selected.add_edge(s, t)
+    for v in selected.V:
+        assert v not in set(selected.bfs(list(selected.successors(v))).keys())
+
+
 def test_acyclic_flow_undirected_edge(backend):
     G = Graph.from_sif_tuples(
         [
@@ -518,3 +682,160 @@ def test_l2_norm(backend):
     P.add_objectives(n)
     P.solve()
     assert np.isclose(n.value, expected_result, rtol=1e-5)
+
+
+def test_standard_form_flow_blocks():
+    from corneto.backend._standard_form import VariableSpace, compile_problem
+
+    G = Graph()
+    G.add_edges([((), "A"), ("A", "B"), ("A", "C"), ("B", "D"), ("C", "D"), ("D", ())])
+    space = VariableSpace()
+    F = space.add((G.num_edges,), lb=0, ub=10)
+    A = G.vertex_incidence_matrix(sparse=True)
+    P = ProblemDef(constraints=[A @ F == 0, F[0] >= 1])
+    P.add_objectives(F.sum(), inplace=True)
+    sf = compile_problem(P)
+    assert sf.A.shape == (G.num_vertices + 1, G.num_edges)
+    assert np.array_equal(sf.A[: G.num_vertices].toarray(), A.toarray())
+    result = sf.solve()
+    assert np.isclose(result.fun, 4)
+    assert np.isclose(F.value[0], 1)
+
+
+def test_standard_form_parameter():
+    from corneto.backend._standard_form import (
+        LinearParameter,
+        VariableSpace,
+        compile_problem,
+    )
+
+    space = VariableSpace()
+    x = space.add((3,), lb=0, ub=5, integer=True)
+    w = LinearParameter((3,), [1, 2, 3])
+    P = ProblemDef(constraints=[x.sum() <= 7], direction=Direction.MAX)
+    P.add_objectives(w @ x, inplace=True)
+    assert np.isclose(compile_problem(P).solve().fun, 19)
+    w.value = [3, 2, 1]
+    assert np.isclose(compile_problem(P).solve().fun, 19)
+    assert np.allclose(x.value, [5, 2, 0])
+
+
+def test_standard_form_not_linear():
+    from corneto.backend._standard_form import VariableSpace
+
+    space = VariableSpace()
+    x = space.add((2,))
+    with pytest.raises(ValueError):
+        x.multiply(x)
+    with pytest.raises(NotImplementedError):
+        abs(x)
+
+
+def test_standard_form_releases_columns():
+    import gc
+
+    from corneto.backend._standard_form import VariableSpace, compile_problem
+
+    space = VariableSpace()
+    x = space.add((1000,), lb=0, ub=1)
+    y = space.add((3,), lb=0, ub=2)
+    z = space.add((2,), lb=-1, ub=1, integer=True)
+    del x
+    gc.collect()
+    assert space.num_columns == 5
+    # Coefficients only for the columns of the variables of the expression
+    e = y[1:] + 2 * z
+    assert e.A.shape == (2, 5)
+    assert e.columns.tolist() == [1000, 1001, 1002, 1003, 1004]
+    P = ProblemDef(constraints=[e <= 1], direction=Direction.MAX)
+    P.add_objectives(y.sum() + z.sum(), inplace=True)
+    sf = compile_problem(P)
+    assert sf.A.shape == (2, 5)
+    assert sf.integrality.tolist() == [0, 0, 0, 1, 1]
+    assert np.isclose(sf.solve().fun, 4)
+    assert np.all(e.value <= 1 + 1e-6)
+
+
+def test_scipy_backend_build():
+    backend = ScipyBackend()
+    G = Graph()
+    G.add_edges([((), "A"), ("A", "B"), ("B", ())])
+    P = backend.AcyclicFlow(G)
+    sf = backend.build(P)
+    assert sf.num_variables == P.expr.flow.shape[0] * 3 + G.num_vertices
+    assert sf.A.shape[1] == sf.num_variables
+    assert np.sum(sf.integrality) == 2 * G.num_edges
+
+
+def test_problem_update(backend):
+    if isinstance(backend, PicosBackend):
+        pytest.skip("PICOS parameters can not be updated")
+    x = backend.Variable("x", (3,), lb=0, ub=10)
+    w = backend.Parameter("w", (3,), np.array([1.0, 2.0, 3.0]))
+    P = backend.Problem()
+    P += x.sum() <= 5
+    P.add_objectives(w @ x, weights=-1)
+    P.solve()
+    assert np.isclose(x.value[2], 5)
+    P.update(w=np.array([3.0, 2.0, 1.0])).solve()
+    assert np.isclose(x.value[0], 5)
+
+
+def test_problem_register_parameter_merge(backend):
+    values = []
+    P1 = backend.Problem()
+    P1.register_parameter("data", values.append)
+    P = P1.merge(backend.Problem())
+    assert "data" in P.parameters
+    if isinstance(backend, PicosBackend):
+        with pytest.raises(NotImplementedError):
+            P.update(data=1)
+        return
+    P.update(data=1)
+    assert values == [1]
+    with pytest.raises(ValueError):
+        P.update(unknown=1)
+
+
+def test_problem_set_start(backend):
+    x = backend.Variable("x", (3,), vartype=VarType.BINARY)
+    y = backend.Variable("y", (3,), lb=0, ub=5)
+    P = backend.Problem()
+    P += y <= 4 * x
+    P += x.sum() <= 2
+    P.add_objectives(y.sum(), weights=-1)
+    P.set_start({"x": [0.9, 1, 0], "y": [2, 7, 0]})
+    assert np.allclose(P.start["x"], [1, 1, 0])
+    assert np.allclose(P.start["y"], [2, 5, 0])
+    assert "x" in P.merge(backend.Problem()).start
+    with pytest.raises(ValueError):
+        P.set_start({"z": 1})
+    P.solve()
+    assert np.isclose(P.objectives[0].value, 8)
+    assert not P.set_start(None).start
+
+
+def test_problem_symbols_index(backend):
+    x = backend.Variable("x", (2,))
+    y = backend.Variable("y", (2,))
+    P = backend.Problem()
+    P += x >= 0
+    assert list(P.symbols) == ["x"]
+    assert P.symbols is P.symbols
+    P += y <= x
+    assert set(P.symbols) == {"x", "y"}
+    Q = P.add_constraints(backend.Variable("z") >= 0, inplace=False)
+    assert set(Q.symbols) == {"x", "y", "z"}
+    assert "z" not in P.symbols
+    R = P.merge(backend.Problem().add_objectives(backend.Variable("w").sum()))
+    assert set(R.symbols) == {"x", "y", "w"}
+
+
+def test_expr_symbols_deep(backend):
+    x = backend.Variable("x", (2,))
+    y = backend.Variable("y", (2,))
+    e = x
+    for i in range(2000):
+        e = e + y if i == 1000 else e + 1
+    assert e._proxy_symbols == {x, y}
+    assert (e <= 1)._proxy_symbols == {x, y}
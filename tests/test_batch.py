@@ -0,0 +1,90 @@
+import os
+import signal
+import time
+
+import numpy as np
+
+import corneto as cn
+from corneto.backend import ScipyBackend
+from corneto.methods.carnival import runVanillaCarnival
+
+PKN = [
+    ("I1", 1, "N1"),
+    ("N1", 1, "M1"),
+    ("N1", 1, "M2"),
+    ("I2", -1, "N2"),
+    ("N2", -1, "M2"),
+    ("N2", -1, "M1"),
+]
+
+
+def carnival(G, measurements):
+    return runVanillaCarnival(
+        {"I1": 1, "I2": 1},
+        measurements,
+        G,
+        solve=False,
+        verbose=False,
+        backend=ScipyBackend(),
+    )
+
+
+def unstable(sample):
+    if sample == "error":
+        raise ValueError("Invalid sample")
+    if sample == "crash":
+        os.kill(os.getpid(), signal.SIGSEGV)
+    if sample == "slow":
+        time.sleep(30)
+    backend = ScipyBackend()
+    x = backend.Variable("x", lb=0, ub=sample)
+    return backend.Problem().add_objectives(x, weights=-1)
+
+
+def objective(P):
+    return P.objectives[0].value
+
+
+def test_solve_batch_shared_graph():
+    G = cn.Graph.from_sif_tuples(PKN)
+    samples = [{"M1": 1, "M2": 1}, {"M1": -1, "M2": -1}, {"M1": 1, "M2": -1}]
+    results = list(cn.solve_batch(carnival, samples, graph=G, processes=2))
+    assert sorted(r.index for r in results) == [0, 1, 2]
+    for r in results:
+        assert r.ok
+        P, _ = carnival(G, samples[r.index])
+        P.solve()
+        assert np.isclose(r.objectives[1], P.objectives[1].value)
+        assert r.value["vertex_values_c0"].shape == P.expr.vertex_values_c0.shape
+
+
+def test_solve_batch_failures():
+    samples = [1, "error", 2, "crash", "slow", 3]
+    results = {
+        r.index: r
+        for r in cn.solve_batch(
+            unstable, samples, processes=2, timeout=2, extract=objective
+        )
+    }
+    assert sorted(results) == list(range(len(samples)))
+    assert [results[i].value for i in (0, 2, 5)] == [1, 2, 3]
+    assert "Invalid sample" in results[1].error
+    assert "exited with code -11" in results[3].error
+    assert "Timeout" in results[4].error
+
+
+def test_solve_batch_timeout_excludes_startup():
+    # Spawned workers import corneto before taking a sample, which must not
+    # count for the timeout of the sample
+    results = list(
+        cn.solve_batch(
+            unstable,
+            [1, 2, 3],
+            processes=3,
+            timeout=1,
+            extract=objective,
+            mp_context="spawn",
+        )
+    )
+    assert all(r.ok for r in results)
+    assert sorted(r.value for r in results) == [1, 2, 3]
@@ -1,14 +1,21 @@
+from collections.abc import MutableMapping
 from copy import deepcopy
 
+import numpy as np
+import pytest
+
 from corneto._graph import (
     Attr,
     Attributes,
     EdgeType,
     Graph,
+    GraphView,
+    ReadOnlyGraphError,
     _fset,
     _tpl,
     unique_iter,
 )
+from corneto._graph_readonly import ReadOnlyGraph
 
 
 def test_fset():
@@ -364,3 +371,436 @@ def test_prune_directed():
         type=EdgeType.DIRECTED,
     )
     assert set(G.prune(["E"], ["K"]).V) == {"E", "F", "H", "K"}
+
+
+def test_index_invalidated_after_add_edge():
+    g = Graph()
+    g.add_edges([(1, 2), (2, 3)])
+    assert set(g.successors(2)) == {3}
+    index = g.get_index()
+    assert g.get_index() is index
+    g.add_edge(2, 4)
+    assert g.get_index() is not index
+    assert set(g.successors(2)) == {3, 4}
+
+
+def test_index_reachable_multiple_sources():
+    g = Graph()
+    g.add_edges([(1, 2), (2, 3), (4, 3), (5, 6)])
+    index = g.get_index()
+    V = list(g.V)
+    starts = [[V.index(1)], [V.index(4), V.index(5)], []]
+    reach = index.reachable(starts)
+    assert reach.shape == (g.num_vertices, 3)
+    assert {V[i] for i in np.flatnonzero(reach[:, 0])} == {1, 2, 3}
+    assert {V[i] for i in np.flatnonzero(reach[:, 1])} == {3, 4, 5, 6}
+    assert not reach[:, 2].any()
+    back = index.reachable([[V.index(3)]], reverse=True)
+    assert {V[i] for i in np.flatnonzero(back[:, 0])} == {1, 2, 3, 4}
+
+
+def test_reachable_masks():
+    g = Graph()
+    g.add_edges([(1, 2), (2, 3), (4, 3), (3, 5), (3, 6)])
+    masks = g.reachable_masks([[1], [4], [1, 4]], [[5], [6], []])
+    V = list(g.V)
+    assert {V[i] for i in np.flatnonzero(masks[:, 0])} == {1, 2, 3, 5}
+    assert {V[i] for i in np.flatnonzero(masks[:, 1])} == {4, 3, 6}
+    assert not masks[:, 2].any()
+
+
+def test_neighbors_hyperedge():
+    g = Graph()
+    g.add_edge({1, 2}, {3, 4})
+    g.add_edge(5, 1, type=EdgeType.UNDIRECTED)
+    g.add_edge(6, 7)
+    assert set(g.neighbors(1)) == {1, 2, 3, 4, 5}
+    assert set(g.predecessors(1)) == {5}
+
+
+def test_graph_bfs_undirected():
+    g = Graph()
+    g.add_edges([(1, 2), (3, 2), (4, 3), (5, 6)])
+    dist = g.bfs(1, undirected=True)
+    assert dist == {1: 0, 2: 1, 3: 2, 4: 3}
+
+
+def test_reachability_analysis():
+    g = Graph()
+    g.add_edges([("A", "B"), ("B", "C"), ("A", "C"), ("C", "D"), ("E", "D")])
+    selected = g.reachability_analysis(["A"], ["D"], verbose=False)
+    assert selected == {0, 2, 3}
+    selected = g.reachability_analysis(
+        ["A"], ["D"], subset_edges={0, 1, 3}, verbose=False
+    )
+    assert selected == {0, 1, 3}
+
+
+def test_vertex_index():
+    g = Graph()
+    g.add_edges([("a", "b"), ("b", {"c", "d"})])
+    assert g.add_vertex("b") == 1
+    assert g.vertex_index("a") == 0
+    assert g.get_vertex(1) == "b"
+    idx = g.vertex_indices(["b", "a"])
+    assert isinstance(idx, np.ndarray)
+    assert idx.tolist() == [1, 0]
+    assert [g.get_vertex(i) for i in range(g.num_vertices)] == list(g.V)
+
+
+def test_vertex_index_missing_vertex():
+    g = Graph()
+    g.add_edge("a", "b")
+    with pytest.raises(KeyError):
+        g.vertex_index("c")
+    with pytest.raises(IndexError):
+        g.get_vertex(2)
+
+
+def test_add_edges_from_arrays():
+    g = Graph()
+    g.add_edge("a", "b", interaction=1)
+    idx = g.add_edges_from_arrays(
+        np.array(["b", "c"]), np.array(["c", "a"]), interaction=np.array([-1, 1])
+    )
+    assert idx == [1, 2]
+    assert g.V == ("a", "b", "c")
+    assert g.get_edge(2) == (frozenset({"c"}), frozenset({"a"}))
+    assert g.get_attr_edge(1).interaction == -1
+    assert g.get_attr_edge(1).get_attr(Attr.EDGE_TYPE) == EdgeType.DIRECTED
+    assert set(g.successors("b")) == {"c"}
+
+
+def test_add_edges_from_arrays_length_mismatch():
+    g = Graph()
+    with pytest.raises(ValueError):
+        g.add_edges_from_arrays(["a", "b"], ["c"])
+    with pytest.raises(ValueError):
+        g.add_edges_from_arrays(["a", "b"], ["c", "d"], interaction=[1])
+
+
+def test_from_vertex_incidence():
+    A = np.array([[-1, 0], [2, -1], [0, 1]])
+    g = Graph.from_vertex_incidence(A, ["A", "B", "C"], ["r1", "r2"], lb=[0, -10])
+    assert g.get_edge(0) == (frozenset({"A"}), frozenset({"B"}))
+    assert g.get_attr_edge(1)["id"] == "r2"
+    assert g.get_attr_edge(1)["lb"] == -10
+    assert np.array_equal(g.vertex_incidence_matrix(values=True), A)
+
+
+def test_add_edges_from_arrays_indices():
+    for columnar in [False, True]:
+        g = Graph(columnar=columnar)
+        g.add_vertices(["a", "b", "c"])
+        g.add_edges_from_arrays(
+            np.array([0, 1, 2]), np.array([1, 2, 2]), indices=True, weight=[1, 2, 3]
+        )
+        h = Graph(columnar=columnar)
+        h.add_vertices(["a", "b", "c"])
+        h.add_edges_from_arrays(["a", "b", "c"], ["b", "c", "c"], weight=[1, 2, 3])
+        assert list(g.E) == list(h.E)
+        assert g.get_attr_edges() == h.get_attr_edges()
+        assert set(g.get_incident_edges(["c"])) == set(h.get_incident_edges(["c"]))
+        with pytest.raises(ValueError):
+            g.add_edges_from_arrays([0], [3], indices=True)
+
+
+def test_columnar_edge_attributes():
+    g = Graph(columnar=True)
+    g.add_edges_from_arrays(["a", "b", "c"], ["b", "c", "a"], interaction=[1, -1, 1])
+    g.add_edge("a", "d", interaction=-1, name="rare")
+    attr = g.get_attr_edge(1)
+    assert isinstance(attr, MutableMapping)
+    assert attr.interaction == -1
+    assert g.get_attr_edge(3)["name"] == "rare"
+    assert "name" not in g.get_attr_edge(0)
+    attr["interaction"] = 1
+    signs = g.get_edge_attr_array("interaction")
+    assert signs.dtype == np.int64
+    assert signs.tolist() == [1, 1, 1, -1]
+    assert g.get_edge_attr_array("name").tolist() == [None, None, None, "rare"]
+    assert g.get_attr_from_edges("weight", 0) == [0, 0, 0, 0]
+
+
+def test_columnar_edge_attr_array_is_view():
+    g = Graph(columnar=True)
+    g.add_edges_from_arrays([1, 2], [2, 3])
+    weights = np.array([0.5, 2.0])
+    g.set_edge_attr_array("weight", weights)
+    assert np.shares_memory(g.get_edge_attr_array("weight"), weights)
+    assert g.get_attr_edge(1).weight == 2.0
+    # Mixed types are kept by upgrading the column
+    g.get_attr_edge(0)["weight"] = "w"
+    assert g.get_attr_edge(0).weight == "w"
+    assert g.get_attr_edge(1).weight == 2.0
+
+
+def test_columnar_attributes_copy_and_pickle():
+    import pickle
+
+    g = Graph(columnar=True)
+    g.add_edge({"a": -1}, {"b": 2}, id="r1")
+    g.add_vertex("a", compartment="c")
+    attr = deepcopy(g.get_attr_edge(0))
+    assert type(attr) is Attributes
+    assert attr.get_attr(Attr.TARGET_ATTR)["b"].get_attr(Attr.VALUE) == 2
+    g2 = pickle.loads(pickle.dumps(g))
+    assert g2.get_attr_edge(0)["id"] == "r1"
+    assert g2.get_attr_vertex("a").compartment == "c"
+    rev = g2.reverse()
+    assert (
+        rev.get_attr_edge(0).get_attr(Attr.SOURCE_ATTR)["b"].get_attr(Attr.VALUE) == 2
+    )
+    assert g.get_edge_attr_array("id").tolist() == ["r1"]
+
+
+def test_columnar_attributes_to_dict_and_json():
+    import json
+
+    g = Graph(columnar=True)
+    g.add_edge("a", "b", id="r1", weight=1.5)
+    g.add_vertex("a", tags=["x", 1])
+    attr = g.get_attr_edge(0)
+    assert not isinstance(attr, dict)
+    d = dict(attr)
+    assert type(d) is dict
+    assert d["id"] == "r1" and d["weight"] == 1.5
+    assert json.loads(json.dumps(d)) == attr
+    assert json.loads(json.dumps(dict(g.get_attr_vertex("a")))) == {"tags": ["x", 1]}
+    # The row is not silently serialized as an empty object
+    with pytest.raises(TypeError):
+        json.dumps(attr)
+
+
+def test_vertex_attr_array():
+    for columnar in [False, True]:
+        g = Graph(columnar=columnar)
+        g.add_edges([("a", "b"), ("b", "c")])
+        g.set_vertex_attr_array("value", [1.0, 2.0, 3.0])
+        assert g.get_attr_vertex("b").value == 2.0
+        assert g.get_vertex_attr_array("value").tolist() == [1.0, 2.0, 3.0]
+        g.add_vertex("d")
+        assert g.get_vertex_attr_array("value", default=0.0).tolist() == [
+            1.0,
+            2.0,
+            3.0,
+            0.0,
+        ]
+
+
+def test_sparse_incidence_matrix():
+    g = Graph()
+    g.add_edge({"a": -2}, {"b": 1, "c": 3})
+    g.add_edge("c", "c")
+    g.add_edge((), "a")
+    for values in [False, True]:
+        A = g.vertex_incidence_matrix(values=values)
+        S = g.vertex_incidence_matrix(values=values, sparse=True)
+        assert S.shape == A.shape
+        assert np.array_equal(S.toarray(), A)
+    assert g.vertex_incidence_matrix(values=True)[0, 0] == -2
+
+
+def test_incidence_cache_invalidated():
+    g = Graph()
+    g.add_edge("a", "b")
+    S = g.vertex_incidence_matrix(sparse=True)
+    assert g.vertex_incidence_matrix(sparse=True) is S
+    g.add_edge("b", "c")
+    S2 = g.vertex_incidence_matrix(sparse=True)
+    assert S2.shape == (3, 2)
+    assert S2[2, 1] == 1
+
+
+def test_subgraph_returns_graph():
+    G = Graph()
+    G.add_edges([("A", "B"), ("B", "C"), ("C", "D"), ("E", "C")], interaction=1)
+    for g in [G.prune(["A"], ["D"]), G.subgraph(["A", "B"]), G.edge_subgraph([0])]:
+        assert isinstance(g, Graph)
+    Gp = G.prune(["A"], ["D"])
+    Gp.add_edge("D", "F")
+    assert list(Gp.V) == ["A", "B", "C", "D", "F"]
+    assert G.num_edges == 4
+
+
+def test_prune_returns_view():
+    G = Graph()
+    G.add_edges([("A", "B"), ("B", "C"), ("C", "D"), ("E", "C")], interaction=1)
+    Gp = G.prune(["A"], ["D"], view=True)
+    assert isinstance(Gp, GraphView)
+    assert Gp.parent is G
+    assert list(Gp.V) == ["A", "B", "C", "D"]
+    assert Gp.num_edges == 3
+    assert Gp.edge_mask.tolist() == [True, True, True, False]
+    assert list(Gp.successors("B")) == ["C"]
+    assert Gp.get_edge_attr_array("interaction").tolist() == [1, 1, 1]
+
+
+def test_view_shares_attributes():
+    G = Graph()
+    G.add_edge("A", "B", weight=1)
+    G.add_edge("B", "C", weight=2)
+    view = G.subgraph(["B", "C"], view=True)
+    assert view.num_edges == 1
+    view.get_attr_edge(0)["weight"] = 5
+    assert G.get_attr_edge(1)["weight"] == 5
+
+
+def test_view_is_read_only():
+    G = Graph()
+    G.add_edge("A", "B")
+    view = G.subgraph(["A", "B"], view=True)
+    with pytest.raises(ReadOnlyGraphError):
+        view.add_edge("B", "C")
+    with pytest.raises(ReadOnlyGraphError):
+        view.add_vertex("C")
+
+
+def test_view_materialize():
+    G = Graph()
+    G.add_edge({"A": -1}, {"B": 2}, weight=1)
+    G.add_edge("B", "C")
+    view = G.edge_subgraph([0], view=True)
+    g = view.materialize()
+    assert isinstance(g, Graph)
+    assert np.array_equal(
+        g.vertex_incidence_matrix(values=True),
+        view.vertex_incidence_matrix(values=True),
+    )
+    g.add_edge("B", "D")
+    g.get_attr_edge(0)["weight"] = 3
+    assert G.num_edges == 2
+    assert G.get_attr_edge(0)["weight"] == 1
+
+
+def test_view_of_view():
+    G = Graph()
+    G.add_edges([("A", "B"), ("B", "C"), ("C", "D")])
+    view = G.subgraph(["B", "C", "D"], view=True).subgraph(["A", "C", "D"], view=True)
+    assert view.parent is G
+    assert list(view.V) == ["C", "D"]
+    assert list(view.E) == [(frozenset({"C"}), frozenset({"D"}))]
+
+
+def test_view_follows_parent_changes():
+    G = Graph()
+    G.add_edges([("A", "B"), ("B", "C")])
+    view = G.subgraph(["A", "B"], view=True)
+    edges = G.edge_subgraph([1], view=True)
+    assert view.shape == (2, 1)
+    G.add_edge("B", "A")
+    G.add_edge("C", "D")
+    assert view.shape == (2, 2)
+    assert list(view.E) == list(G.subgraph(["A", "B"]).E)
+    assert view.edge_mask.tolist() == [True, False, True, False]
+    assert list(view.successors("B")) == ["A"]
+    assert edges.shape == (2, 1)
+    assert edges.vertex_mask.tolist() == [False, True, True, False]
+
+
+def _graph_with_attributes(columnar=False):
+    g = Graph(columnar=columnar, name="test")
+    g.add_vertex("isolated", color="red")
+    g.add_edge({"a": -1, "b": -2}, {"c": 1}, id="r1", weight=1.5)
+    g.add_edge("c", "d", type=EdgeType.UNDIRECTED, weight=2.0, tag=("x", 1))
+    g.add_edge((), "a", id="in")
+    g.add_vertex("a", value=3)
+    return g
+
+
+def _assert_same_graph(g, h):
+    assert list(g.V) == list(h.V)
+    assert list(g.E) == list(h.E)
+    assert g.get_attr_edges() == h.get_attr_edges()
+    assert g.get_attr_vertices() == h.get_attr_vertices()
+    assert g.get_graph_attributes() == h.get_graph_attributes()
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("format", ["npz", "dir", "pickle"])
+def test_save_load(tmp_path, columnar, format):
+    g = _graph_with_attributes(columnar)
+    g.save(str(tmp_path / "graph"), format=format)
+    filename = {"npz": "graph.npz", "dir": "graph", "pickle": "graph.pkl.xz"}
+    h = Graph.load(str(tmp_path / filename[format]))
+    _assert_same_graph(g, h)
+    assert list(h.successors("c")) == ["d"]
+
+
+def test_load_mmap(tmp_path):
+    g = Graph(columnar=True)
+    g.add_edges_from_arrays(["a", "b", "c"], ["b", "c", "d"], weight=[1.0, 2.0, 3.0])
+    g.save(str(tmp_path / "graph"), compressed=False)
+    h = Graph.load(str(tmp_path / "graph.npz"), mmap_mode="r")
+    _assert_same_graph(g, h)
+    assert isinstance(h.get_index().src_idx.base, np.memmap)
+    weights = h.get_edge_attr_array("weight")
+    assert weights.tolist() == [1.0, 2.0, 3.0]
+    assert not weights.flags.writeable
+    assert list(h.predecessors("d")) == ["c"]
+
+
+def test_save_load_compressed(tmp_path):
+    from corneto._graph_io import available_codecs
+
+    if not available_codecs():
+        pytest.skip("zstandard or lz4 are not installed")
+    g = _graph_with_attributes()
+    g.save(str(tmp_path / "graph"), compressed=True)
+    _assert_same_graph(g, Graph.load(str(tmp_path / "graph.npz")))
+
+
+def test_load_newer_format(tmp_path):
+    import json
+
+    g = _graph_with_attributes()
+    g.save(str(tmp_path / "graph"), format="dir")
+    header_file = tmp_path / "graph" / "header.json"
+    header = json.loads(header_file.read_text())
+    header["version"] += 1
+    header_file.write_text(json.dumps(header))
+    with pytest.raises(ValueError):
+        Graph.load(str(tmp_path / "graph"))
+
+
+def _successors_in_worker(args):
+    graph, vertex = args
+    return list(graph.successors(vertex))
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_shared_graph(columnar):
+    import pickle
+
+    g = _graph_with_attributes(columnar)
+    with g.share() as shared:
+        assert isinstance(shared, ReadOnlyGraph)
+        _assert_same_graph(g, shared)
+        _assert_same_graph(g, shared.materialize())
+        attached = pickle.loads(pickle.dumps(shared))
+        _assert_same_graph(g, attached)
+        assert attached.get_edge_attr_array("weight").tolist() == [1.5, 2.0, None]
+        with pytest.raises(ReadOnlyGraphError):
+            attached.add_edge("a", "d")
+        g2 = attached.subgraph(["a", "b", "c"])
+        g2.add_edge("c", "e")
+        assert isinstance(g2, Graph)
+
+
+def test_shared_graph_workers():
+    import multiprocessing
+
+    g = Graph()
+    g.add_edges([("a", "b"), ("b", "c"), ("b", "d")])
+    with g.share() as shared, multiprocessing.Pool(2) as pool:
+        result = pool.map(_successors_in_worker, [(shared, "a"), (shared, "b")])
+    assert result == [["b"], ["c", "d"]]
+
+
+def test_load_read_only(tmp_path):
+    g = _graph_with_attributes(columnar=True)
+    g.save(str(tmp_path / "graph"), compressed=False)
+    h = Graph.load(str(tmp_path / "graph.npz"), read_only=True)
+    assert isinstance(h, ReadOnlyGraph)
+    _assert_same_graph(g, h)
+    assert isinstance(h.get_index().src_idx.base, np.memmap)
@@ -33,3 +33,80 @@ def test_load_compressed_gem():
     assert S.shape == (441, 555)
     assert R.shape == (555,)
     assert M.shape == (441,)
+
+
+def test_read_sif_chunks(tmp_path):
+    import gzip
+
+    from corneto._io import _read_sif_chunks
+
+    file = tmp_path / "network.sif.gz"
+    lines = ["A\t1\tB", "B\t-1\tC", "A\t1\tB", "C\t1\tC", "A\t-1\tB", "", "C\t1\tD"]
+    with gzip.open(file, "wt") as f:
+        f.write("\n".join(lines) + "\n")
+    chunks = list(_read_sif_chunks(file, chunk_size=2, deduplicate=True))
+    vertices = chunks[-1][0]
+    assert vertices == ["A", "B", "C", "D"]
+    edges = [
+        (vertices[s], d, vertices[t])
+        for _, src, itr, tgt in chunks
+        for s, d, t in zip(src.tolist(), itr.tolist(), tgt.tolist())
+    ]
+    assert edges == [("A", 1, "B"), ("B", -1, "C"), ("A", -1, "B"), ("C", 1, "D")]
+
+
+def test_graph_from_sif_chunks():
+    from corneto._graph import Graph
+    from corneto._io import _read_sif_iter
+
+    file = pathlib.Path(__file__).parent.joinpath("sif", "PKN-LiverDREAM.sif")
+    G = Graph.from_sif(str(file), chunk_size=10)
+    G_ref = Graph.from_sif_tuples(_read_sif_iter(str(file)))
+    assert G.V == G_ref.V
+    assert G.E == G_ref.E
+    assert G.get_attr_from_edges("interaction") == G_ref.get_attr_from_edges(
+        "interaction"
+    )
+
+
+def test_graph_from_sif_deduplicate(tmp_path):
+    from corneto._graph import Graph
+    from corneto._io import _read_sif_chunks
+
+    file = tmp_path / "network.sif"
+    file.write_text("A\t1\tB\nB\t-1\tC\nA\t1\tB\n")
+    n_read = sum(len(src) for _, src, _, _ in _read_sif_chunks(file))
+    assert n_read == Graph.from_sif(str(file)).num_edges == 3
+    G = Graph.from_sif(str(file), deduplicate=True)
+    assert list(G.E) == [
+        (frozenset({"A"}), frozenset({"B"})),
+        (frozenset({"B"}), frozenset({"C"})),
+    ]
+    assert G.get_attr_from_edges("interaction") == [1, -1]
+    assert list(G.successors("A")) == ["B"]
+
+
+@pytest.mark.parametrize("line", ["A\t1", "A\t1\tB\tC"])
+def test_read_sif_invalid_line(tmp_path, line):
+    from corneto._graph import Graph
+
+    file = tmp_path / "network.sif"
+    file.write_text(f"A\t1\tB\n{line}\n")
+    with pytest.raises(ValueError):
+        Graph.from_sif(str(file))
+
+
+def test_load_sif_sparse():
+    import numpy as np
+
+    from corneto._io import load_sif
+
+    file = pathlib.Path(__file__).parent.joinpath("sif", "PKN-LiverDREAM.sif")
+    S, species, reactions, values = load_sif(file)
+    S_sparse, species_sp, reactions_sp, values_sp = load_sif(file, sparse=True)
+    assert S_sparse.shape == S.shape == (40, 58)
+    # Species are ordered by a set, compare the matrices row by row
+    rows = [species_sp.index(s) for s in species]
+    assert np.array_equal(S_sparse.toarray()[rows, :], S)
+    assert reactions_sp == reactions
+    assert values_sp == values